@@ -1,156 +1,211 @@
-"""
-Główny plik aplikacji Flask - Blog Platform
-"""
-import os
-from extensions import limiter
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
-from flask_bcrypt import Bcrypt
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-import structlog
-
-from config import Config
-from database import db
-from middleware.security_headers import setup_security_headers
-from utils.error_handlers import register_error_handlers
-from utils.logger import setup_logging
-
-# Import routes
-from routes.auth import auth_bp
-from routes.posts import posts_bp
-from routes.health import health_bp
-from routes.admin import admin_bp
-
-from flask import render_template
-from middleware.rate_limiter import setup_rate_limiting
-
-def create_app(config_class=Config):
-    """Factory function do tworzenia aplikacji Flask"""
-    app = Flask(__name__)
-    app.config.from_object(config_class)
-    
-    setup_rate_limiting(app)
-
-    # Setup logging
-    setup_logging(app)
-    logger = structlog.get_logger(__name__)
-    
-    # Initialize extensions
-    db.init_app(app)
-    migrate = Migrate(app, db)
-    jwt = JWTManager(app)
-    bcrypt = Bcrypt(app)
-    
-    
-
-    # Setup CORS
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": app.config.get("CORS_ORIGINS", ["http://localhost:3000"]),
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": True,
-            "expose_headers": ["Content-Type", "Authorization"]
-        }
-    }, supports_credentials=True)
-    
-    # Setup rate limiting
-    limiter.init_app(app)
-    limiter.default_limits = [app.config.get("RATE_LIMIT", "200 per day, 50 per hour")]
-    
-    # Register middleware
-    setup_security_headers(app)
-
-    # Middleware do zapobiegania cache'owaniu dla auth endpointów
-    @app.after_request
-    def add_no_cache(response):
-        if request.path.startswith('/api/auth/'):
-            response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-            response.headers['Pragma'] = 'no-cache'
-            response.headers['Expires'] = '0'
-        return response
-    
-    # Register error handlers
-    register_error_handlers(app)
-    
-    # Register blueprints
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(posts_bp, url_prefix='/api/posts')
-    app.register_blueprint(health_bp, url_prefix='/api')
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-    
-    # Health check endpoint (Lab 10)
-    @app.route('/hello')
-    def hello():
-        """Prosty endpoint testowy (Lab 10)"""
-        return jsonify({
-            "status": "OK",
-            "message": "Blog Platform działa poprawnie!",
-            "version": "1.0.0"
-        })
-    
-    @app.route('/')
-    def index():
-        return jsonify({
-            "name": "Blog Platform API",
-            "version": "1.0.0",
-            "docs": "/api/health",
-            "endpoints": {
-                "auth": "/api/auth",
-                "posts": "/api/posts",
-                "health": "/api/health"
-            }
-        })
-    
-    # CLI command for manual migrations
-    @app.cli.command("init-db")
-    def init_db_command():
-        """Initialize the database with default admin user"""
-        with app.app_context():
-            try:
-                from migrations import run_migrations
-                run_migrations()
-                print("✓ Database initialized successfully")
-            except Exception as e:
-                print(f"✗ Error initializing database: {e}")
-                raise
-    
-    # Auto-run migrations only in development
-    if app.config.get('FLASK_ENV') == 'development':
-        with app.app_context():
-            try:
-                # Check if users table exists
-                from sqlalchemy import inspect
-                inspector = inspect(db.engine)
-                tables = inspector.get_table_names()
-                
-                if not tables:  # If no tables at all
-                    print("⚙️ Running initial migrations...")
-                    from migrations import run_migrations
-                    run_migrations()
-                    print("✓ Initial migrations completed")
-                elif 'users' not in tables:
-                    print("⚠️ Tables exist but 'users' table is missing")
-                    print("Consider running: flask init-db")
-            except Exception as e:
-                print(f"⚠️ Could not check/run migrations: {e}")
-                if app.config.get('DEBUG'):
-                    print("Debug mode: Continuing despite migration error")
-    
-    logger.info("Aplikacja zainicjalizowana", 
-                env=app.config.get("FLASK_ENV"),
-                debug=app.config.get("DEBUG"))
-    
-    @app.route('/web')
-    def web_index():
-        """Strona webowa z interfejsem HTML"""
-        return render_template('index.html')
-
-    return app
-
-if __name__ == '__main__':
-    app = create_app()
+"""
+Główny plik aplikacji Flask - Blog Platform
+"""
+import os
+from extensions import limiter
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+from flask_migrate import Migrate
+from flask_jwt_extended import JWTManager
+from flask_bcrypt import Bcrypt
+import structlog
+
+from config import Config
+from database import db, configure_sqlite, configure_replica
+from middleware.security_headers import setup_security_headers
+from middleware.compression import setup_compression
+from middleware.metrics import setup_metrics
+from middleware.profiler import setup_profiling
+from middleware.slow_query_log import setup_slow_query_log
+from utils.error_handlers import register_error_handlers
+from utils.logger import setup_logging, shutdown_logging
+from utils.write_queue import configure_write_queue
+from utils.jobs import configure_jobs
+from utils.view_counter import configure_view_counter
+from utils.trending import configure_trending
+from utils.cache import configure_cache
+from utils.json_provider import configure_json
+from services.analytics_service import configure_analytics
+
+# Import routes
+from routes.auth import auth_bp
+from routes.posts import posts_bp
+from routes.health import health_bp
+from routes.admin import admin_bp
+
+from flask import render_template
+
+def create_app(config_class=Config):
+    """Factory function do tworzenia aplikacji Flask"""
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+
+    # Setup logging
+    setup_logging(app)
+    logger = structlog.get_logger(__name__)
+    configure_json(app)
+    
+    # Initialize extensions
+    db.init_app(app)
+    configure_sqlite(app)
+    configure_replica(app)
+    configure_write_queue(app)
+    configure_jobs(app)
+    configure_view_counter(app)
+    configure_trending(app)
+    configure_cache(app)
+    configure_analytics(app)
+    migrate = Migrate(app, db)
+    jwt = JWTManager(app)
+    bcrypt = Bcrypt(app)
+    
+    
+
+    # Setup CORS
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": app.config.get("CORS_ORIGINS", ["http://localhost:3000"]),
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"],
+            "supports_credentials": True,
+            "expose_headers": ["Content-Type", "Authorization"]
+        }
+    }, supports_credentials=True)
+    
+    # Metryki (pierwszy before_request - mierzy też czas limitera)
+    setup_metrics(app)
+    setup_slow_query_log(app)
+    # Kompresja po pozostałych after_request, wliczona w czas żądania w metrykach
+    setup_compression(app)
+    
+    # Setup rate limiting (jeden silnik, wspólne liczniki dla wszystkich workerów)
+    limiter.init_app(app)
+    
+    # Register middleware
+    setup_security_headers(app)
+    setup_profiling(app)
+
+    # Middleware do zapobiegania cache'owaniu dla auth endpointów
+    @app.after_request
+    def add_no_cache(response):
+        if request.path.startswith('/api/auth/'):
+            response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+            response.headers['Pragma'] = 'no-cache'
+            response.headers['Expires'] = '0'
+        return response
+    
+    # Register error handlers
+    register_error_handlers(app)
+    
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(posts_bp, url_prefix='/api/posts')
+    app.register_blueprint(health_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    
+    # Health check endpoint (Lab 10)
+    @app.route('/hello')
+    def hello():
+        """Prosty endpoint testowy (Lab 10)"""
+        return jsonify({
+            "status": "OK",
+            "message": "Blog Platform działa poprawnie!",
+            "version": "1.0.0"
+        })
+    
+    @app.route('/')
+    def index():
+        return jsonify({
+            "name": "Blog Platform API",
+            "version": "1.0.0",
+            "docs": "/api/health",
+            "endpoints": {
+                "auth": "/api/auth",
+                "posts": "/api/posts",
+                "health": "/api/health"
+            }
+        })
+    
+    # CLI command for manual migrations
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Initialize the database with default admin user"""
+        with app.app_context():
+            try:
+                from migrations import run_migrations
+                run_migrations()
+                print("✓ Database initialized successfully")
+            except Exception as e:
+                print(f"✗ Error initializing database: {e}")
+                raise
+    
+    @app.cli.command("reconcile-author-stats")
+    def reconcile_author_stats_command():
+        """Przelicz tabelę author_stats z postów i komentarzy"""
+        from services.author_stats_service import AuthorStatsService
+        with app.app_context():
+            authors = AuthorStatsService.reconcile()
+            print(f"✓ Author stats reconciled ({authors} authors)")
+    
+    # Auto-run migrations only in development
+    if app.config.get('FLASK_ENV') == 'development':
+        with app.app_context():
+            try:
+                # Check if users table exists
+                from sqlalchemy import inspect
+                inspector = inspect(db.engine)
+                tables = inspector.get_table_names()
+                
+                if not tables:  # If no tables at all
+                    print("⚙️ Running initial migrations...")
+                    from migrations import run_migrations
+                    run_migrations()
+                    print("✓ Initial migrations completed")
+                elif 'users' not in tables:
+                    print("⚠️ Tables exist but 'users' table is missing")
+                    print("Consider running: flask init-db")
+            except Exception as e:
+                print(f"⚠️ Could not check/run migrations: {e}")
+                if app.config.get('DEBUG'):
+                    print("Debug mode: Continuing despite migration error")
+    
+    logger.info("Aplikacja zainicjalizowana", 
+                env=app.config.get("FLASK_ENV"),
+                debug=app.config.get("DEBUG"))
+    
+    @app.route('/web')
+    def web_index():
+        """Strona webowa z interfejsem HTML"""
+        return render_template('index.html')
+
+    return app
+
+def shutdown_app(app):
+    """
+    Zamknięcie procesu: zatrzymaj wątki w tle i zapisz bufory w pamięci.
+    Kolejność ma znaczenie - wyświetlenia zasilają ranking popularności,
+    a oba (i zadania w tle) zapisują przez kolejkę zapisów, więc ona
+    zatrzymywana jest po nich; logi zamykane są na końcu.
+    """
+    logger = structlog.get_logger(__name__)
+    for name in ('view_counter', 'trending', 'job_queue', 'write_queue', 'db_replica'):
+        component = app.extensions.get(name)
+        if component is None:
+            continue
+        try:
+            component.stop()
+        except Exception as e:
+            logger.error("Błąd zatrzymywania komponentu", component=name, error=str(e))
+    
+    store = app.extensions.get('metrics_store')
+    if store is not None:
+        store.flush()
+    with app.app_context():
+        db.engine.dispose()
+    
+    logger.info("Aplikacja zatrzymana", pid=os.getpid())
+    shutdown_logging()
+
+if __name__ == '__main__':
+    app = create_app()
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Benchmark: analityka aktywności liczona w NumPy vs GROUP BY w bazie
+
+Generuje syntetyczne posty i komentarze (rozłożone równo w --days dniach,
+jeden post na --comments-per-post komentarzy), po czym liczy analitykę całego
+zakresu obiema metodami. Wynik: czas wyliczenia i zgodność wyników.
+
+    python benchmarks/analytics.py --rows 10000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from database import db
+from services.analytics_service import AnalyticsService, np
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BATCH = 50000
+
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def generate(path, rows, days, authors, comments_per_post):
+    """Syntetyczne dane wstawiane bezpośrednio przez sqlite3 (executemany partiami)"""
+    rng = random.Random(42)
+    begin = START.timestamp()
+    span = days * 86400
+    post_count = max(1, rows // (comments_per_post + 1))
+    comment_count = rows - post_count
+    post_times = sorted(begin + rng.random() * span for _ in range(post_count))
+
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=OFF')
+    connection.execute('PRAGMA synchronous=OFF')
+    connection.executemany(
+        "INSERT INTO users (id, username, email, password_hash, role, is_active, created_at) "
+        "VALUES (?, ?, ?, '-', 'USER', 1, ?)",
+        [(i, f'user{i}', f'user{i}@example.org', _timestamp(begin)) for i in range(1, authors + 1)]
+    )
+    for offset in range(0, post_count, BATCH):
+        connection.executemany(
+            "INSERT INTO posts (id, title, content, author_id, is_published, view_count, created_at, updated_at) "
+            "VALUES (?, 'Post', 'Treść', ?, 1, 0, ?, ?)",
+            [(i + 1, rng.randint(1, authors), _timestamp(t), _timestamp(t))
+             for i, t in enumerate(post_times[offset:offset + BATCH], offset)]
+        )
+
+    # Komentarze rosnąco w czasie, każdy do posta opublikowanego wcześniej
+    step = span / max(1, comment_count)
+    for offset in range(0, comment_count, BATCH):
+        batch = []
+        for i in range(offset, min(offset + BATCH, comment_count)):
+            t = begin + (i + rng.random()) * step
+            published = bisect_right(post_times, t)
+            if not published:
+                continue
+            batch.append((i + 1, rng.randint(1, authors), rng.randint(1, published), _timestamp(t)))
+        connection.executemany(
+            "INSERT INTO comments (id, content, author_id, post_id, created_at) VALUES (?, 'Komentarz', ?, ?, ?)",
+            batch
+        )
+    connection.commit()
+    connection.execute('ANALYZE')
+    connection.close()
+    return post_count, comment_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000, help='posty + komentarze')
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--authors', type=int, default=10000)
+    parser.add_argument('--comments-per-post', type=int, default=4)
+    parser.add_argument('--chunk-size', type=int, default=Config.ANALYTICS_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='blog-bench-')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        SQLITE_OPTIMIZE_INTERVAL = 0
+        LOG_LEVEL = 'ERROR'
+        SLOW_QUERY_THRESHOLD_MS = None
+        METRICS_MULTIPROCESS_DIR = None
+        RATE_LIMIT_STORAGE_URI = 'memory://'
+        LOG_COMPRESS = False
+        LOG_RETENTION_DAYS = 0
+        LOG_BACKUP_COUNT = 0
+        ANALYTICS_CHUNK_SIZE = args.chunk_size
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+
+    started = time.perf_counter()
+    posts, comments = generate(os.path.join(directory, 'bench.db'), args.rows, args.days,
+                               args.authors, args.comments_per_post)
+    print(f'dane: {posts} postów, {comments} komentarzy ({time.perf_counter() - started:.1f} s)')
+
+    end = START + timedelta(days=args.days)
+    results = {}
+    with app.app_context():
+        for name, compute in (('sql', AnalyticsService.compute_sql), ('numpy', AnalyticsService.compute_numpy)):
+            if name == 'numpy' and np is None:
+                print(f'{name:<6} {"n/a (brak NumPy)":>12}')
+                continue
+            started = time.perf_counter()
+            results[name] = compute(START, end)
+            print(f'{name:<6} {time.perf_counter() - started:>10.2f} s')
+            db.session.rollback()
+        db.engine.dispose()
+
+    if len(results) == 2:
+        same = all(results['numpy'][key] == results['sql'][key] for key in ('posts', 'comments', 'cohorts'))
+        print('wyniki zgodne' if same else 'UWAGA: wyniki różne')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Benchmark: poziom kompresji odpowiedzi - CPU vs bajty
+
+Kompresuje stronę listy postów (--per-page postów po --content-kb KB treści,
+serializowaną jak w API) każdym poziomem gzip i jakością Brotli (jeśli
+zainstalowany). Wynik: rozmiar po kompresji, współczynnik i MB/s wejścia.
+
+    python benchmarks/compression.py --per-page 20 --content-kb 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.compression import brotli, gzip_compress
+
+WORDS = ('blog', 'post', 'komentarz', 'treść', 'autor', 'dane', 'kompresja', 'odpowiedź', 'serwer',
+         'baza', 'zapytanie', 'indeks', 'wydajność', 'czas', 'strona', 'lista', 'użytkownik', 'tekst')
+
+
+def build_page(per_page, content_kb):
+    rng = random.Random(1)
+    posts = []
+    for i in range(per_page):
+        words = []
+        while sum(len(word) + 1 for word in words) < content_kb * 1024:
+            words.append(rng.choice(WORDS))
+        posts.append({'id': i + 1, 'title': f'Post {i}', 'content': ' '.join(words), 'author_id': i % 7 + 1,
+                      'is_published': True, 'view_count': rng.randint(0, 10000),
+                      'created_at': f'2024-01-{i % 28 + 1:02d}T12:00:00', 'author': {'id': i % 7 + 1,
+                                                                                     'username': f'autor{i % 7}'}})
+    return json.dumps({'posts': posts, 'page': 1, 'per_page': per_page, 'total': 1000}).encode()
+
+
+def measure(name, compress, data, seconds=0.5):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        compressed = compress(data)
+        count += 1
+    elapsed = time.perf_counter() - started
+    print(f'{name:<12} {len(compressed):>10} {len(data) / len(compressed):>8.2f} '
+          f'{len(data) * count / elapsed / 2 ** 20:>10.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--content-kb', type=int, default=10)
+    args = parser.parse_args()
+
+    data = build_page(args.per_page, args.content_kb)
+    print(f'odpowiedź: {len(data)} B')
+    print(f'{"poziom":<12} {"bajty":>10} {"stopień":>8} {"MB/s":>10}')
+    for level in range(1, 10):
+        measure(f'gzip {level}', lambda body: gzip_compress(body, level), data)
+    if brotli is None:
+        print('brotli       n/a (brak modułu brotli)')
+        return
+    for quality in range(0, 12):
+        measure(f'br {quality}', lambda body: brotli.compress(body, quality=quality), data)
+
+
+if __name__ == '__main__':
+    main()
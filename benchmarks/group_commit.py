@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark: commit w wątku żądania vs kolejka zapisów z grupowym commitem
+
+Wątki dodają komentarze przez PostService.add_comment. Wynik: komentarze/s
+oraz średnia liczba transakcji w jednym commicie dla rosnącej liczby wątków.
+
+    python benchmarks/group_commit.py --threads 1 4 16 --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from database import db
+from models.user import User
+from models.post import Post
+from services.post_service import PostService
+from utils.metrics import registry
+
+
+def _counter(name):
+    return sum(value for metric, _, value in registry.snapshot()['counters'] if metric == name)
+
+
+def run_scenario(queue_enabled, threads_count, seconds):
+    directory = tempfile.mkdtemp(prefix='blog-bench-')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        SQLALCHEMY_REPLICA_URI = None
+        WRITE_QUEUE_ENABLED = queue_enabled
+        SQLITE_OPTIMIZE_INTERVAL = 0
+        LOG_LEVEL = 'ERROR'
+        SLOW_QUERY_THRESHOLD_MS = None
+        METRICS_MULTIPROCESS_DIR = None
+        RATE_LIMIT_STORAGE_URI = 'memory://'
+        LOG_COMPRESS = False
+        LOG_RETENTION_DAYS = 0
+        LOG_BACKUP_COUNT = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        author = User('benchauthor', 'bench@example.org', 'Bench123!')
+        db.session.add(author)
+        db.session.commit()
+        post = Post('Post do komentowania', 'Treść posta do benchmarku', author.id)
+        db.session.add(post)
+        db.session.commit()
+        author_id, post_id = author.id, post.id
+
+    stop = threading.Event()
+    counts = []
+    commits_before = _counter('blog_db_write_commits_total')
+
+    def writer():
+        written = 0
+        with app.app_context():
+            while not stop.is_set():
+                PostService.add_comment(post_id, 'Komentarz z benchmarku', author_id)
+                db.session.remove()
+                written += 1
+        counts.append(written)
+
+    threads = [threading.Thread(target=writer) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    write_queue = app.extensions['write_queue']
+    if write_queue is not None:
+        write_queue.stop()
+    with app.app_context():
+        db.engine.dispose()
+
+    total = sum(counts)
+    commits = _counter('blog_db_write_commits_total') - commits_before if queue_enabled else total
+    return total / seconds, total / commits if commits else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f'{"wątki":>6} {"commit/żądanie /s":>18} {"kolejka /s":>11} {"transakcji/commit":>18}')
+    for threads_count in args.threads:
+        inline_rate, _ = run_scenario(False, threads_count, args.seconds)
+        queue_rate, per_commit = run_scenario(True, threads_count, args.seconds)
+        print(f'{threads_count:>6} {inline_rate:>18.1f} {queue_rate:>11.1f} {per_commit:>18.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Benchmark: serializacja odpowiedzi listy postów
+
+Porównuje domyślny provider Flask (stdlib json, sortowanie kluczy, ASCII,
+daty przez isoformat() w to_dict) z FastJSONProvider w trybie stdlib
+i orjson. Wynik: odpowiedzi/s i MB/s dla strony --per-page postów z autorem.
+
+    python benchmarks/json_encoding.py --per-page 20 --seconds 3
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.json_provider import FastJSONProvider, orjson
+
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def build_page(per_page, iso_dates):
+    """Strona postów w kształcie odpowiedzi GET /api/posts"""
+    def stamp(value):
+        return value.isoformat() if iso_dates else value
+
+    posts = []
+    for i in range(per_page):
+        created = CREATED + timedelta(minutes=i)
+        posts.append({
+            'id': i + 1,
+            'title': f'Post numer {i} - zażółć gęślą jaźń',
+            'content': 'Treść posta do benchmarku serializacji. ' * 20,
+            'author_id': i % 50 + 1,
+            'is_published': True,
+            'view_count': i * 7,
+            'created_at': stamp(created),
+            'updated_at': stamp(created),
+            'author': {'id': i % 50 + 1, 'username': f'autor{i % 50}'},
+        })
+    return {'posts': posts, 'page': 1, 'per_page': per_page, 'total': 10000, 'pages': 10000 // per_page}
+
+
+def run(name, app, provider, page, seconds):
+    # Daty przez isoformat() wliczone w czas - tak robiło to_dict() przed zmianą
+    iso_dates = isinstance(provider, DefaultJSONProvider)
+    with app.app_context():
+        count = size = 0
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        while time.perf_counter() < deadline:
+            body = provider.response(build_page(page, iso_dates)).get_data()
+            count += 1
+            size += len(body)
+        elapsed = time.perf_counter() - started
+    print(f'{name:<16} {count / elapsed:>12.0f} {size / elapsed / 2 ** 20:>10.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    print(f'{"provider":<16} {"odpowiedzi/s":>12} {"MB/s":>10}')
+    run('flask domyślny', app, DefaultJSONProvider(app), args.per_page, args.seconds)
+    run('stdlib zwarty', app, FastJSONProvider(app, engine='stdlib'), args.per_page, args.seconds)
+    if orjson is None:
+        print(f'{"orjson":<16} {"n/a (brak orjson)":>12}')
+    else:
+        run('orjson', app, FastJSONProvider(app, engine='orjson'), args.per_page, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Benchmark: lista postów przez obiekty ORM + to_dict() vs model odczytu
+
+Dla strony --per-page postów z autorem mierzy wiersze/s trzech ścieżek:
+ORM (joinedload + to_dict(include_author=True)), model odczytu do słowników
+(POST_WITH_AUTHOR_ROW.dicts) i do rekordów z __slots__ (.records).
+Sprawdza też, że słowniki obu ścieżek są identyczne.
+
+    python benchmarks/read_models.py --posts 20000 --per-page 100 --seconds 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import joinedload
+
+from app import create_app
+from config import Config
+from database import db
+from models.post import Post
+from models.read_models import POST_WITH_AUTHOR_ROW
+from models.user import User
+
+
+def run(name, fetch, seconds):
+    rows = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        rows += len(fetch())
+        db.session.rollback()
+    elapsed = time.perf_counter() - started
+    print(f'{name:<22} {rows / elapsed:>12.0f}')
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='blog-bench-')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        SQLITE_OPTIMIZE_INTERVAL = 0
+        LOG_LEVEL = 'ERROR'
+        SLOW_QUERY_THRESHOLD_MS = None
+        METRICS_MULTIPROCESS_DIR = None
+        RATE_LIMIT_STORAGE_URI = 'memory://'
+        LOG_COMPRESS = False
+        LOG_RETENTION_DAYS = 0
+        LOG_BACKUP_COUNT = 0
+        BCRYPT_LOG_ROUNDS = 4
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        authors = [User(f'benchauthor{i}', f'bench{i}@example.org', 'Bench123!') for i in range(20)]
+        db.session.add_all(authors)
+        db.session.commit()
+        db.session.execute(Post.__table__.insert(), [
+            {'title': f'Post testowy {i}', 'content': 'Treść posta do benchmarku ' * 20,
+             'author_id': authors[i % 20].id, 'is_published': True}
+            for i in range(args.posts)
+        ])
+        db.session.commit()
+
+        def orm_page():
+            posts = Post.query.options(joinedload(Post.author))\
+                .filter_by(is_published=True)\
+                .order_by(Post.created_at.desc())\
+                .limit(args.per_page).all()
+            return [post.to_dict(include_author=True) for post in posts]
+
+        statement = POST_WITH_AUTHOR_ROW.select()\
+            .join(User, User.id == Post.author_id)\
+            .where(Post.is_published.is_(True))\
+            .order_by(Post.created_at.desc())\
+            .limit(args.per_page)
+
+        def read_model_dicts():
+            return POST_WITH_AUTHOR_ROW.dicts(db.session.execute(statement))
+
+        def read_model_records():
+            return POST_WITH_AUTHOR_ROW.records(db.session.execute(statement))
+
+        assert orm_page() == read_model_dicts(), 'model odczytu różni się od to_dict()'
+        db.session.rollback()
+
+        print(f'{"ścieżka":<22} {"wiersze/s":>12}')
+        baseline = run('ORM + to_dict()', orm_page, args.seconds)
+        dicts = run('model odczytu (dict)', read_model_dicts, args.seconds)
+        run('model odczytu (slots)', read_model_records, args.seconds)
+        print(f'przyspieszenie słowników: {dicts / baseline:.1f}x')
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Benchmark: domyślne ustawienia SQLite vs profil produkcyjny (WAL + pragmy + retry)
+
+Wątki piszące tworzą posty przez PostService, wątki czytające pobierają
+stronę publicznych postów. Wynik: przepustowość, błędy blokady, p95 opóźnień.
+
+    python benchmarks/sqlite_tuning.py --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from config import Config
+from database import db, is_lock_error
+from models.user import User
+from services.post_service import PostService
+
+
+def _percentile(values, quantile):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(quantile * len(values)))]
+
+
+def run_scenario(name, tuned, writers, readers, seconds):
+    directory = tempfile.mkdtemp(prefix='blog-bench-')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        SQLITE_PRAGMAS = Config.SQLITE_PRAGMAS if tuned else {}
+        SQLITE_OPTIMIZE_INTERVAL = 0
+        LOG_LEVEL = 'ERROR'
+        SLOW_QUERY_THRESHOLD_MS = None
+        METRICS_MULTIPROCESS_DIR = None
+        RATE_LIMIT_STORAGE_URI = 'memory://'
+        LOG_COMPRESS = False
+        LOG_RETENTION_DAYS = 0
+        LOG_BACKUP_COUNT = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        author = User('benchauthor', 'bench@example.org', 'Bench123!')
+        db.session.add(author)
+        db.session.commit()
+
+    create_post = PostService.create_post if tuned else PostService.create_post.__wrapped__
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {'writes': [], 'reads': [], 'lock_errors': 0}
+
+    def writer():
+        with app.app_context():
+            n = 0
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    create_post(f'Post testowy {n}', 'Treść posta do benchmarku ' * 10, author)
+                except OperationalError as e:
+                    db.session.rollback()
+                    if not is_lock_error(e):
+                        raise
+                    with lock:
+                        results['lock_errors'] += 1
+                    continue
+                with lock:
+                    results['writes'].append(time.perf_counter() - start)
+                n += 1
+
+    def reader():
+        with app.app_context():
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    PostService.get_public_posts(1, 20).items
+                except OperationalError as e:
+                    db.session.rollback()
+                    if not is_lock_error(e):
+                        raise
+                    with lock:
+                        results['lock_errors'] += 1
+                    continue
+                db.session.rollback()
+                with lock:
+                    results['reads'].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+
+    print(f'{name:<10} '
+          f'{len(results["writes"]) / seconds:>9.1f} '
+          f'{len(results["reads"]) / seconds:>9.1f} '
+          f'{results["lock_errors"]:>12} '
+          f'{_percentile(results["writes"], 0.95) * 1000:>12.1f} '
+          f'{_percentile(results["reads"], 0.95) * 1000:>12.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    print(f'{"profil":<10} {"zapisy/s":>9} {"odczyty/s":>9} {"błędy blok.":>12} '
+          f'{"p95 zapis ms":>12} {"p95 odczyt ms":>12}')
+    run_scenario('domyślny', False, args.writers, args.readers, args.seconds)
+    run_scenario('WAL', True, args.writers, args.readers, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,107 +1,242 @@
-"""Konfiguracja aplikacji Flask"""
-import os
-from datetime import timedelta
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Config:
-    """Podstawowa konfiguracja"""
-    
-    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-    
-    # Database - domyślnie SQLite
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///blog.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
-    # JWT - zmienione na cookies
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(
-        seconds=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 900))  # 15 minut
-    )
-    JWT_REFRESH_TOKEN_EXPIRES = timedelta(
-        seconds=int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 604800))  # 7 dni
-    )
-    
-    # ZMIANA: Tokeny w cookies zamiast headers
-    JWT_TOKEN_LOCATION = ['cookies']
-    JWT_ACCESS_COOKIE_NAME = 'access_token'
-    JWT_REFRESH_COOKIE_NAME = 'refresh_token'
-    JWT_COOKIE_SECURE = False  # True tylko w produkcji z HTTPS
-    JWT_COOKIE_CSRF_PROTECT = False  # Dla prostoty
-    JWT_COOKIE_SAMESITE = 'Lax'
-    JWT_COOKIE_PATH = '/'
-    JWT_COOKIE_DOMAIN = None
-    JWT_ACCESS_COOKIE_PATH = '/'  
-    JWT_REFRESH_COOKIE_PATH = '/' 
-    JWT_COOKIE_MAX_AGE = None 
-
-    JWT_SESSION_COOKIE = False #odświeżanie przy każdej odpowiedzi
-    
-    # Bcrypt
-    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
-    
-    # Rate limiting (w pamięci zamiast Redis)
-    RATE_LIMIT = os.environ.get('RATE_LIMIT', '200 per day, 50 per hour')
-    
-    # Security
-    SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
-    SESSION_COOKIE_HTTPONLY = True
-    SESSION_COOKIE_SAMESITE = 'Lax'
-    
-    # Logging
-    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
-
-class DevelopmentConfig(Config):
-    """Konfiguracja deweloperska"""
-    """
-    DEBUG = True
-    SQLALCHEMY_ECHO = False
-    JWT_COOKIE_SECURE = False  # W dev pozwól na HTTP
-    JWT_COOKIE_CSRF_PROTECT = False  # Wyłącz CSRF dla łatwiejszego testowania
-    JWT_REFRESH_JSON_KEY = 'refresh_token' #do odświeżania
-    JWT_ACCESS_JSON_KEY = 'access_token' #do odświeżania
-    JWT_SESSION_COOKIE = False
-    """
-    class DevelopmentConfig(Config):
-        DEBUG = True
-        SQLALCHEMY_ECHO = False
-        JWT_COOKIE_SECURE = False  
-        JWT_COOKIE_CSRF_PROTECT = False  
-        JWT_COOKIE_SAMESITE = 'Lax'  
-        JWT_ACCESS_COOKIE_PATH = '/'  
-        JWT_REFRESH_COOKIE_PATH = '/'  
-        JWT_COOKIE_DOMAIN = None  
-        JWT_SESSION_COOKIE = False  
-    
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
-    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
-    
-    JWT_REFRESH_JSON_KEY = 'refresh_token'  
-    JWT_ACCESS_JSON_KEY = 'access_token'  
-
-class ProductionConfig(Config):
-    """Konfiguracja produkcyjna"""
-    DEBUG = False
-    SESSION_COOKIE_SECURE = True
-    JWT_COOKIE_SECURE = True  # Wymaga HTTPS
-    JWT_COOKIE_HTTPONLY = True
-    JWT_COOKIE_SAMESITE = 'Strict'
-    JWT_COOKIE_CSRF_PROTECT = True  # Włącz CSRF w produkcji
-    JWT_SESSION_COOKIE = False
-
-class TestingConfig(Config):
-    """Konfiguracja testowa"""
-    TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-    WTF_CSRF_ENABLED = False
-    JWT_COOKIE_SECURE = False
-    JWT_COOKIE_CSRF_PROTECT = False
-    JWT_SESSION_COOKIE = False
-
-config = {
-    'development': DevelopmentConfig,
-    'production': ProductionConfig,
-    'testing': TestingConfig,
-    'default': DevelopmentConfig
+"""Konfiguracja aplikacji Flask"""
+import os
+from datetime import timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Config:
+    """Podstawowa konfiguracja"""
+    
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    
+    # Database - domyślnie SQLite
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///blog.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite: pragmy ustawiane na każdym połączeniu (WAL - czytelnicy nie czekają na zapis)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    }
+    # Co ile sekund uruchamiać PRAGMA optimize (0 wyłącza)
+    SQLITE_OPTIMIZE_INTERVAL = int(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', 3600))
+    # Replika do odczytów (domyślnie wyłączona): adres bazy albo 'memory' - kopia całej
+    # bazy SQLite w pamięci każdego procesu (każdego workera gunicorna), tylko dla
+    # małych baz z przewagą odczytów
+    SQLALCHEMY_REPLICA_URI = os.environ.get('SQLALCHEMY_REPLICA_URI') or None
+    # Odświeżanie kopii 'memory' - każde kopiuje całą bazę
+    REPLICA_REFRESH_INTERVAL = float(os.environ.get('REPLICA_REFRESH_INTERVAL', 60))
+    # Starsza kopia 'memory' nie jest używana - odczyty wracają do bazy głównej. Opóźnienia
+    # repliki zewnętrznej aplikacja nie mierzy - wyznacza tylko czas cookie read-your-writes
+    REPLICA_MAX_STALENESS = float(os.environ.get('REPLICA_MAX_STALENESS', 120))
+    # Kolejka zapisów: jeden wątek piszący, kilka transakcji w jednym commicie
+    WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE_ENABLED', 'false').lower() == 'true'
+    WRITE_QUEUE_BATCH_SIZE = int(os.environ.get('WRITE_QUEUE_BATCH_SIZE', 64))
+    # Dodatkowe czekanie na kolejne zapisy przed commitem (0 - partia z tego, co już czeka)
+    WRITE_QUEUE_MAX_DELAY_MS = float(os.environ.get('WRITE_QUEUE_MAX_DELAY_MS', 0))
+    # Zadania w tle (np. usuwanie dużych kont); false - wykonywane od razu
+    JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED', 'true').lower() == 'true'
+    JOB_HISTORY_SIZE = int(os.environ.get('JOB_HISTORY_SIZE', 100))
+    # Wyświetlenia postów: zapis przyrostów co VIEW_FLUSH_INTERVAL s (0 - tylko przy zamknięciu/flush())
+    VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5))
+    # Widz liczony raz na post w oknie (filtr Blooma)
+    VIEW_DEDUP_ENABLED = os.environ.get('VIEW_DEDUP_ENABLED', 'true').lower() == 'true'
+    VIEW_DEDUP_WINDOW = int(os.environ.get('VIEW_DEDUP_WINDOW', 3600))
+    VIEW_DEDUP_CAPACITY = int(os.environ.get('VIEW_DEDUP_CAPACITY', 100000))
+    VIEW_DEDUP_ERROR_RATE = float(os.environ.get('VIEW_DEDUP_ERROR_RATE', 0.01))
+    # Ranking popularnych postów: wagi zdarzeń, półokres wygaszania, zapis do bazy co N s
+    TRENDING_WEIGHTS = {'view': 1.0, 'comment': 5.0}
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 12))
+    TRENDING_PERSIST_INTERVAL = float(os.environ.get('TRENDING_PERSIST_INTERVAL', 30))
+    TRENDING_CAPACITY = int(os.environ.get('TRENDING_CAPACITY', 1000))
+    # Wyniki wygaszone poniżej progu są usuwane z tabeli
+    TRENDING_MIN_SCORE = float(os.environ.get('TRENDING_MIN_SCORE', 0.01))
+    # Statystyki panelu admina: świeże przez TTL s, potem zwracane i odświeżane w tle
+    STATS_CACHE_TTL = float(os.environ.get('STATS_CACHE_TTL', 60))
+    STATS_CACHE_STALE_TTL = float(os.environ.get('STATS_CACHE_STALE_TTL', 600))
+    # Analityka aktywności: cache per zakres dat, wierszy na partię pobieraną do NumPy
+    ANALYTICS_CACHE_TTL = float(os.environ.get('ANALYTICS_CACHE_TTL', 300))
+    ANALYTICS_CACHE_STALE_TTL = float(os.environ.get('ANALYTICS_CACHE_STALE_TTL', 3600))
+    ANALYTICS_CHUNK_SIZE = int(os.environ.get('ANALYTICS_CHUNK_SIZE', 100000))
+    # 'numpy' wymaga pakietu numpy (requirements-dev.txt; bez niego liczy baza i start
+    # aplikacji loguje ostrzeżenie), 'sql' wymusza liczenie w bazie (GROUP BY)
+    ANALYTICS_ENGINE = os.environ.get('ANALYTICS_ENGINE', 'numpy')
+    # Usuwanie kaskadowe: wierszy na transakcję i próg usuwania konta w tle
+    DELETE_CHUNK_SIZE = int(os.environ.get('DELETE_CHUNK_SIZE', 500))
+    DELETE_INLINE_MAX_ROWS = int(os.environ.get('DELETE_INLINE_MAX_ROWS', 2000))
+    
+    # JWT - zmienione na cookies
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(
+        seconds=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 900))  # 15 minut
+    )
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(
+        seconds=int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 604800))  # 7 dni
+    )
+    # Okno łaski po rotacji refresh tokena (równoległe odświeżenia z kilku kart)
+    JWT_REFRESH_GRACE_PERIOD = timedelta(
+        seconds=int(os.environ.get('JWT_REFRESH_GRACE_PERIOD', 10))
+    )
+    
+    # ZMIANA: Tokeny w cookies zamiast headers
+    JWT_TOKEN_LOCATION = ['cookies']
+    JWT_ACCESS_COOKIE_NAME = 'access_token'
+    JWT_REFRESH_COOKIE_NAME = 'refresh_token'
+    JWT_COOKIE_SECURE = False  # True tylko w produkcji z HTTPS
+    JWT_COOKIE_CSRF_PROTECT = False  # Dla prostoty
+    JWT_COOKIE_SAMESITE = 'Lax'
+    JWT_COOKIE_PATH = '/'
+    JWT_COOKIE_DOMAIN = None
+    JWT_ACCESS_COOKIE_PATH = '/'  
+    JWT_REFRESH_COOKIE_PATH = '/' 
+    JWT_COOKIE_MAX_AGE = None 
+
+    JWT_SESSION_COOKIE = False #odświeżanie przy każdej odpowiedzi
+    
+    # Bcrypt
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    
+    # Rate limiting - domyślne limity dla każdej grupy tras (IP + endpoint); wcześniej
+    # '200 per day, 50 per hour' - doszedł limit minutowy (100 per minute)
+    RATE_LIMIT = os.environ.get('RATE_LIMIT', '100 per minute, 50 per hour, 200 per day')
+    # Liczniki wspólne dla wszystkich procesów (ścieżka względna w instance/); backend
+    # SQLite to jeden szeregowany zapis na żądanie - przy błędzie żądanie przechodzi
+    RATE_LIMIT_STORAGE_URI = os.environ.get('RATE_LIMIT_STORAGE_URI', 'sqlite:///ratelimit.db')
+    # Nadpisania limitów dla grup tras (nazwa endpointu Flask -> limit)
+    RATE_LIMIT_ROUTES = {}
+    RATE_LIMIT_EXEMPT = ['/api/health', '/hello', '/', '/web']
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 10000))
+    
+    # Security
+    SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_SAMESITE = 'Lax'
+    
+    # Serializacja JSON odpowiedzi: 'auto' (orjson, jeśli zainstalowany), 'orjson', 'stdlib'
+    JSON_ENGINE = os.environ.get('JSON_ENGINE', 'auto')
+    
+    # Paginacja: per_page przycinany do limitu; ?stream=1 (admin) wysyła całą listę partiami
+    PAGINATION_DEFAULT_PER_PAGE = int(os.environ.get('PAGINATION_DEFAULT_PER_PAGE', 20))
+    PAGINATION_MAX_PER_PAGE = int(os.environ.get('PAGINATION_MAX_PER_PAGE', 100))
+    STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 500))
+    
+    # Kompresja odpowiedzi (gzip, Brotli jeśli zainstalowany)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_MIMETYPES = ['application/json', 'text/html', 'text/plain', 'text/css',
+                          'text/javascript', 'application/javascript', 'image/svg+xml']
+    # benchmarks/compression.py, strona 20 postów: gzip 5 - 7.8x przy 45 MB/s,
+    # gzip 6 - 8.5x przy 18 MB/s; odpowiedzi spoza cache płacą za każdy poziom wyżej
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 5))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    # Cache skompresowanych ciał (klucz: skrót treści); 0 wyłącza
+    COMPRESS_CACHE_ENTRIES = int(os.environ.get('COMPRESS_CACHE_ENTRIES', 128))
+    COMPRESS_CACHE_MAX_BODY = int(os.environ.get('COMPRESS_CACHE_MAX_BODY', 512 * 1024))
+    COMPRESS_CACHE_TTL = float(os.environ.get('COMPRESS_CACHE_TTL', 600))
+    
+    # Logging
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    # Asynchroniczny zapis logów (kolejka + wątek zapisujący partiami)
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', 256))
+    LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL', 0.5))
+    # Rotacja plików logów: okres (month/day/hour) i rozmiar; zrotowane pliki są kompresowane gzip
+    LOG_ROTATION_WHEN = os.environ.get('LOG_ROTATION_WHEN', 'month')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 50 * 1024 * 1024))
+    LOG_COMPRESS = True
+    LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS', 90))
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', 100))
+    # Próbkowanie zdarzeń (nazwa zdarzenia -> ułamek zachowywanych); WARNING+ zawsze zapisywane
+    LOG_SAMPLE_RATES = {
+        'Health check requested': 0.01,
+        'Żądanie HTTP': float(os.environ.get('LOG_HTTP_SAMPLE_RATE', 0.1)),
+        'Odpowiedź HTTP': float(os.environ.get('LOG_HTTP_SAMPLE_RATE', 0.1)),
+        'Request cookies': 0.01,
+    }
+    # Limit zdarzeń o tej samej nazwie na sekundę (0 = bez limitu)
+    LOG_EVENT_RATE = float(os.environ.get('LOG_EVENT_RATE', 50))
+    LOG_EVENT_BURST = int(os.environ.get('LOG_EVENT_BURST', 200))
+    
+    # Metryki - migawki per proces łączone przy odczycie (ścieżka względna w instance/)
+    METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR', 'metrics')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    
+    # Profilowanie żądań na życzenie admina (X-Profile: 1 lub ?__profile=1)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+    
+    # Log wolnych zapytań SQL z EXPLAIN QUERY PLAN (0 lub pusta wartość wyłącza - bez
+    # nasłuchu zdarzeń na każdym zapytaniu)
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100) or 0) or None
+    SLOW_QUERY_MAX_FINGERPRINTS = int(os.environ.get('SLOW_QUERY_MAX_FINGERPRINTS', 500))
+
+class DevelopmentConfig(Config):
+    """Konfiguracja deweloperska"""
+    """
+    DEBUG = True
+    SQLALCHEMY_ECHO = False
+    JWT_COOKIE_SECURE = False  # W dev pozwól na HTTP
+    JWT_COOKIE_CSRF_PROTECT = False  # Wyłącz CSRF dla łatwiejszego testowania
+    JWT_REFRESH_JSON_KEY = 'refresh_token' #do odświeżania
+    JWT_ACCESS_JSON_KEY = 'access_token' #do odświeżania
+    JWT_SESSION_COOKIE = False
+    """
+    class DevelopmentConfig(Config):
+        DEBUG = True
+        SQLALCHEMY_ECHO = False
+        JWT_COOKIE_SECURE = False  
+        JWT_COOKIE_CSRF_PROTECT = False  
+        JWT_COOKIE_SAMESITE = 'Lax'  
+        JWT_ACCESS_COOKIE_PATH = '/'  
+        JWT_REFRESH_COOKIE_PATH = '/'  
+        JWT_COOKIE_DOMAIN = None  
+        JWT_SESSION_COOKIE = False  
+    
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+    
+    JWT_REFRESH_JSON_KEY = 'refresh_token'  
+    JWT_ACCESS_JSON_KEY = 'access_token'  
+
+class ProductionConfig(Config):
+    """Konfiguracja produkcyjna"""
+    DEBUG = False
+    SESSION_COOKIE_SECURE = True
+    JWT_COOKIE_SECURE = True  # Wymaga HTTPS
+    JWT_COOKIE_HTTPONLY = True
+    JWT_COOKIE_SAMESITE = 'Strict'
+    JWT_COOKIE_CSRF_PROTECT = True  # Włącz CSRF w produkcji
+    JWT_SESSION_COOKIE = False
+
+class TestingConfig(Config):
+    """Konfiguracja testowa"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    RATE_LIMIT_STORAGE_URI = 'memory://'
+    METRICS_MULTIPROCESS_DIR = None
+    SQLALCHEMY_REPLICA_URI = None
+    JOB_QUEUE_ENABLED = False
+    VIEW_FLUSH_INTERVAL = 0
+    TRENDING_PERSIST_INTERVAL = 0
+    STATS_CACHE_STALE_TTL = 0
+    ANALYTICS_CACHE_STALE_TTL = 0
+    # Testy nie kompresują ani nie usuwają istniejących plików w logs/
+    LOG_COMPRESS = False
+    LOG_RETENTION_DAYS = 0
+    LOG_BACKUP_COUNT = 0
+    WTF_CSRF_ENABLED = False
+    JWT_COOKIE_SECURE = False
+    JWT_COOKIE_CSRF_PROTECT = False
+    JWT_SESSION_COOKIE = False
+
+config = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+    'default': DevelopmentConfig
 }
\ No newline at end of file
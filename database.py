@@ -1,11 +1,377 @@
-"""
-Konfiguracja bazy danych SQLAlchemy
-"""
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
-
-class Base(DeclarativeBase):
-    """Base class dla wszystkich modeli"""
-    pass
-
-db = SQLAlchemy(model_class=Base)
\ No newline at end of file
+"""
+Konfiguracja bazy danych SQLAlchemy
+"""
+import contextvars
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session, _app_ctx_id
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class Base(DeclarativeBase):
+    """Base class dla wszystkich modeli"""
+    pass
+
+# Cookie kierujące odczyty klienta do bazy głównej po jego zapisie (read-your-writes)
+READ_PRIMARY_COOKIE = 'read_primary'
+
+# Blok read_replica() z aktywną repliką - db.session zwraca wtedy osobną sesję repliki
+_replica_scope = contextvars.ContextVar('db_replica_scope', default=False)
+
+def _session_scope():
+    """
+    Zakres db.session: kontekst aplikacji, a w nim osobne sesje dla bazy głównej
+    i repliki - obiekty z repliki nie trafiają do mapy tożsamości bazy głównej
+    """
+    return _app_ctx_id(), _replica_scope.get()
+
+class RoutingSession(Session):
+    """
+    Sesja kierująca zapytania do silnika z info['replica_engine'] (sesja repliki).
+    Flush (zapisy) zawsze trafia do bazy głównej.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica_engine = self.info.get('replica_engine')
+        if replica_engine is not None and bind is None and not self._flushing:
+            return replica_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_wrote(session, flush_context):
+    session.info['wrote'] = True
+    if has_request_context():
+        g.db_wrote = True
+
+# expire_on_commit=False - po commicie obiekt nie jest ponownie czytany z bazy
+# (sesja żyje tylko w obrębie żądania, a zapisane wartości są już w obiekcie)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession, 'expire_on_commit': False,
+                                                   'scopefunc': _session_scope})
+
+def _apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+def configure_sqlite(app):
+    """
+    Pragmy SQLite ustawiane na każdym nowym połączeniu (WAL, synchronous, cache,
+    mmap, busy_timeout) oraz okresowe PRAGMA optimize przy zwrocie połączenia do puli.
+    Dla innych baz nic nie robi.
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS', {}))
+    if engine.url.database in (None, '', ':memory:'):
+        pragmas.pop('journal_mode', None)  # WAL nie dotyczy bazy w pamięci
+    optimize_interval = app.config.get('SQLITE_OPTIMIZE_INTERVAL', 3600)
+    state = {'last_optimize': time.monotonic()}
+    optimize_lock = threading.Lock()
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            _apply_pragmas(dbapi_connection, pragmas)
+
+    @event.listens_for(engine, 'checkin')
+    def optimize_periodically(dbapi_connection, connection_record):
+        if not optimize_interval or dbapi_connection is None:
+            return
+        now = time.monotonic()
+        if now - state['last_optimize'] < optimize_interval or not optimize_lock.acquire(blocking=False):
+            return
+        try:
+            state['last_optimize'] = now
+            dbapi_connection.execute('PRAGMA optimize')
+            logger.info("Wykonano PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning("PRAGMA optimize nie powiodło się", error=str(e))
+        finally:
+            optimize_lock.release()
+
+def is_lock_error(error):
+    """Czy błąd to chwilowa blokada SQLite ('database is locked' / 'busy')"""
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+def retry_on_lock(max_attempts=5, base_delay=0.05, max_delay=1.0):
+    """
+    Dekorator ponawiający operację zapisu po błędzie blokady SQLite
+    (wycofanie sesji, wykładnicze opóźnienie z losowym rozrzutem)
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return f(*args, **kwargs)
+                except OperationalError as e:
+                    if not is_lock_error(e) or attempt == max_attempts:
+                        raise
+                    db.session.rollback()
+                    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    logger.warning("Baza zablokowana - ponawiam operację",
+                                   operation=f.__qualname__, attempt=attempt,
+                                   delay_ms=round(delay * 1000))
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+class SQLiteMemoryReplica:
+    """
+    Replika bazy SQLite w pamięci, odświeżana w tle przez backup API.
+
+    Każde odświeżenie tworzy nową bazę w pamięci (shared cache) i podmienia
+    silnik, więc trwające odczyty ze starej kopii nie są blokowane.
+    """
+
+    def __init__(self, primary_path, refresh_interval=60.0, max_staleness=120.0):
+        self.primary_path = primary_path
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.engine = None
+        self.refreshed_at = None
+        self._holder = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Po fork() wątek odświeżający i połączenia rodzica nie są dziedziczone
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.engine, self._holder, self.refreshed_at = None, None, None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='db-replica-refresh', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Odświeżenie repliki nie powiodło się", error=str(e))
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    def refresh(self):
+        """Skopiuj bazę główną do nowej bazy w pamięci i podmień silnik"""
+        with self._refresh_lock:
+            self._refresh()
+
+    def _refresh(self):
+        started = time.monotonic()
+        self._generation += 1
+        uri = f'file:blog_replica_{os.getpid()}_{id(self)}_{self._generation}?mode=memory&cache=shared'
+        holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(f'file:{self.primary_path}?mode=ro', uri=True)
+        try:
+            source.backup(holder)
+        except Exception:
+            holder.close()
+            raise
+        finally:
+            source.close()
+
+        def connect():
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            connection.execute('PRAGMA query_only=1')
+            return connection
+
+        engine = create_engine('sqlite://', creator=connect, poolclass=NullPool)
+        with self._lock:
+            old_engine, old_holder = self.engine, self._holder
+            self.engine, self._holder = engine, holder
+            self.refreshed_at = started
+        if old_engine is not None:
+            old_engine.dispose()
+            old_holder.close()
+
+    def staleness(self):
+        """Wiek kopii w sekundach (None - jeszcze nie skopiowano)"""
+        if self.refreshed_at is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    def current_engine(self):
+        """Silnik repliki lub None, gdy kopia jest starsza niż max_staleness"""
+        self._ensure_started()
+        staleness = self.staleness()
+        if staleness is None or staleness > self.max_staleness:
+            return None
+        return self.engine
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+class ExternalReplica:
+    """
+    Replika pod osobnym adresem bazy (opóźnienie replikacji poza kontrolą aplikacji).
+
+    Aplikacja nie mierzy jej opóźnienia: nie ma metryki
+    blog_db_replica_staleness_seconds, a REPLICA_MAX_STALENESS nie wyłącza
+    repliki - wyznacza tylko czas cookie read-your-writes, więc powinien być
+    większy niż maksymalne opóźnienie replikacji (monitorowane po stronie bazy).
+    """
+
+    def __init__(self, uri):
+        self.engine = create_engine(uri)
+
+    def staleness(self):
+        """Opóźnienie nieznane - zawsze None"""
+        return None
+
+    def current_engine(self):
+        return self.engine
+
+    def stop(self):
+        self.engine.dispose()
+
+def reset_engines_after_fork(app):
+    """
+    Po fork() porzuć połączenia odziedziczone z puli rodzica bez ich zamykania
+    (gniazda i pliki nadal należą do rodzica) - potomek otworzy własne
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    replica = app.extensions.get('db_replica')
+    if isinstance(replica, ExternalReplica):
+        replica.engine.dispose(close=False)
+
+def configure_replica(app):
+    """
+    Replika do odczytów (SQLALCHEMY_REPLICA_URI, domyślnie wyłączona):
+    - None - wszystkie zapytania do bazy głównej
+    - adres bazy - osobny silnik (np. replika PostgreSQL); bez pomiaru opóźnienia,
+      ochrona REPLICA_MAX_STALENESS działa tylko dla 'memory'
+    - 'memory' (opcjonalnie) - kopia całej bazy SQLite w pamięci procesu,
+      odświeżana co REPLICA_REFRESH_INTERVAL s; przy wielu workerach to jedna
+      kopia na worker
+    """
+    from utils.metrics import registry
+
+    replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    replica = None
+    if replica_uri == 'memory':
+        with app.app_context():
+            url = db.engine.url
+        if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+            logger.warning("Replika w pamięci wymaga bazy SQLite w pliku - wyłączona")
+        else:
+            replica = SQLiteMemoryReplica(
+                url.database,
+                refresh_interval=app.config.get('REPLICA_REFRESH_INTERVAL', 60.0),
+                max_staleness=app.config.get('REPLICA_MAX_STALENESS', 120.0)
+            )
+    elif replica_uri:
+        replica = ExternalReplica(replica_uri)
+        logger.info("Replika zewnętrzna - opóźnienie replikacji nie jest mierzone",
+                    read_primary_after_write_s=app.config.get('REPLICA_MAX_STALENESS', 120.0))
+    app.extensions['db_replica'] = replica
+    if replica is None:
+        return
+    app.teardown_appcontext(remove_replica_session)
+
+    def replica_collector():
+        staleness = replica.staleness()
+        if staleness is None:
+            return []
+        return [('blog_db_replica_staleness_seconds', None, staleness, 'gauge')]
+    registry.register_collector(replica_collector)
+
+    @app.after_request
+    def remember_write(response):
+        # Klient, który właśnie zapisał, czyta z bazy głównej do czasu odświeżenia repliki
+        if g.get('db_wrote'):
+            response.set_cookie(READ_PRIMARY_COOKIE, '1', httponly=True, samesite='Lax',
+                                max_age=int(app.config.get('REPLICA_MAX_STALENESS', 120.0)) + 1)
+        return response
+
+@contextmanager
+def read_replica():
+    """
+    Zapytania w bloku trafiają do repliki, o ile:
+    replika jest skonfigurowana i dość świeża, sesja nie ma niezapisanych ani
+    zapisanych w tym żądaniu zmian, a klient nie ma cookie read-your-writes.
+
+    Odczyty z repliki idą przez osobną sesję (do końca kontekstu aplikacji):
+    późniejsze Post.find_by_id() w zapisie dostaje obiekt z bazy głównej, a leniwe
+    ładowanie relacji obiektów z repliki po wyjściu z bloku nadal czyta z repliki.
+    Obiekty z repliki są tylko do odczytu - ich zmiany nie są zapisywane.
+    """
+    from utils.metrics import registry
+
+    if _replica_scope.get():
+        yield
+        return
+
+    session = db.session()
+    replica = current_app.extensions.get('db_replica')
+
+    engine = None
+    if replica is not None and not (session.new or session.dirty or session.deleted) \
+            and not session.info.get('wrote') \
+            and not (has_request_context() and request.cookies.get(READ_PRIMARY_COOKIE)):
+        engine = replica.current_engine()
+    if replica is not None:
+        registry.inc('blog_db_reads_total', {'target': 'replica' if engine is not None else 'primary'})
+    if engine is None:
+        yield
+        return
+
+    token = _replica_scope.set(True)
+    try:
+        db.session().info['replica_engine'] = engine
+        yield
+    finally:
+        _replica_scope.reset(token)
+
+def remove_replica_session(exc=None):
+    """Zamknij sesję repliki na końcu kontekstu aplikacji (bazową zamyka Flask-SQLAlchemy)"""
+    token = _replica_scope.set(True)
+    try:
+        db.session.remove()
+    finally:
+        _replica_scope.reset(token)
+
+def read_only(f):
+    """
+    Dekorator metod serwisów tylko do odczytu - zapytania przez read_replica().
+    Stosowany do wszystkich list i odczytów, także panelu admina: klient, który
+    właśnie zapisał, ma cookie read-your-writes i i tak czyta z bazy głównej.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        with read_replica():
+            return f(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,79 @@
+"""
+Konfiguracja gunicorn (produkcja, Linux)
+
+Aplikacja wczytywana jest raz w procesie nadrzędnym (preload_app), a workery
+powstają przez fork() i dzielą jej pamięć w trybie copy-on-write. Żeby strony
+nie kopiowały się przy pierwszym przebiegu GC w workerze (zapis nagłówków
+obiektów), GC jest wyłączony podczas wczytywania, a obiekty aplikacji trafiają
+do generacji stałej (gc.freeze) - ani proces nadrzędny, ani workery ich nie
+skanują. Proces nadrzędny po wczytaniu aplikacji ma GC z powrotem włączony.
+
+Workery są recyklingowane po max_requests żądaniach (z losowym rozrzutem, by
+nie restartowały się naraz), co ogranicza wzrost pamięci. Przy zamknięciu
+worker zapisuje bufory (wyświetlenia, ranking, kolejki zadań i zapisów,
+metryki, logi) - patrz shutdown_app.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import gc
+import os
+
+from database import reset_engines_after_fork
+
+
+def _cpu_count():
+    """Liczba CPU dostępnych dla procesu (z uwzględnieniem affinity/cgroup cpuset)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Wyłączony do czasu zamrożenia obiektów aplikacji - patrz when_ready
+gc.disable()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+preload_app = True
+
+# Wątki obsługują oczekiwanie na SQLite i sieć, procesy - CPU (GIL)
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', _cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Logi aplikacji idą przez structlog; gunicorn tylko własne komunikaty
+accesslog = None
+errorlog = '-'
+
+
+def when_ready(server):
+    # Aplikacja wczytana (preload), workery jeszcze nie uruchomione
+    gc.freeze()
+    gc.enable()
+
+
+def pre_fork(server, worker):
+    # Obiekty utworzone w procesie nadrzędnym od poprzedniego forka
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    reset_engines_after_fork(app)
+
+
+def worker_exit(server, worker):
+    from app import shutdown_app
+    from wsgi import app
+    shutdown_app(app)
+
+
+def on_exit(server):
+    from utils.logger import shutdown_logging
+    shutdown_logging()
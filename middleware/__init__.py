@@ -1,7 +1,11 @@
-"""
-Middleware package
-"""
-from .rate_limiter import setup_rate_limiting
-from .security_headers import setup_security_headers
-
-__all__ = ['setup_rate_limiting', 'setup_security_headers']
\ No newline at end of file
+"""
+Middleware package
+"""
+from .compression import setup_compression
+from .metrics import setup_metrics
+from .profiler import setup_profiling
+from .slow_query_log import setup_slow_query_log
+from .security_headers import setup_security_headers
+
+__all__ = ['setup_compression', 'setup_metrics', 'setup_profiling', 'setup_security_headers',
+           'setup_slow_query_log']
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Middleware kompresji odpowiedzi (gzip, Brotli jeśli zainstalowany)
+
+Kompresowane są tylko odpowiedzi tekstowe (COMPRESS_MIMETYPES) o rozmiarze
+co najmniej COMPRESS_MIN_SIZE bajtów - obrazy i archiwa są już skompresowane,
+a małe ciała zyskują mniej niż kosztuje kompresja i nagłówki.
+
+Skompresowane ciało trafia do cache kluczowanego skrótem treści i kodowaniem:
+ta sama strona listy postów czy ten sam post serwowany wielu klientom
+kompresowany jest raz, a kolejne żądania płacą tylko za blake2b (~1 GB/s).
+"""
+import hashlib
+import zlib
+from flask import request
+import structlog
+
+from utils.cache import TTLCache
+from utils.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # Brotli opcjonalny - tylko gzip
+    brotli = None
+
+logger = structlog.get_logger(__name__)
+
+
+def gzip_compress(data, level=5):
+    """Format gzip przez zlib (wbits=31) - bez narzutu modułu gzip, mtime=0"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def choose_encoding(accept_encodings, available):
+    """Najlepsze kodowanie z available akceptowane przez klienta (None - bez kompresji)"""
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def setup_compression(app):
+    """
+    Konfiguracja kompresji odpowiedzi
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    mimetypes = frozenset(app.config.get('COMPRESS_MIMETYPES', ['application/json']))
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 5)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 5)
+    max_cached = app.config.get('COMPRESS_CACHE_MAX_BODY', 512 * 1024)
+
+    compressors = {'gzip': lambda data: gzip_compress(data, gzip_level)}
+    if brotli is not None:
+        # Pierwszeństwo przy równej jakości z Accept-Encoding
+        compressors = {'br': lambda data: brotli.compress(data, quality=brotli_quality), **compressors}
+
+    cache = None
+    if app.config.get('COMPRESS_CACHE_ENTRIES', 128):
+        # Klucz to skrót treści - wpis nigdy nie jest nieaktualny, TTL tylko zwalnia pamięć
+        cache = TTLCache('compressed_responses', ttl=app.config.get('COMPRESS_CACHE_TTL', 600),
+                         max_entries=app.config['COMPRESS_CACHE_ENTRIES'])
+    app.extensions['compression_cache'] = cache
+
+    def compress(data, encoding):
+        compressed = compressors[encoding](data)
+        registry.inc('blog_http_compression_bytes_total', {'encoding': encoding, 'stage': 'raw'}, len(data))
+        registry.inc('blog_http_compression_bytes_total', {'encoding': encoding, 'stage': 'compressed'},
+                     len(compressed))
+        return compressed
+
+    @app.after_request
+    def compress_response(response):
+        if response.direct_passthrough or response.is_streamed \
+                or response.status_code < 200 or response.status_code in (204, 206, 304) \
+                or 'Content-Encoding' in response.headers \
+                or response.mimetype not in mimetypes:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings, compressors)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        if cache is not None and len(data) <= max_cached:
+            key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+            compressed = cache.get(key, lambda: compress(data, encoding))
+        else:
+            compressed = compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    logger.info("Kompresja odpowiedzi skonfigurowana",
+                encodings=list(compressors), min_size=min_size, gzip_level=gzip_level)
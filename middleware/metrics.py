@@ -0,0 +1,137 @@
+"""
+Middleware instrumentacji: czas żądań, zapytania SQL, nagłówek Server-Timing
+"""
+import os
+import time
+from flask import request, g, current_app, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import structlog
+
+from utils.metrics import (
+    registry, MultiProcessStore, merge_snapshots, render_prometheus,
+    register_atexit_flush, QUERY_COUNT_BUCKETS
+)
+
+logger = structlog.get_logger(__name__)
+
+_engine_listeners_installed = False
+
+def _install_engine_listeners():
+    """
+    Nasłuch zdarzeń SQLAlchemy dla wszystkich silników (raz na proces)
+    """
+    global _engine_listeners_installed
+    if _engine_listeners_installed:
+        return
+    _engine_listeners_installed = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_start_time')
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        registry.inc('blog_db_queries_total')
+        registry.inc('blog_db_query_seconds_total', value=duration)
+        if has_request_context():
+            g.db_queries = g.get('db_queries', 0) + 1
+            g.db_time = g.get('db_time', 0.0) + duration
+
+    @event.listens_for(Engine, 'handle_error')
+    def _discard_query_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_start_time'):
+            conn.info['query_start_time'].pop()
+
+def _pool_collector():
+    """Stan puli połączeń (gauge)"""
+    if not has_app_context():
+        return []
+    from database import db
+    pool = db.engine.pool
+    collected = []
+    for name, method in (('blog_db_pool_checked_out', 'checkedout'), ('blog_db_pool_size', 'size')):
+        value = getattr(pool, method, None)
+        if callable(value):
+            collected.append((name, None, value(), 'gauge'))
+    return collected
+
+def _refresh_token_collector():
+    """Liczniki konkurencji przy odświeżaniu tokenów"""
+    from utils.jwt_utils import get_refresh_metrics
+    metrics = get_refresh_metrics()
+    return [('blog_refresh_token_events_total', {'event': name}, metrics[name], 'counter')
+            for name in ('rotations', 'coalesced', 'grace_reuses', 'rejected')]
+
+def collect_metrics():
+    """
+    Metryki wszystkich procesów w formacie tekstowym Prometheus
+    """
+    store = current_app.extensions.get('metrics_store')
+    if store is None:
+        snapshots = [registry.snapshot()]
+    else:
+        store.flush()
+        store.compact()
+        snapshots = store.load_all()
+    return render_prometheus(*merge_snapshots(snapshots))
+
+def setup_metrics(app):
+    """
+    Konfiguracja instrumentacji żądań i bazy danych
+    """
+    _install_engine_listeners()
+    registry.register_collector(_pool_collector)
+    registry.register_collector(_refresh_token_collector)
+
+    store = None
+    directory = app.config.get('METRICS_MULTIPROCESS_DIR')
+    if directory:
+        if not os.path.isabs(directory):
+            directory = os.path.join(app.instance_path, directory)
+        store = MultiProcessStore(directory, app.config.get('METRICS_FLUSH_INTERVAL', 5.0))
+        register_atexit_flush(store)
+    app.extensions['metrics_store'] = store
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+
+        duration = time.perf_counter() - start
+        db_queries = g.get('db_queries', 0)
+        db_time = g.get('db_time', 0.0)
+        endpoint = request.endpoint or 'unmatched'
+
+        registry.inc('blog_http_requests_total', {
+            'endpoint': endpoint,
+            'method': request.method,
+            'status': str(response.status_code)
+        })
+        registry.observe('blog_http_request_duration_seconds', duration, {'endpoint': endpoint})
+        registry.observe('blog_db_queries_per_request', db_queries, {'endpoint': endpoint},
+                         buckets=QUERY_COUNT_BUCKETS)
+        registry.observe('blog_db_time_per_request_seconds', db_time, {'endpoint': endpoint})
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={db_time * 1000:.1f};desc="{db_queries} queries"'
+        )
+
+        if store is not None:
+            store.maybe_flush()
+        return response
+
+    logger.info("Metryki skonfigurowane", multiprocess_dir=directory)
@@ -0,0 +1,156 @@
+"""
+Profilowanie pojedynczych żądań na życzenie administratora (cProfile)
+
+Profil włącza nagłówek 'X-Profile: 1' lub parametr '?__profile=1', ale tylko
+dla zalogowanego administratora. Bez tego hook kończy się na jednym sprawdzeniu,
+więc zwykłe żądania nie ponoszą kosztu profilera.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from flask import request, g
+from flask_jwt_extended import verify_jwt_in_request
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = '__profile'
+
+# Jeden profil naraz - cProfile i tak spowalnia cały proces
+_profile_lock = threading.Lock()
+
+_SAFE_NAME = re.compile(r'^[\w.\-]+\.prof$')
+
+
+def _profile_requested():
+    return request.headers.get(PROFILE_HEADER) == '1' or request.args.get(PROFILE_PARAM) == '1'
+
+
+def _is_admin():
+    from utils.jwt_utils import get_current_user
+
+    try:
+        verify_jwt_in_request(optional=True)
+        user = get_current_user()
+    except Exception:
+        return False
+    return user is not None and user.role == 'ADMIN'
+
+
+def get_profile_dir(app):
+    directory = app.config.get('PROFILE_DIR', 'profiles')
+    if not os.path.isabs(directory):
+        directory = os.path.join(app.instance_path, directory)
+    return directory
+
+
+def resolve_profile_path(app, name):
+    """Ścieżka do zapisanego profilu lub None (ochrona przed path traversal)"""
+    if not _SAFE_NAME.match(name):
+        return None
+    path = os.path.join(get_profile_dir(app), name)
+    return path if os.path.isfile(path) else None
+
+
+def list_profiles(app):
+    """Zapisane profile od najnowszego"""
+    directory = get_profile_dir(app)
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if not _SAFE_NAME.match(name):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        profiles.append({'name': name, 'size': stat.st_size, 'created_at': stat.st_mtime})
+    profiles.sort(key=lambda profile: profile['created_at'], reverse=True)
+    return profiles
+
+
+def render_profile_text(path, sort='cumulative', limit=50):
+    """Czytelne podsumowanie profilu (pstats)"""
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+def _prune_profiles(directory, max_files):
+    if not max_files:
+        return
+    names = sorted(
+        (name for name in os.listdir(directory) if _SAFE_NAME.match(name)),
+        key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+        reverse=True
+    )
+    for name in names[max_files:]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def setup_profiling(app):
+    """
+    Konfiguracja profilowania żądań na życzenie
+    """
+    if not app.config.get('PROFILING_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_profiler():
+        if not _profile_requested():
+            return
+        if not _is_admin():
+            logger.warning("Żądanie profilu bez uprawnień administratora", path=request.path)
+            return
+        if not _profile_lock.acquire(blocking=False):
+            logger.info("Profil pominięty - inny profil w toku", path=request.path)
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Inne narzędzie profilujące jest już aktywne
+            _profile_lock.release()
+            return
+        g.profiler = profiler
+        g.profiler_start = time.perf_counter()
+
+    @app.after_request
+    def save_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+
+        profiler.disable()
+        try:
+            directory = get_profile_dir(app)
+            os.makedirs(directory, exist_ok=True)
+            endpoint = (request.endpoint or 'unmatched').replace('/', '_')
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}.prof"
+            profiler.dump_stats(os.path.join(directory, name))
+            _prune_profiles(directory, app.config.get('PROFILE_MAX_FILES', 50))
+        finally:
+            _profile_lock.release()
+
+        duration_ms = (time.perf_counter() - g.pop('profiler_start')) * 1000
+        response.headers['X-Profile-Id'] = name
+        logger.info("Zapisano profil żądania",
+                    profile=name, endpoint=request.endpoint, duration_ms=round(duration_ms, 1))
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        # Żądanie przerwane wyjątkiem przed after_request
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
@@ -1,64 +1,361 @@
-"""
-Middleware do ograniczania liczby żądań (rate limiting) 
-"""
-import time
-from flask import request, jsonify, make_response
-import structlog
-
-logger = structlog.get_logger(__name__)
-
-def setup_rate_limiting(app):
-    """
-    Prosty rate limiting bez Redis (dla Windows/development)
-    """
-    # W pamięci przechowujemy licznik żądań
-    request_counts = {}
-    
-    @app.before_request
-    def check_rate_limit():
-        # Endpointy zwolnione z rate limitingu
-        exempt_paths = ['/api/health', '/hello', '/', '/web']
-        if request.path in exempt_paths:
-            return None
-        
-        # Identyfikator klienta (adres IP)
-        client_ip = request.remote_addr or '127.0.0.1'
-        
-        # Klucz: IP + ścieżka
-        key = f"{client_ip}:{request.path}"
-        
-        # Bieżąca minuta (uproszczone okno czasowe)
-        current_minute = int(time.time() / 60)
-        
-        # Inicjalizacja licznika
-        if key not in request_counts:
-            request_counts[key] = {'count': 0, 'minute': current_minute}
-        
-        # Reset licznika jeśli nowa minuta
-        if request_counts[key]['minute'] != current_minute:
-            request_counts[key] = {'count': 0, 'minute': current_minute}
-        
-        # Zwiększ licznik
-        request_counts[key]['count'] += 1
-        
-        # Sprawdź limit (np. 10 żądań na minutę dla login)
-        limit = 10 if '/login' in request.path else 100
-        
-        if request_counts[key]['count'] > limit:
-            logger.warning("Przekroczono limit żądań", 
-                          ip=client_ip, 
-                          path=request.path,
-                          count=request_counts[key]['count'])
-            
-            # POPRAWIONE: Użyj make_response
-            response = make_response(jsonify({
-                'error': 'Too Many Requests',
-                'message': 'Przekroczono dopuszczalną liczbę żądań. Spróbuj ponownie później.',
-                'retry_after': 60
-            }), 429)
-            
-            return response  # Zwróć response z ustawionym statusem
-        
-        return None
-    
-    logger.info("Rate limiting skonfigurowany (w pamięci)")
\ No newline at end of file
+"""
+Middleware do ograniczania liczby żądań (rate limiting)
+
+Jeden silnik limitów dla całej aplikacji. Liczniki (token bucket) trzymane są
+w wymiennym backendzie: w pamięci procesu albo we wspólnym pliku SQLite,
+dzięki czemu limity są poprawne także przy wielu procesach roboczych.
+
+Backend SQLite wykonuje przy każdym żądaniu jeden krótki zapis (BEGIN
+IMMEDIATE) - zapisy wszystkich procesów są szeregowane na jednym pliku.
+Błąd backendu (np. "database is locked" przy dużej współbieżności) nie
+odrzuca żądania: jest logowany, liczony w metryce
+blog_rate_limit_storage_errors_total, a żądanie przechodzi bez limitu.
+"""
+import os
+import re
+import time
+import threading
+import sqlite3
+import zlib
+from collections import OrderedDict
+from flask import request, jsonify, make_response, g, current_app
+import structlog
+
+from utils.metrics import registry
+
+logger = structlog.get_logger(__name__)
+
+_PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+def parse_rate_limit(limit_string):
+    """
+    Parsowanie limitu w formacie "10 per minute" / "10/minute"
+    Zwraca krotkę (liczba_żądań, okres_w_sekundach)
+    """
+    match = re.match(r'^\s*(\d+)\s*(?:per|/)\s*(second|minute|hour|day)s?\s*$',
+                     limit_string or '', re.IGNORECASE)
+    if not match:
+        raise ValueError(f'Nieprawidłowy format limitu: {limit_string!r}')
+    return int(match.group(1)), _PERIODS[match.group(2).lower()]
+
+def parse_rate_limits(limits_string):
+    """
+    Parsowanie listy limitów, np. "200 per day, 50 per hour"
+    """
+    return [parse_rate_limit(part) for part in re.split(r'[,;]', limits_string) if part.strip()]
+
+def _consume(states, limits, now):
+    """
+    Uzupełnij kubełki i pobierz po jednym tokenie z każdego - albo z żadnego.
+    states: lista [tokeny, czas] (lub None dla nowych kubełków), modyfikowana w miejscu
+    Zwraca (dozwolone, limit, pozostało, sekundy_do_resetu) dla najbardziej restrykcyjnego limitu
+    """
+    for i, (limit, period) in enumerate(limits):
+        if states[i] is None:
+            states[i] = [float(limit), now]
+        else:
+            tokens, updated = states[i]
+            states[i] = [min(float(limit), tokens + max(0.0, now - updated) * limit / period), now]
+
+    allowed = all(state[0] >= 1 for state in states)
+    if allowed:
+        for state in states:
+            state[0] -= 1
+
+    tightest = min(range(len(limits)), key=lambda i: states[i][0] / limits[i][0])
+    limit, period = limits[tightest]
+    tokens = states[tightest][0]
+    if allowed:
+        # Czas do pełnego uzupełnienia kubełka
+        reset_after = (limit - tokens) * period / limit
+    else:
+        # Czas do pojawienia się tokena we wszystkich pustych kubełkach
+        reset_after = max((1 - state[0]) * bucket_period / bucket_limit
+                          for state, (bucket_limit, bucket_period) in zip(states, limits)
+                          if state[0] < 1)
+    return allowed, limit, int(tokens), reset_after
+
+
+class _Stripe:
+    """Fragment tablicy kubełków z własną blokadą i kolejnością LRU"""
+    __slots__ = ('lock', 'buckets')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()  # klucz -> lista [tokeny, czas] per limit
+
+
+class MemoryStorage:
+    """
+    Backend w pamięci procesu - blokady rozłożone na fragmenty (lock striping)
+    i twardy limit liczby śledzonych kluczy (wypieranie LRU).
+    Liczy osobno w każdym procesie, więc nadaje się dla jednego workera i testów.
+    """
+
+    def __init__(self, max_keys=10000, stripes=16):
+        self.stripes = [_Stripe() for _ in range(stripes)]
+        self.max_keys_per_stripe = max(1, max_keys // stripes)
+        self.evictions = 0
+
+    def _stripe_for(self, key):
+        return self.stripes[zlib.crc32(key.encode('utf-8')) % len(self.stripes)]
+
+    def hit(self, key, limits, now=None):
+        """Pobierz jeden token dla klucza z każdego z limitów"""
+        now = time.time() if now is None else now
+        stripe = self._stripe_for(key)
+
+        with stripe.lock:
+            states = stripe.buckets.get(key)
+            if states is None or len(states) != len(limits):
+                states = [None] * len(limits)
+                stripe.buckets[key] = states
+                if len(stripe.buckets) > self.max_keys_per_stripe:
+                    stripe.buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                stripe.buckets.move_to_end(key)
+            return _consume(states, limits, now)
+
+    def tracked_keys(self):
+        """Liczba aktualnie śledzonych kluczy"""
+        return sum(len(stripe.buckets) for stripe in self.stripes)
+
+
+class SQLiteStorage:
+    """
+    Backend we wspólnym pliku SQLite - wszystkie procesy robocze widzą te same
+    kubełki. Każda aktualizacja to jedna krótka transakcja BEGIN IMMEDIATE.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+        " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+    )
+
+    def __init__(self, path, max_keys=10000, cleanup_every=1000):
+        self.path = path
+        self.max_keys = max_keys
+        self.cleanup_every = cleanup_every
+        self.evictions = 0
+        self._local = threading.local()
+        self._hits = 0
+        conn = self._connect()
+        conn.execute(self._SCHEMA)
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self):
+        # Połączenie per wątek i per proces (po fork() trzeba otworzyć nowe)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def hit(self, key, limits, now=None):
+        """Pobierz jeden token dla klucza z każdego z limitów (atomowo między procesami)"""
+        now = time.time() if now is None else now
+        bucket_keys = [f"{key}|{limit}/{period}" for limit, period in limits]
+        conn = self._connection()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            placeholders = ','.join('?' * len(bucket_keys))
+            rows = dict((row[0], [row[1], row[2]]) for row in conn.execute(
+                f"SELECT key, tokens, updated FROM rate_limit_buckets WHERE key IN ({placeholders})",
+                bucket_keys))
+            states = [rows.get(bucket_key) for bucket_key in bucket_keys]
+            result = _consume(states, limits, now)
+            conn.executemany(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                [(bucket_key, state[0], state[1]) for bucket_key, state in zip(bucket_keys, states)])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._hits += 1
+        if self._hits % self.cleanup_every == 0:
+            self._cleanup(now)
+        return result
+
+    def _cleanup(self, now):
+        """Usuń pełne (nieaktywne) kubełki i przytnij tabelę do max_keys (LRU)"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("DELETE FROM rate_limit_buckets WHERE updated < ?", (now - 86400,))
+            overflow = conn.execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0] - self.max_keys
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE key IN "
+                    "(SELECT key FROM rate_limit_buckets ORDER BY updated LIMIT ?)", (overflow,))
+                self.evictions += overflow
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def tracked_keys(self):
+        """Liczba aktualnie śledzonych kubełków"""
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+
+
+def create_storage(app):
+    """
+    Utworzenie backendu na podstawie RATE_LIMIT_STORAGE_URI
+    ('memory://' albo 'sqlite:///ścieżka' - ścieżka względna w instance/)
+    """
+    uri = app.config.get('RATE_LIMIT_STORAGE_URI', 'memory://')
+    max_keys = app.config.get('RATE_LIMIT_MAX_KEYS', 10000)
+
+    if uri.startswith('memory://'):
+        return MemoryStorage(max_keys=max_keys, stripes=app.config.get('RATE_LIMIT_STRIPES', 16))
+
+    if uri.startswith('sqlite:///'):
+        path = uri[len('sqlite:///'):]
+        if not os.path.isabs(path):
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, path)
+        return SQLiteStorage(path, max_keys=max_keys)
+
+    raise ValueError(f'Nieobsługiwany backend rate limitingu: {uri}')
+
+
+def _route_group():
+    """
+    Grupa trasy zamiast surowej ścieżki - '/api/posts/1' i '/api/posts/2'
+    trafiają do tego samego kubełka, a nieznane ścieżki do wspólnego 'unmatched'
+    """
+    if request.url_rule is not None:
+        return request.endpoint or request.url_rule.rule
+    return 'unmatched'
+
+
+class RateLimiter:
+    """
+    Silnik rate limitingu - jedyny limiter w aplikacji
+    """
+
+    def __init__(self):
+        self.storage = None
+        self._decorated_limits = {}  # nazwa funkcji widoku -> lista limitów
+
+    def limit(self, limits_string):
+        """
+        Dekorator ustawiający limit dla endpointu (zastępuje limity domyślne)
+        """
+        limits = parse_rate_limits(limits_string)
+
+        def decorator(f):
+            self._decorated_limits[f'{f.__module__}.{f.__qualname__}'] = limits
+            return f
+        return decorator
+
+    def _limits_for(self, group):
+        """Limity dla grupy tras: konfiguracja > dekorator > domyślne"""
+        route_limits = current_app.extensions['rate_limiter_config']
+        if group in route_limits['routes']:
+            return route_limits['routes'][group]
+
+        # Dekoratory z functools.wraps (np. jwt_required) zostawiają __wrapped__
+        view = current_app.view_functions.get(request.endpoint)
+        while view is not None:
+            limits = self._decorated_limits.get(f'{view.__module__}.{view.__qualname__}')
+            if limits:
+                return limits
+            view = getattr(view, '__wrapped__', None)
+
+        return route_limits['default']
+
+    def init_app(self, app):
+        """
+        Rejestracja limitera w aplikacji
+        """
+        self.storage = create_storage(app)
+        app.extensions['rate_limiter'] = self
+        app.extensions['rate_limiter_config'] = {
+            'default': parse_rate_limits(app.config.get('RATE_LIMIT', '100 per minute, 50 per hour, 200 per day')),
+            'routes': {
+                endpoint: parse_rate_limits(limits_string)
+                for endpoint, limits_string in app.config.get('RATE_LIMIT_ROUTES', {}).items()
+            }
+        }
+        exempt_paths = set(app.config.get('RATE_LIMIT_EXEMPT', ['/api/health', '/hello', '/', '/web']))
+        storage = self.storage
+        storage_name = type(storage).__name__
+        # Przy trwałej awarii backendu błąd logowany najwyżej raz na 10 s (liczy go metryka)
+        storage_errors = {'next_log': 0.0, 'suppressed': 0}
+
+        @app.before_request
+        def check_rate_limit():
+            # Endpointy zwolnione z rate limitingu
+            if request.path in exempt_paths:
+                return None
+
+            # Identyfikator klienta (adres IP)
+            client_ip = request.remote_addr or '127.0.0.1'
+
+            # Klucz: IP + grupa trasy
+            group = _route_group()
+            key = f"{client_ip}:{group}"
+
+            try:
+                allowed, limit, remaining, reset_after = storage.hit(key, self._limits_for(group))
+            except Exception as e:
+                # Fail open - awaria liczników nie może zamienić każdego żądania w 500
+                registry.inc('blog_rate_limit_storage_errors_total', {'storage': storage_name})
+                now = time.monotonic()
+                if now >= storage_errors['next_log']:
+                    logger.warning("Błąd backendu limitów - żądanie przepuszczone bez limitu",
+                                   storage=storage_name, error=str(e),
+                                   suppressed=storage_errors['suppressed'])
+                    storage_errors['next_log'] = now + 10
+                    storage_errors['suppressed'] = 0
+                else:
+                    storage_errors['suppressed'] += 1
+                return None
+            g.rate_limit = (limit, remaining, reset_after)
+
+            if not allowed:
+                retry_after = max(1, int(reset_after + 0.999))
+                logger.warning("Przekroczono limit żądań",
+                              ip=client_ip,
+                              path=request.path,
+                              route_group=group)
+
+                response = make_response(jsonify({
+                    'error': 'Too Many Requests',
+                    'message': 'Przekroczono dopuszczalną liczbę żądań. Spróbuj ponownie później.',
+                    'retry_after': retry_after
+                }), 429)
+                response.headers['Retry-After'] = str(retry_after)
+
+                return response
+
+            return None
+
+        @app.after_request
+        def add_rate_limit_headers(response):
+            rate_limit = g.pop('rate_limit', None)
+            if rate_limit is not None:
+                limit, remaining, reset_after = rate_limit
+                response.headers['X-RateLimit-Limit'] = str(limit)
+                response.headers['X-RateLimit-Remaining'] = str(remaining)
+                response.headers['X-RateLimit-Reset'] = str(int(reset_after + 0.999))
+            return response
+
+        logger.info("Rate limiting skonfigurowany",
+                    storage=storage_name)
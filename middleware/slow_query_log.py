@@ -0,0 +1,193 @@
+"""
+Log wolnych zapytań SQL z automatycznym EXPLAIN QUERY PLAN
+
+Zapytania dłuższe niż SLOW_QUERY_THRESHOLD_MS są grupowane po odcisku
+(znormalizowany kształt zapytania) i agregowane w pamięci procesu. Plan
+zapytania pobierany jest raz na odcisk, osobnym kursorem na tym samym połączeniu.
+"""
+import hashlib
+import re
+import threading
+import time
+from flask import request, current_app, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_engine_listeners_installed = False
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_statement(statement):
+    """Kształt zapytania: literały -> ?, listy IN (?, ?, ...) -> IN (...)"""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def fingerprint_statement(statement):
+    return hashlib.sha1(normalize_statement(statement).encode('utf-8')).hexdigest()[:12]
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return f'<str:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact_parameters(parameters):
+    """Parametry bez treści tekstowych (hasła, e-maile, tokeny) - zostają typy i długości"""
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+class SlowQueryLog:
+    """
+    Agregacja wolnych zapytań per odcisk (bezpieczna wątkowo, ograniczona rozmiarem)
+    """
+
+    def __init__(self, threshold_ms=100, max_fingerprints=500, max_endpoints=10):
+        self.threshold = threshold_ms / 1000.0
+        self.max_fingerprints = max_fingerprints
+        self.max_endpoints = max_endpoints
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def needs_plan(self, fingerprint):
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            return entry is None or entry['plan'] is None
+
+    def record(self, statement, parameters, duration, endpoint, plan=None):
+        fingerprint = fingerprint_statement(statement)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # Usuń odcisk o najmniejszym łącznym czasie
+                    del self._entries[min(self._entries, key=lambda key: self._entries[key]['total_time'])]
+                entry = self._entries[fingerprint] = {
+                    'fingerprint': fingerprint,
+                    'statement': normalize_statement(statement),
+                    'count': 0,
+                    'total_time': 0.0,
+                    'max_time': 0.0,
+                    'endpoints': {},
+                    'plan': None,
+                    'last_parameters': None,
+                    'last_seen': None
+                }
+            entry['count'] += 1
+            entry['total_time'] += duration
+            entry['max_time'] = max(entry['max_time'], duration)
+            entry['last_parameters'] = redact_parameters(parameters)
+            entry['last_seen'] = now
+            if plan is not None:
+                entry['plan'] = plan
+            endpoints = entry['endpoints']
+            if endpoint in endpoints or len(endpoints) < self.max_endpoints:
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + 1
+        return fingerprint
+
+    def top(self, sort='total_time', limit=20):
+        """Najbardziej kosztowne odciski (sort: total_time, max_time, count)"""
+        with self._lock:
+            entries = [dict(entry, endpoints=dict(entry['endpoints'])) for entry in self._entries.values()]
+        entries.sort(key=lambda entry: entry[sort], reverse=True)
+        for entry in entries:
+            entry['total_time_ms'] = round(entry.pop('total_time') * 1000, 2)
+            entry['max_time_ms'] = round(entry.pop('max_time') * 1000, 2)
+            entry['avg_time_ms'] = round(entry['total_time_ms'] / entry['count'], 2)
+        return entries[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _explain(conn, statement, parameters):
+    """EXPLAIN QUERY PLAN osobnym kursorem (kursor zapytania trzyma jego wyniki)"""
+    if conn.dialect.name != 'sqlite' or not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f'EXPLAIN niedostępny: {e}']
+    finally:
+        cursor.close()
+
+
+def _install_engine_listeners():
+    """
+    Nasłuch zdarzeń SQLAlchemy dla wszystkich silników (raz na proces)
+    """
+    global _engine_listeners_installed
+    if _engine_listeners_installed:
+        return
+    _engine_listeners_installed = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _check_slow(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('slow_query_start')
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if not has_app_context():
+            return
+        slow_log = current_app.extensions.get('slow_query_log')
+        if slow_log is None or duration < slow_log.threshold:
+            return
+
+        endpoint = (request.endpoint or 'unmatched') if has_request_context() else 'cli'
+        plan = None
+        if not executemany and slow_log.needs_plan(fingerprint_statement(statement)):
+            plan = _explain(conn, statement, parameters)
+        fingerprint = slow_log.record(statement, parameters, duration, endpoint, plan)
+
+        logger.warning("Wolne zapytanie SQL",
+                       fingerprint=fingerprint,
+                       duration_ms=round(duration * 1000, 2),
+                       endpoint=endpoint,
+                       statement=normalize_statement(statement)[:500])
+
+    @event.listens_for(Engine, 'handle_error')
+    def _discard_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('slow_query_start'):
+            conn.info['slow_query_start'].pop()
+
+
+def setup_slow_query_log(app):
+    """
+    Konfiguracja logu wolnych zapytań (SLOW_QUERY_THRESHOLD_MS = None lub 0 wyłącza -
+    nasłuch zdarzeń silnika nie jest wtedy rejestrowany)
+    """
+    threshold_ms = app.config.get('SLOW_QUERY_THRESHOLD_MS')
+    if not threshold_ms:
+        app.extensions['slow_query_log'] = None
+        return
+
+    _install_engine_listeners()
+    app.extensions['slow_query_log'] = SlowQueryLog(
+        threshold_ms=threshold_ms,
+        max_fingerprints=app.config.get('SLOW_QUERY_MAX_FINGERPRINTS', 500)
+    )
@@ -1,43 +1,80 @@
-"""
-Migracje bazy danych (analogiczne do Flyway)
-"""
-import os
-from datetime import datetime
-from database import db
-from models.comment import Comment
-import structlog
-
-logger = structlog.get_logger(__name__)
-
-def run_migrations():
-    """
-    Uruchom migracje bazy danych
-    """
-    try:
-        # Utwórz tabele
-        from models.user import User
-        from models.post import Post
-        from models.comment import Comment
-
-        db.create_all()
-        
-        # Sprawdź czy istnieje admin
-        admin = User.find_by_username('admin')
-        if not admin:
-            # Utwórz domyślnego admina
-            admin_user = User(
-                username='admin',
-                email='admin@blog.platform',
-                password='Admin123!',  # Hasło do zmiany po pierwszym logowaniu
-                role='ADMIN'
-            )
-            db.session.add(admin_user)
-            db.session.commit()
-            
-            logger.info("Utworzono domyślnego użytkownika admin", user_id=admin_user.id)
-        
-        logger.info("Migracje zakończone pomyślnie")
-        
-    except Exception as e:
-        logger.error("Błąd migracji", error=str(e))
-        raise
\ No newline at end of file
+"""
+Migracje bazy danych (analogiczne do Flyway)
+"""
+import os
+from datetime import datetime
+from sqlalchemy import inspect, text
+from database import db
+from models.comment import Comment
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+def run_migrations():
+    """
+    Uruchom migracje bazy danych
+    """
+    try:
+        # Utwórz tabele
+        from models.user import User
+        from models.post import Post
+        from models.comment import Comment
+        from models.trending import PostTrendingScore
+        from models.author_stats import AuthorStats
+
+        db.create_all()
+        # create_all nie dodaje nowych kolumn ani indeksów do istniejących tabel
+        _add_missing_columns()
+        _create_missing_indexes()
+        
+        # Sprawdź czy istnieje admin
+        admin = User.find_by_username('admin')
+        if not admin:
+            # Utwórz domyślnego admina
+            admin_user = User(
+                username='admin',
+                email='admin@blog.platform',
+                password='Admin123!',  # Hasło do zmiany po pierwszym logowaniu
+                role='ADMIN'
+            )
+            db.session.add(admin_user)
+            db.session.commit()
+            
+            logger.info("Utworzono domyślnego użytkownika admin", user_id=admin_user.id)
+        
+        logger.info("Migracje zakończone pomyślnie")
+        
+    except Exception as e:
+        logger.error("Błąd migracji", error=str(e))
+        raise
+
+def _add_missing_columns():
+    """
+    Dodaj kolumny zdefiniowane w modelach, których brakuje w istniejących tabelach
+    (kolumny NOT NULL muszą mieć wartość domyślną po stronie bazy)
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(db.engine.dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT '{column.server_default.arg}'"
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+                connection.execute(text(ddl))
+                logger.info("Dodano kolumnę", table=table.name, column=column.name)
+
+def _create_missing_indexes():
+    """
+    Utwórz indeksy zdefiniowane w modelach, których brakuje w bazie
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
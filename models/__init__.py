@@ -1,7 +1,9 @@
-"""
-Package dla modeli bazy danych
-"""
-from .user import User
-from .post import Post
-from .comment import Comment
-__all__ = ['User', 'Post', 'Comment']
\ No newline at end of file
+"""
+Package dla modeli bazy danych
+"""
+from .user import User
+from .post import Post
+from .comment import Comment
+from .trending import PostTrendingScore
+from .author_stats import AuthorStats
+__all__ = ['User', 'Post', 'Comment', 'PostTrendingScore', 'AuthorStats']
\ No newline at end of file
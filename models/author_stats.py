@@ -0,0 +1,41 @@
+"""
+Model zmaterializowanych statystyk autora
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from database import db
+
+class AuthorStats(db.Model):
+    """
+    Statystyki autora utrzymywane przy zapisach postów i komentarzy
+    (AuthorStatsService); pełne przeliczenie: flask reconcile-author-stats
+    """
+    __tablename__ = 'author_stats'
+    __table_args__ = (
+        # Ranking najaktywniejszych autorów w panelu administratora
+        Index('ix_author_stats_post_count', 'post_count'),
+    )
+    
+    author_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    post_count = Column(Integer, default=0, server_default='0', nullable=False)
+    published_count = Column(Integer, default=0, server_default='0', nullable=False)
+    comments_received = Column(Integer, default=0, server_default='0', nullable=False)
+    last_post_at = Column(DateTime)
+    
+    @staticmethod
+    def empty_dict():
+        """Statystyki autora bez postów i komentarzy (brak wiersza)"""
+        return {
+            'post_count': 0,
+            'published_count': 0,
+            'comments_received': 0,
+            'last_post_at': None
+        }
+    
+    def to_dict(self):
+        """Konwersja do słownika"""
+        return {
+            'post_count': self.post_count,
+            'published_count': self.published_count,
+            'comments_received': self.comments_received,
+            'last_post_at': self.last_post_at
+        }
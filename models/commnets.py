@@ -1,19 +1,19 @@
-"""
-Model komentarza
-"""
-from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from database import db
-
-class Comment(db.Model):
-    __tablename__ = 'comments'
-    
-    id = Column(Integer, primary_key=True)
-    content = Column(Text, nullable=False)
-    author_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    post_id = Column(Integer, ForeignKey('posts.id'), nullable=False)
-    #created_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-
-    author = db.relationship('User', backref='comments')
+"""
+Model komentarza
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from database import db
+
+class Comment(db.Model):
+    __tablename__ = 'comments'
+    
+    id = Column(Integer, primary_key=True)
+    content = Column(Text, nullable=False)
+    author_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    post_id = Column(Integer, ForeignKey('posts.id'), nullable=False)
+    #created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    author = db.relationship('User', backref='comments')
     post = db.relationship('Post', backref='comments')
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Modele odczytu list (read models)
+
+Listy tylko do odczytu nie potrzebują obiektów ORM: mapy tożsamości,
+instrumentacji atrybutów ani @validates - obiekt powstaje tylko po to, by
+wywołać to_dict() i zostać wyrzucony. ReadModel wybiera tylko potrzebne
+kolumny, a wiersze (krotki) zamienia na słowniki funkcją generowaną raz per
+zestaw pól: słownik-literał z indeksami pozycyjnymi, bez pętli i getattr.
+Wartości domyślne (np. 0 zamiast NULL) liczy baza przez coalesce.
+
+Kod, który potrzebuje atrybutów zamiast słowników, dostaje rekordy
+z __slots__ (ReadModel.records).
+"""
+from sqlalchemy import func, select
+
+from models.author_stats import AuthorStats
+from models.comment import Comment
+from models.post import Post
+from models.user import User
+
+
+def _flatten(fields, prefix=()):
+    """[(ścieżka, wyrażenie)] dla zagnieżdżonego słownika pól"""
+    flat = []
+    for name, value in fields.items():
+        if isinstance(value, dict):
+            flat.extend(_flatten(value, prefix + (name,)))
+        else:
+            flat.append((prefix + (name,), value))
+    return flat
+
+
+def _dict_source(fields, access, prefix=()):
+    """Kod słownika-literału; access(etykieta) zwraca wyrażenie wartości pola"""
+    items = []
+    for name, value in fields.items():
+        path = prefix + (name,)
+        if isinstance(value, dict):
+            items.append(f'{name!r}: {_dict_source(value, access, path)}')
+        else:
+            items.append(f'{name!r}: {access("__".join(path))}')
+    return '{' + ', '.join(items) + '}'
+
+
+class ReadModel:
+    """
+    Zestaw pól listy: kolumny do select(), skompilowany serializer wiersza
+    i typ rekordu z __slots__
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        flat = _flatten(fields)
+        self.labels = tuple('__'.join(path) for path, _ in flat)
+        self.columns = [expression.label(label) for label, (_, expression) in zip(self.labels, flat)]
+
+        position = {label: index for index, label in enumerate(self.labels)}
+        namespace = {}
+        exec(f'def to_dict(row):\n    return {_dict_source(fields, lambda label: f"row[{position[label]}]")}\n',
+             namespace)
+        self.to_dict = namespace['to_dict']
+        self.to_dict.__qualname__ = f'{name}.to_dict'
+
+        arguments = ', '.join(self.labels)
+        assignments = '\n'.join(f'    self.{label} = {label}' for label in self.labels)
+        exec(f'def __init__(self, {arguments}):\n{assignments}\n'
+             f'def record_to_dict(self):\n    return {_dict_source(fields, lambda label: f"self.{label}")}\n',
+             namespace)
+        self.record_type = type(name, (), {
+            '__slots__': self.labels,
+            '__init__': namespace['__init__'],
+            'to_dict': namespace['record_to_dict'],
+            '__repr__': lambda record: f'{name}(id={getattr(record, "id", None)!r})',
+        })
+
+    def select(self):
+        """SELECT tylko kolumn modelu odczytu (złączenia i filtry dodaje wywołujący)"""
+        return select(*self.columns)
+
+    def dicts(self, rows):
+        """Wiersze jako słowniki (kształt jak to_dict() modelu ORM)"""
+        return list(map(self.to_dict, rows))
+
+    def records(self, rows):
+        """Wiersze jako rekordy z __slots__"""
+        record_type = self.record_type
+        return [record_type(*row) for row in rows]
+
+
+_POST_FIELDS = {
+    'id': Post.id,
+    'title': Post.title,
+    'content': Post.content,
+    'author_id': Post.author_id,
+    'is_published': Post.is_published,
+    'view_count': func.coalesce(Post.view_count, 0),
+    'created_at': Post.created_at,
+    'updated_at': Post.updated_at,
+}
+
+# Post.to_dict()
+POST_ROW = ReadModel('PostRow', _POST_FIELDS)
+
+# Post.to_dict(include_author=True) - wymaga złączenia z users
+POST_WITH_AUTHOR_ROW = ReadModel('PostWithAuthorRow', dict(_POST_FIELDS, author={
+    'id': User.id,
+    'username': User.username,
+}))
+
+# dict(User.to_dict(), stats=User.stats_dict()) - wymaga LEFT JOIN author_stats
+USER_WITH_STATS_ROW = ReadModel('UserWithStatsRow', {
+    'id': User.id,
+    'username': User.username,
+    'email': User.email,
+    'role': User.role,
+    'is_active': User.is_active,
+    'created_at': User.created_at,
+    'updated_at': User.updated_at,
+    'stats': {
+        'post_count': func.coalesce(AuthorStats.post_count, 0),
+        'published_count': func.coalesce(AuthorStats.published_count, 0),
+        'comments_received': func.coalesce(AuthorStats.comments_received, 0),
+        'last_post_at': AuthorStats.last_post_at,
+    },
+})
+
+# Komentarz na liście komentarzy posta - wymaga LEFT JOIN users
+COMMENT_ROW = ReadModel('CommentRow', {
+    'id': Comment.id,
+    'content': Comment.content,
+    'author_username': func.coalesce(User.username, 'Unknown'),
+    'created_at': Comment.created_at,
+})
@@ -0,0 +1,20 @@
+"""
+Model wyniku popularności posta (trending)
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from database import db
+
+class PostTrendingScore(db.Model):
+    """
+    Wynik popularności posta z wygaszaniem w czasie.
+
+    log_score to log2 sumy wag zdarzeń przeskalowanych względem stałej epoki
+    (forward decay) - kolejność wyników nie zmienia się z upływem czasu,
+    więc ranking nie wymaga przeliczania.
+    """
+    __tablename__ = 'post_trending'
+    
+    post_id = Column(Integer, ForeignKey('posts.id'), primary_key=True)
+    log_score = Column(Float, nullable=False, index=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -1,135 +1,343 @@
-"""
-Routing dla administratora (Lab 11-12)
-"""
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
-
-from services.user_service import UserService
-from utils.jwt_utils import admin_required, get_current_user
-import structlog
-
-logger = structlog.get_logger(__name__)
-
-admin_bp = Blueprint('admin', __name__)
-
-@admin_bp.route('/users', methods=['GET'])
-@admin_required
-def get_all_users():
-    """
-    Pobierz wszystkich użytkowników (tylko admin)
-    GET /api/admin/users
-    """
-    try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        users = UserService.get_all_users(page, per_page)
-        
-        return jsonify({
-            'users': [user.to_dict() for user in users.items],
-            'page': users.page,
-            'per_page': users.per_page,
-            'total': users.total,
-            'pages': users.pages
-        }), 200
-        
-    except Exception as e:
-        logger.error("Błąd pobierania użytkowników", error=str(e))
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'Wystąpił błąd podczas pobierania użytkowników'
-        }), 500
-
-@admin_bp.route('/users/<int:user_id>', methods=['GET'])
-@admin_required
-def get_user(user_id):
-    """
-    Pobierz szczegóły użytkownika (tylko admin)
-    GET /api/admin/users/<id>
-    """
-    try:
-        user = UserService.get_user_by_id(user_id)
-        
-        if not user:
-            return jsonify({
-                'error': 'Not Found',
-                'message': 'Użytkownik nie znaleziony'
-            }), 404
-        
-        return jsonify(user.to_dict()), 200
-        
-    except Exception as e:
-        logger.error("Błąd pobierania użytkownika", error=str(e), user_id=user_id)
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'Wystąpił błąd podczas pobierania użytkownika'
-        }), 500
-
-@admin_bp.route('/users/<int:user_id>/toggle', methods=['POST'])
-@admin_required
-def toggle_user_status(user_id):
-    """
-    Aktywuj/deaktywuj użytkownika (tylko admin)
-    POST /api/admin/users/<id>/toggle
-    """
-    try:
-        current_admin = get_current_user()
-        
-        if current_admin.id == user_id:
-            return jsonify({
-                'error': 'Bad Request',
-                'message': 'Nie możesz deaktywować własnego konta'
-            }), 400
-        
-        user = UserService.toggle_user_status(user_id)
-        
-        action = "aktywowany" if user.is_active else "deaktywowany"
-        logger.info(f"Użytkownik {action}", user_id=user_id, admin_id=current_admin.id)
-        
-        return jsonify({
-            'message': f'Użytkownik {action} pomyślnie',
-            'user': user.to_dict()
-        }), 200
-        
-    except ValueError as e:
-        return jsonify({
-            'error': 'Not Found',
-            'message': str(e)
-        }), 404
-    except Exception as e:
-        logger.error("Błąd zmiany statusu użytkownika", error=str(e), user_id=user_id)
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'Wystąpił błąd podczas zmiany statusu użytkownika'
-        }), 500
-
-@admin_bp.route('/posts', methods=['GET'])
-@admin_required
-def get_all_posts_admin():
-    """
-    Pobierz wszystkie posty (tylko admin)
-    GET /api/admin/posts
-    """
-    try:
-        from services.post_service import PostService
-        
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        user_id = request.args.get('user_id', type=int)
-        
-        posts = PostService.get_all_posts_admin(page, per_page, user_id)
-        
-        return jsonify({
-            'posts': [post.to_dict(include_author=True) for post in posts.items],
-            'page': posts.page,
-            'per_page': posts.per_page,
-            'total': posts.total,
-            'pages': posts.pages
-        }), 200
-        
-    except Exception as e:
-        logger.error("Błąd pobierania postów (admin)", error=str(e))
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'Wystąpił błąd podczas pobierania postów'
-        }), 500
\ No newline at end of file
+"""
+Routing dla administratora (Lab 11-12)
+"""
+from flask import Blueprint, Response, current_app, request, jsonify, send_file
+from flask_jwt_extended import jwt_required
+
+from models.read_models import POST_WITH_AUTHOR_ROW, USER_WITH_STATS_ROW
+from services.user_service import UserService
+from utils.jwt_utils import admin_required, get_current_user
+from utils.pagination import get_page_args, stream_json_array, wants_stream
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/users', methods=['GET'])
+@admin_required
+def get_all_users():
+    """
+    Pobierz wszystkich użytkowników (tylko admin)
+    GET /api/admin/users
+    GET /api/admin/users?stream=1 - wszyscy użytkownicy jako strumień tablicy JSON
+    """
+    try:
+        if wants_stream():
+            return stream_json_array(UserService.get_users_chunk, USER_WITH_STATS_ROW.to_dict, 'admin_users')
+        
+        page, per_page = get_page_args()
+        
+        users = UserService.get_all_users(page, per_page)
+        
+        return jsonify({
+            'users': users.items,
+            'page': users.page,
+            'per_page': users.per_page,
+            'total': users.total,
+            'pages': users.pages
+        }), 200
+        
+    except Exception as e:
+        logger.error("Błąd pobierania użytkowników", error=str(e))
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas pobierania użytkowników'
+        }), 500
+
+@admin_bp.route('/users/<int:user_id>', methods=['GET'])
+@admin_required
+def get_user(user_id):
+    """
+    Pobierz szczegóły użytkownika (tylko admin)
+    GET /api/admin/users/<id>
+    """
+    try:
+        user = UserService.get_user_by_id(user_id)
+        
+        if not user:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Użytkownik nie znaleziony'
+            }), 404
+        
+        return jsonify(dict(user.to_dict(), stats=user.stats_dict())), 200
+        
+    except Exception as e:
+        logger.error("Błąd pobierania użytkownika", error=str(e), user_id=user_id)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas pobierania użytkownika'
+        }), 500
+
+@admin_bp.route('/users/<int:user_id>/toggle', methods=['POST'])
+@admin_required
+def toggle_user_status(user_id):
+    """
+    Aktywuj/deaktywuj użytkownika (tylko admin)
+    POST /api/admin/users/<id>/toggle
+    """
+    try:
+        current_admin = get_current_user()
+        
+        if current_admin.id == user_id:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'Nie możesz deaktywować własnego konta'
+            }), 400
+        
+        user = UserService.toggle_user_status(user_id)
+        
+        action = "aktywowany" if user.is_active else "deaktywowany"
+        logger.info(f"Użytkownik {action}", user_id=user_id, admin_id=current_admin.id)
+        
+        return jsonify({
+            'message': f'Użytkownik {action} pomyślnie',
+            'user': user.to_dict()
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'error': 'Not Found',
+            'message': str(e)
+        }), 404
+    except Exception as e:
+        logger.error("Błąd zmiany statusu użytkownika", error=str(e), user_id=user_id)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas zmiany statusu użytkownika'
+        }), 500
+
+@admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
+@admin_required
+def delete_user(user_id):
+    """
+    Usuń użytkownika wraz z postami i komentarzami (tylko admin)
+    DELETE /api/admin/users/<id>
+    Duże konta usuwane są w tle - odpowiedź 202 z id zadania
+    """
+    try:
+        current_admin = get_current_user()
+        
+        if current_admin.id == user_id:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'Nie możesz usunąć własnego konta'
+            }), 400
+        
+        job = UserService.delete_user(user_id)
+        
+        logger.info("Usunięcie użytkownika", user_id=user_id, admin_id=current_admin.id,
+                    job_id=job['id'] if job else None)
+        
+        if job is not None:
+            return jsonify({
+                'message': 'Usuwanie użytkownika zlecone',
+                'job': job
+            }), 202
+        
+        return jsonify({
+            'message': 'Użytkownik usunięty pomyślnie'
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'error': 'Not Found',
+            'message': str(e)
+        }), 404
+    except Exception as e:
+        logger.error("Błąd usuwania użytkownika", error=str(e), user_id=user_id)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas usuwania użytkownika'
+        }), 500
+
+@admin_bp.route('/jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_job(job_id):
+    """
+    Stan zadania w tle (tylko admin)
+    GET /api/admin/jobs/<id>
+    """
+    job = current_app.extensions['job_queue'].get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Not Found',
+            'message': 'Zadanie nie istnieje'
+        }), 404
+    
+    return jsonify(job), 200
+
+@admin_bp.route('/posts', methods=['GET'])
+@admin_required
+def get_all_posts_admin():
+    """
+    Pobierz wszystkie posty (tylko admin)
+    GET /api/admin/posts
+    GET /api/admin/posts?stream=1 - wszystkie posty jako strumień tablicy JSON
+    """
+    try:
+        from services.post_service import PostService
+        
+        user_id = request.args.get('user_id', type=int)
+        if wants_stream():
+            return stream_json_array(
+                lambda after_id, limit: PostService.get_posts_chunk(after_id, limit, user_id),
+                POST_WITH_AUTHOR_ROW.to_dict,
+                'admin_posts'
+            )
+        
+        page, per_page = get_page_args()
+        
+        posts = PostService.get_all_posts_admin(page, per_page, user_id)
+        
+        return jsonify({
+            'posts': posts.items,
+            'page': posts.page,
+            'per_page': posts.per_page,
+            'total': posts.total,
+            'pages': posts.pages
+        }), 200
+        
+    except Exception as e:
+        logger.error("Błąd pobierania postów (admin)", error=str(e))
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas pobierania postów'
+        }), 500
+
+@admin_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_stats():
+    """
+    Statystyki panelu (tylko admin): użytkownicy wg roli i statusu, posty
+    opublikowane/szkice, komentarze dziennie, najaktywniejsi autorzy
+    GET /api/admin/stats?days=30
+    """
+    try:
+        from services.stats_service import StatsService
+        
+        days = max(1, min(request.args.get('days', 30, type=int), 365))
+        
+        return jsonify(StatsService.get_dashboard_stats(days)), 200
+        
+    except Exception as e:
+        logger.error("Błąd pobierania statystyk", error=str(e))
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas pobierania statystyk'
+        }), 500
+
+@admin_bp.route('/analytics', methods=['GET'])
+@admin_required
+def get_analytics():
+    """
+    Analityka aktywności (tylko admin): histogramy postów i komentarzy per
+    godzina/dzień/dzień tygodnia, retencja kohort autorów, czas do komentarza
+    GET /api/admin/analytics?from=2024-01-01&to=2024-04-01 (domyślnie 90 dni)
+    """
+    from datetime import datetime, timezone
+    from services.analytics_service import AnalyticsService
+    
+    def parse_utc(value):
+        # Jawne przesunięcie (+02:00) przeliczane na UTC, bez strefy - traktowane jako UTC
+        dt = datetime.fromisoformat(value)
+        return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    
+    start, end = AnalyticsService.default_range()
+    try:
+        if request.args.get('from'):
+            start = parse_utc(request.args['from'])
+        if request.args.get('to'):
+            end = parse_utc(request.args['to'])
+    except ValueError:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Parametry from/to muszą być datami ISO 8601'
+        }), 400
+    if not start < end or (end - start).days > 366:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Zakres dat musi być niepusty i nie dłuższy niż rok'
+        }), 400
+    
+    try:
+        return jsonify(AnalyticsService.get_activity(start, end)), 200
+        
+    except Exception as e:
+        logger.error("Błąd pobierania analityki", error=str(e))
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Wystąpił błąd podczas pobierania analityki'
+        }), 500
+
+@admin_bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """
+    Metryki aplikacji w formacie Prometheus (tylko admin)
+    GET /api/admin/metrics
+    """
+    from middleware.metrics import collect_metrics
+    
+    return Response(collect_metrics(), mimetype='text/plain; version=0.0.4')
+
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+def get_profiles():
+    """
+    Lista zapisanych profili żądań (tylko admin)
+    GET /api/admin/profiles
+    """
+    from middleware.profiler import list_profiles
+    
+    return jsonify({'profiles': list_profiles(current_app)}), 200
+
+@admin_bp.route('/profiles/<name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    """
+    Pobierz profil żądania (tylko admin)
+    GET /api/admin/profiles/<name> - plik pstats (snakeviz, python -m pstats)
+    GET /api/admin/profiles/<name>?format=text - podsumowanie tekstowe
+    """
+    from middleware.profiler import resolve_profile_path, render_profile_text
+    
+    path = resolve_profile_path(current_app, name)
+    if path is None:
+        return jsonify({
+            'error': 'Not Found',
+            'message': 'Profil nie istnieje'
+        }), 404
+    
+    if request.args.get('format') == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'calls'):
+            sort = 'cumulative'
+        return Response(render_profile_text(path, sort), mimetype='text/plain')
+    
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=name)
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """
+    Najwolniejsze zapytania SQL zgrupowane po odcisku (tylko admin)
+    GET /api/admin/slow-queries?sort=total_time|max_time|count&limit=20
+    """
+    slow_log = current_app.extensions.get('slow_query_log')
+    if slow_log is None:
+        return jsonify({
+            'error': 'Not Found',
+            'message': 'Log wolnych zapytań jest wyłączony'
+        }), 404
+    
+    sort = request.args.get('sort', 'total_time')
+    if sort not in ('total_time', 'max_time', 'count'):
+        sort = 'total_time'
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    return jsonify({
+        'threshold_ms': current_app.config.get('SLOW_QUERY_THRESHOLD_MS'),
+        'queries': slow_log.top(sort, limit)
+    }), 200
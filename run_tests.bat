@@ -18,8 +18,8 @@ if exist ".venv\Scripts\activate.bat" (
 :: Sprawdź czy pytest jest zainstalowany
 pip show pytest >nul 2>&1
 if errorlevel 1 (
-    echo Instalowanie pytest...
-    pip install pytest pytest-flask
+    echo Instalowanie zaleznosci testowych...
+    pip install -r requirements-dev.txt
 )
 
 echo.
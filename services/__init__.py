@@ -1,8 +1,11 @@
-"""
-Services package
-"""
-from .auth_service import AuthService
-from .post_service import PostService
-from .user_service import UserService
-
-__all__ = ['AuthService', 'PostService', 'UserService']
\ No newline at end of file
+"""
+Services package
+"""
+from .auth_service import AuthService
+from .author_stats_service import AuthorStatsService
+from .deletion_service import DeletionService
+from .post_service import PostService
+from .stats_service import StatsService
+from .user_service import UserService
+
+__all__ = ['AuthService', 'AuthorStatsService', 'DeletionService', 'PostService', 'StatsService', 'UserService']
\ No newline at end of file
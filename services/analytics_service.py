@@ -0,0 +1,322 @@
+"""
+Serwis analityki aktywności dla administratora
+
+Kolumny created_at / author_id / post_id postów i komentarzy pobierane są
+partiami (ANALYTICS_CHUNK_SIZE wierszy, kolejne zakresy id) jako tablice
+NumPy, a histogramy, retencja kohort autorów i rozkład czasu do komentarza
+liczone są operacjami wektorowymi. Bez NumPy te same wyniki liczy baza
+zapytaniami GROUP BY (percentyle opóźnień wtedy z kubełków histogramu).
+"""
+import itertools
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import Integer, case, cast, extract, func, literal, select, union_all
+from database import db, read_only
+from models.comment import Comment
+from models.post import Post
+import structlog
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opcjonalny - analityka przez GROUP BY w bazie
+    np = None
+
+logger = structlog.get_logger(__name__)
+
+DAY = 86400
+WEEK = 7 * DAY
+# Górne granice kubełków czasu od publikacji posta do komentarza (s); ostatni kubełek bez granicy
+LATENCY_BOUNDS = (60, 300, 900, 3600, 3 * 3600, 6 * 3600, 12 * 3600, DAY, 3 * DAY, WEEK, 30 * DAY)
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def configure_analytics(app):
+    """
+    Sprawdzenie silnika analityki przy starcie - brak NumPy przy ANALYTICS_ENGINE='numpy'
+    oznacza liczenie w bazie (GROUP BY)
+    """
+    if app.config.get('ANALYTICS_ENGINE', 'numpy') == 'numpy' and np is None:
+        logger.warning("NumPy niedostępny - analityka liczona w bazie (GROUP BY)",
+                       configured_engine='numpy', engine='sql', hint='pip install numpy')
+
+
+def _epoch(column):
+    return cast(extract('epoch', column), Integer)
+
+
+def _day_labels(start_day, days):
+    return [datetime.fromtimestamp((start_day + i) * DAY, timezone.utc).date().isoformat() for i in range(days)]
+
+
+def _week_label(week):
+    # Tydzień liczony od poniedziałku 1969-12-29 (1970-01-01 to czwartek)
+    return datetime.fromtimestamp(week * WEEK - 3 * DAY, timezone.utc).date().isoformat()
+
+
+def _week_index(epoch_seconds):
+    return (epoch_seconds // DAY + 3) // 7
+
+
+class AnalyticsService:
+    """Serwis analityki aktywności (NumPy lub GROUP BY w bazie)"""
+
+    @staticmethod
+    def engine():
+        """Silnik obliczeń: 'numpy' gdy dostępny, inaczej 'sql'"""
+        if np is None or current_app.config.get('ANALYTICS_ENGINE') == 'sql':
+            return 'sql'
+        return 'numpy'
+
+    @staticmethod
+    def get_activity(start, end):
+        """
+        Analityka aktywności w zakresie [start, end) z cache per zakres
+        """
+        engine = AnalyticsService.engine()
+        cache = current_app.extensions['cache']['analytics']
+        compute = AnalyticsService.compute_numpy if engine == 'numpy' else AnalyticsService.compute_sql
+        return cache.get((start, end, engine), lambda: compute(start, end))
+
+    # --- NumPy ---
+
+    @staticmethod
+    def _id_span(model, start, end):
+        # Najmniejsze i największe id wierszy z zakresu - bez założenia, że id rosną razem
+        # z created_at (import, jawne created_at, równoległe zapisy); min/max z indeksu
+        # created_at (ix_posts_created_at, ix_comments_created_at), który zawiera id
+        return db.session.execute(
+            select(func.min(model.id), func.max(model.id))
+            .where(model.created_at >= start, model.created_at < end)
+        ).one()
+
+    @staticmethod
+    def _fetch_columns(model, columns, start, end, join=None):
+        """
+        Kolumny całkowite wierszy z zakresu jako tablica int64 (wiersz na rekord),
+        pobierane partiami po zakresach id (każda partia nadal filtrowana po created_at)
+        """
+        first, last = AnalyticsService._id_span(model, start, end)
+        width = len(columns)
+        if first is None or last is None or first > last:
+            return np.empty((0, width), dtype=np.int64)
+
+        chunk_size = current_app.config.get('ANALYTICS_CHUNK_SIZE', 100000)
+        query = select(*columns)
+        if join is not None:
+            query = query.join(*join)
+        query = query.where(model.created_at >= start, model.created_at < end)
+
+        blocks = []
+        low = first
+        while low <= last:
+            high = min(low + chunk_size - 1, last)
+            rows = db.session.execute(query.where(model.id.between(low, high))).all()
+            if rows:
+                flat = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * width)
+                blocks.append(flat.reshape(-1, width))
+            low = high + 1
+        if not blocks:
+            return np.empty((0, width), dtype=np.int64)
+        return np.concatenate(blocks)
+
+    @staticmethod
+    def _histograms(timestamps, start_day, days):
+        day_index = timestamps // DAY
+        per_day = np.bincount(day_index - start_day, minlength=days)[:days]
+        return {
+            'per_hour': np.bincount(timestamps % DAY // 3600, minlength=24).tolist(),
+            'per_weekday': np.bincount((day_index + 3) % 7, minlength=7).tolist(),  # 0 = poniedziałek
+            'per_day': [{'date': label, 'count': int(count)}
+                        for label, count in zip(_day_labels(start_day, days), per_day)],
+        }
+
+    @staticmethod
+    def _cohorts(post_authors, post_weeks, activity_authors, activity_weeks):
+        """
+        Kohorta autora = tydzień pierwszego posta w zakresie; retencja[k] = odsetek
+        autorów kohorty aktywnych (post lub komentarz) k tygodni później
+        """
+        if post_authors.size == 0:
+            return []
+        order = np.lexsort((post_weeks, post_authors))
+        authors, first_index = np.unique(post_authors[order], return_index=True)
+        cohort_weeks = post_weeks[order][first_index]
+
+        # Aktywność tylko autorów z kohort, jedna na (autor, tydzień)
+        position = np.searchsorted(authors, activity_authors)
+        position[position == authors.size] = 0
+        known = authors[position] == activity_authors
+        author_index, weeks = position[known], activity_weeks[known]
+        offsets = weeks - cohort_weeks[author_index]
+        keep = offsets >= 0
+        pairs = np.unique(np.stack([author_index[keep], offsets[keep]], axis=1), axis=0)
+
+        # Obserwacja do tygodnia najmłodszej kohorty
+        first_week = int(cohort_weeks.min())
+        span = int(cohort_weeks.max()) - first_week + 1
+        cohort_of_pair = cohort_weeks[pairs[:, 0]] - first_week
+        observed = cohort_of_pair + pairs[:, 1] < span
+        active = np.zeros((span, span), dtype=np.int64)
+        np.add.at(active, (cohort_of_pair[observed], pairs[:, 1][observed]), 1)
+        sizes = np.bincount(cohort_weeks - first_week, minlength=span)
+
+        return [{
+            'week': _week_label(first_week + int(index)),
+            'authors': int(sizes[index]),
+            'retention': np.round(active[index, :span - index] / sizes[index], 4).tolist(),
+        } for index in np.nonzero(sizes)[0]]
+
+    @staticmethod
+    def _latency(latencies):
+        buckets = np.bincount(np.searchsorted(LATENCY_BOUNDS, latencies, side='left'),
+                              minlength=len(LATENCY_BOUNDS) + 1)
+        percentiles = np.percentile(latencies, LATENCY_PERCENTILES) if latencies.size else [None] * 3
+        return {
+            'buckets': [{'le': bound, 'count': int(count)}
+                        for bound, count in zip(list(LATENCY_BOUNDS) + [None], buckets)],
+            'percentiles': {f'p{p}': (float(value) if value is not None else None)
+                            for p, value in zip(LATENCY_PERCENTILES, percentiles)},
+        }
+
+    @staticmethod
+    @read_only
+    def compute_numpy(start, end):
+        """
+        Analityka aktywności liczona wektorowo (NumPy) na kolumnach pobranych partiami
+        """
+        posts = AnalyticsService._fetch_columns(Post, [_epoch(Post.created_at), Post.author_id], start, end)
+        comments = AnalyticsService._fetch_columns(
+            Comment,
+            [_epoch(Comment.created_at), Comment.author_id, _epoch(Post.created_at)],
+            start, end, join=(Post, Post.id == Comment.post_id)
+        )
+
+        start_day = int(start.timestamp()) // DAY
+        days = max(1, -(-int(end.timestamp()) // DAY) - start_day)
+        post_weeks = _week_index(posts[:, 0])
+        comment_weeks = _week_index(comments[:, 0])
+
+        return {
+            'range': {'start': start.isoformat(), 'end': end.isoformat()},
+            'engine': 'numpy',
+            'posts': AnalyticsService._histograms(posts[:, 0], start_day, days),
+            'comments': AnalyticsService._histograms(comments[:, 0], start_day, days),
+            'cohorts': AnalyticsService._cohorts(
+                posts[:, 1], post_weeks,
+                np.concatenate([posts[:, 1], comments[:, 1]]),
+                np.concatenate([post_weeks, comment_weeks])
+            ),
+            'comment_latency': AnalyticsService._latency(comments[:, 0] - comments[:, 2]),
+        }
+
+    # --- GROUP BY w bazie ---
+
+    @staticmethod
+    def _sql_histograms(model, start, end, start_day, days):
+        epoch = _epoch(model.created_at)
+        in_range = (model.created_at >= start, model.created_at < end)
+        hour = cast(epoch % DAY / 3600, Integer).label('hour')
+        day = cast(epoch / DAY, Integer).label('day')
+        per_hour, per_weekday, per_day = [0] * 24, [0] * 7, [0] * days
+        for index, count in db.session.execute(select(hour, func.count()).where(*in_range).group_by(hour)):
+            per_hour[index] = count
+        for index, count in db.session.execute(select(day, func.count()).where(*in_range).group_by(day)):
+            per_day[index - start_day] = count
+            per_weekday[(index + 3) % 7] += count
+        return {
+            'per_hour': per_hour,
+            'per_weekday': per_weekday,
+            'per_day': [{'date': label, 'count': count}
+                        for label, count in zip(_day_labels(start_day, days), per_day)],
+        }
+
+    @staticmethod
+    def _sql_cohorts(start, end):
+        def week(column):
+            return cast((cast(_epoch(column) / DAY, Integer) + 3) / 7, Integer)
+
+        first_posts = select(Post.author_id, func.min(week(Post.created_at)).label('cohort'))\
+            .where(Post.created_at >= start, Post.created_at < end)\
+            .group_by(Post.author_id).subquery()
+        activity = union_all(
+            select(Post.author_id.label('author_id'), week(Post.created_at).label('week'))
+            .where(Post.created_at >= start, Post.created_at < end),
+            select(Comment.author_id.label('author_id'), week(Comment.created_at).label('week'))
+            .where(Comment.created_at >= start, Comment.created_at < end),
+        ).subquery()
+        offset = (activity.c.week - first_posts.c.cohort).label('offset')
+        rows = db.session.execute(
+            select(first_posts.c.cohort, offset, func.count(func.distinct(activity.c.author_id)))
+            .join(activity, activity.c.author_id == first_posts.c.author_id)
+            .where(activity.c.week >= first_posts.c.cohort)
+            .group_by(first_posts.c.cohort, offset)
+        ).all()
+        sizes = dict(db.session.execute(
+            select(first_posts.c.cohort, func.count()).group_by(first_posts.c.cohort)
+        ).all())
+        if not sizes:
+            return []
+
+        last_week = max(sizes)
+        active = {}
+        for cohort, week_offset, count in rows:
+            active[(cohort, week_offset)] = count
+        return [{
+            'week': _week_label(cohort),
+            'authors': sizes[cohort],
+            'retention': [round(active.get((cohort, k), 0) / sizes[cohort], 4)
+                          for k in range(last_week - cohort + 1)],
+        } for cohort in sorted(sizes)]
+
+    @staticmethod
+    def _sql_latency(start, end):
+        latency = _epoch(Comment.created_at) - _epoch(Post.created_at)
+        bucket = case(*[(latency <= bound, literal(i)) for i, bound in enumerate(LATENCY_BOUNDS)],
+                      else_=literal(len(LATENCY_BOUNDS))).label('bucket')
+        counts = [0] * (len(LATENCY_BOUNDS) + 1)
+        for index, count in db.session.execute(
+            select(bucket, func.count())
+            .select_from(Comment).join(Post, Post.id == Comment.post_id)
+            .where(Comment.created_at >= start, Comment.created_at < end)
+            .group_by(bucket)
+        ):
+            counts[index] = count
+
+        # Percentyl przybliżony górną granicą kubełka
+        total, percentiles = sum(counts), {}
+        for p in LATENCY_PERCENTILES:
+            percentiles[f'p{p}'] = None
+            running = 0
+            for index, count in enumerate(counts):
+                running += count
+                if total and running >= total * p / 100:
+                    percentiles[f'p{p}'] = float(LATENCY_BOUNDS[index]) if index < len(LATENCY_BOUNDS) else None
+                    break
+        return {
+            'buckets': [{'le': bound, 'count': count}
+                        for bound, count in zip(list(LATENCY_BOUNDS) + [None], counts)],
+            'percentiles': percentiles,
+        }
+
+    @staticmethod
+    @read_only
+    def compute_sql(start, end):
+        """
+        Ta sama analityka zapytaniami GROUP BY w bazie (bez NumPy)
+        """
+        start_day = int(start.timestamp()) // DAY
+        days = max(1, -(-int(end.timestamp()) // DAY) - start_day)
+        return {
+            'range': {'start': start.isoformat(), 'end': end.isoformat()},
+            'engine': 'sql',
+            'posts': AnalyticsService._sql_histograms(Post, start, end, start_day, days),
+            'comments': AnalyticsService._sql_histograms(Comment, start, end, start_day, days),
+            'cohorts': AnalyticsService._sql_cohorts(start, end),
+            'comment_latency': AnalyticsService._sql_latency(start, end),
+        }
+
+    @staticmethod
+    def default_range(days=90):
+        """Zakres [dziś - days, jutro) w pełnych dniach UTC"""
+        end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        return end - timedelta(days=days), end
@@ -0,0 +1,131 @@
+"""
+Serwis zmaterializowanych statystyk autorów (tabela author_stats)
+
+Metody apply_* wywoływane są wewnątrz transakcji zapisu postu/komentarza,
+więc statystyki zmieniają się atomowo razem z danymi. Każda zmiana to jedno
+zapytanie (INSERT ... ON CONFLICT DO UPDATE dla SQLite i PostgreSQL).
+"""
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from database import db, retry_on_lock
+from models.author_stats import AuthorStats
+from models.comment import Comment
+from models.post import Post
+from utils.write_queue import transactional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+class AuthorStatsService:
+    """Serwis statystyk autorów"""
+    
+    @staticmethod
+    def apply_delta(author_id, posts=0, published=0, comments=0, last_post_at=None):
+        """
+        Dodaj przyrosty do statystyk autora (tworzy wiersz, jeśli go nie ma)
+        """
+        table = AuthorStats.__table__
+        values = {
+            'author_id': author_id,
+            'post_count': posts,
+            'published_count': published,
+            'comments_received': comments,
+            'last_post_at': last_post_at,
+        }
+        changes = {
+            'post_count': table.c.post_count + posts,
+            'published_count': table.c.published_count + published,
+            'comments_received': table.c.comments_received + comments,
+        }
+        if last_post_at is not None:
+            changes['last_post_at'] = case(
+                (table.c.last_post_at.is_(None) | (table.c.last_post_at < last_post_at), last_post_at),
+                else_=table.c.last_post_at
+            )
+        
+        dialect_insert = _UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if dialect_insert is not None:
+            db.session.execute(dialect_insert(table).values(**values)
+                               .on_conflict_do_update(index_elements=[table.c.author_id], set_=changes))
+            return
+        
+        # Bazy bez upsert: UPDATE, a przy braku wiersza INSERT
+        result = db.session.execute(update(table).where(table.c.author_id == author_id).values(**changes))
+        if not result.rowcount:
+            db.session.execute(insert(table).values(**values))
+    
+    @staticmethod
+    def apply_post_removed(author_id, was_published):
+        """
+        Usunięty post: liczniki w dół, data ostatniego posta z indeksu (author_id, created_at)
+        """
+        table = AuthorStats.__table__
+        last_post_at = select(func.max(Post.created_at)).where(Post.author_id == author_id).scalar_subquery()
+        db.session.execute(update(table).where(table.c.author_id == author_id).values(
+            post_count=table.c.post_count - 1,
+            published_count=table.c.published_count - (1 if was_published else 0),
+            last_post_at=last_post_at
+        ))
+    
+    @staticmethod
+    def apply_comments_removed(criteria):
+        """
+        Komentarze spełniające warunek zostaną usunięte: zmniejsz liczniki
+        komentarzy otrzymanych przez autorów postów (jedno zapytanie grupujące)
+        """
+        counts = db.session.execute(
+            select(Post.author_id, func.count())
+            .select_from(Comment)
+            .join(Post, Post.id == Comment.post_id)
+            .where(criteria)
+            .group_by(Post.author_id)
+        ).all()
+        if not counts:
+            return
+        table = AuthorStats.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.author_id == bindparam('row_author_id'))
+            .values(comments_received=table.c.comments_received - bindparam('removed')),
+            [{'row_author_id': author_id, 'removed': removed} for author_id, removed in counts]
+        )
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def reconcile():
+        """
+        Przelicz całą tabelę author_stats zapytaniami grupującymi; zwraca liczbę autorów
+        """
+        post_rows = db.session.execute(
+            select(
+                Post.author_id,
+                func.count(),
+                func.sum(case((Post.is_published.is_(True), 1), else_=0)),
+                func.max(Post.created_at)
+            ).group_by(Post.author_id)
+        ).all()
+        comment_rows = db.session.execute(
+            select(Post.author_id, func.count(Comment.id))
+            .select_from(Comment)
+            .join(Post, Post.id == Comment.post_id)
+            .group_by(Post.author_id)
+        ).all()
+        
+        stats = {}
+        for author_id, posts, published, last_post_at in post_rows:
+            stats[author_id] = {'author_id': author_id, 'post_count': posts, 'published_count': published or 0,
+                                'comments_received': 0, 'last_post_at': last_post_at}
+        for author_id, comments in comment_rows:
+            stats.setdefault(author_id, {'author_id': author_id, 'post_count': 0, 'published_count': 0,
+                                         'comments_received': 0, 'last_post_at': None})
+            stats[author_id]['comments_received'] = comments
+        
+        db.session.execute(delete(AuthorStats.__table__))
+        if stats:
+            db.session.execute(insert(AuthorStats.__table__), list(stats.values()))
+        
+        logger.info("Statystyki autorów przeliczone", authors=len(stats))
+        return len(stats)
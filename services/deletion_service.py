@@ -0,0 +1,170 @@
+"""
+Serwis kaskadowego usuwania (użytkownicy, posty, komentarze, dane pochodne)
+
+Usuwanie odbywa się zbiorczymi DELETE na partiach po DELETE_CHUNK_SIZE wierszy,
+każda partia w osobnej, krótkiej transakcji - bez ładowania obiektów ORM
+i bez długiego blokowania innych zapisów. Kolejne kroki są idempotentne,
+więc przerwane usuwanie można bezpiecznie powtórzyć.
+"""
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+from database import db, retry_on_lock
+from models.author_stats import AuthorStats
+from models.comment import Comment
+from models.post import Post
+from models.trending import PostTrendingScore
+from models.user import User
+from services.author_stats_service import AuthorStatsService
+from utils.metrics import registry
+from utils.write_queue import transactional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+def _forget_trending(post_ids):
+    # Ranking w pamięci tego procesu; pozostałe procesy pomijają usunięte posty
+    # przy odczycie rankingu i przy zapisie (wczytując ranking z bazy)
+    trending = current_app.extensions.get('trending')
+    if trending is not None:
+        trending.discard(post_ids)
+
+def _bulk_delete(model, criteria):
+    result = db.session.execute(delete(model).where(criteria),
+                                execution_options={'synchronize_session': False})
+    registry.inc('blog_db_deleted_rows_total', {'table': model.__tablename__}, result.rowcount)
+    return result.rowcount
+
+class DeletionService:
+    """Serwis usuwania danych partiami"""
+    
+    @staticmethod
+    def _chunk_size():
+        return current_app.config.get('DELETE_CHUNK_SIZE', 500)
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def deactivate_user(user_id):
+        """
+        Deaktywuj użytkownika przed usunięciem (brak nowych wpisów w trakcie)
+        """
+        db.session.execute(update(User).where(User.id == user_id).values(is_active=False),
+                           execution_options={'synchronize_session': False})
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def delete_comments_chunk(criteria, chunk_size):
+        """
+        Usuń jedną partię komentarzy spełniających warunek; zwraca liczbę usuniętych
+        """
+        ids = db.session.scalars(select(Comment.id).where(criteria).limit(chunk_size)).all()
+        if not ids:
+            return 0
+        AuthorStatsService.apply_comments_removed(Comment.id.in_(ids))
+        return _bulk_delete(Comment, Comment.id.in_(ids))
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def delete_posts_chunk(author_id, chunk_size):
+        """
+        Usuń jedną partię postów autora (z komentarzami dodanymi w międzyczasie)
+        """
+        post_ids = db.session.scalars(
+            select(Post.id).where(Post.author_id == author_id).limit(chunk_size)
+        ).all()
+        if not post_ids:
+            return 0
+        _bulk_delete(Comment, Comment.post_id.in_(post_ids))
+        _bulk_delete(PostTrendingScore, PostTrendingScore.post_id.in_(post_ids))
+        _forget_trending(post_ids)
+        return _bulk_delete(Post, Post.id.in_(post_ids))
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def delete_post_row(post_id):
+        """
+        Usuń wiersz posta (i pozostałe komentarze, wynik popularności, statystyki autora)
+        """
+        post = db.session.execute(
+            select(Post.author_id, Post.is_published).where(Post.id == post_id)
+        ).first()
+        if post is None:
+            return 0
+        AuthorStatsService.apply_comments_removed(Comment.post_id == post_id)
+        _bulk_delete(Comment, Comment.post_id == post_id)
+        _bulk_delete(PostTrendingScore, PostTrendingScore.post_id == post_id)
+        _forget_trending([post_id])
+        deleted = _bulk_delete(Post, Post.id == post_id)
+        AuthorStatsService.apply_post_removed(post.author_id, post.is_published)
+        return deleted
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def delete_user_row(user_id):
+        """
+        Usuń wiersz użytkownika (po usunięciu jego postów i komentarzy)
+        """
+        _bulk_delete(AuthorStats, AuthorStats.author_id == user_id)
+        return _bulk_delete(User, User.id == user_id)
+    
+    @staticmethod
+    def _drain(step, *args):
+        total = 0
+        while True:
+            deleted = step(*args)
+            total += deleted
+            if not deleted:
+                return total
+    
+    @staticmethod
+    def delete_post(post_id):
+        """
+        Usuń post wraz z komentarzami; zwraca liczbę usuniętych komentarzy
+        """
+        chunk_size = DeletionService._chunk_size()
+        comments = DeletionService._drain(DeletionService.delete_comments_chunk,
+                                          Comment.post_id == post_id, chunk_size)
+        DeletionService.delete_post_row(post_id)
+        
+        logger.info("Post usunięty kaskadowo", post_id=post_id, comments=comments)
+        return comments
+    
+    @staticmethod
+    def delete_user(user_id):
+        """
+        Usuń użytkownika: jego komentarze, komentarze pod jego postami,
+        posty i na końcu konto. Zwraca liczby usuniętych wierszy.
+        Konto powinno być już deaktywowane (deactivate_user), żeby w trakcie
+        usuwania nie przybywało wpisów.
+        """
+        chunk_size = DeletionService._chunk_size()
+        
+        own_comments = DeletionService._drain(DeletionService.delete_comments_chunk,
+                                              Comment.author_id == user_id, chunk_size)
+        on_posts = Comment.post_id.in_(select(Post.id).where(Post.author_id == user_id))
+        received_comments = DeletionService._drain(DeletionService.delete_comments_chunk,
+                                                   on_posts, chunk_size)
+        posts = DeletionService._drain(DeletionService.delete_posts_chunk, user_id, chunk_size)
+        DeletionService.delete_user_row(user_id)
+        
+        deleted = {'posts': posts, 'comments': own_comments + received_comments}
+        logger.info("Użytkownik usunięty kaskadowo", user_id=user_id, **deleted)
+        return deleted
+    
+    @staticmethod
+    def count_user_rows(user_id, limit):
+        """
+        Liczba postów i komentarzy użytkownika, liczona najwyżej do limit + 1
+        (wystarczy do decyzji, czy usuwać w tle)
+        """
+        total = 0
+        for model in (Post, Comment):
+            subquery = select(model.id).where(model.author_id == user_id).limit(limit + 1 - total).subquery()
+            total += db.session.scalar(select(func.count()).select_from(subquery))
+            if total > limit:
+                break
+        return total
@@ -1,115 +1,215 @@
-"""
-Serwis postów blogowych
-"""
-from database import db
-from models.post import Post
-from models.user import User
-import structlog
-
-logger = structlog.get_logger(__name__)
-
-class PostService:
-    """Serwis obsługujący logikę postów"""
-    
-    @staticmethod
-    def get_public_posts(page=1, per_page=20):
-        """
-        Pobierz publiczne posty z paginacją
-        """
-        return Post.get_public_posts(page, per_page)
-    
-    @staticmethod
-    def get_post_by_id(post_id):
-        """
-        Pobierz post po ID
-        """
-        return Post.find_by_id(post_id)
-    
-    @staticmethod
-    def create_post(title, content, author_id, is_published=True):
-        """
-        Utwórz nowy post
-        """
-        user = User.find_by_id(author_id)
-        if not user:
-            raise ValueError('Użytkownik nie znaleziony')
-        
-        post = Post(
-            title=title,
-            content=content,
-            author_id=author_id,
-            is_published=is_published
-        )
-        
-        db.session.add(post)
-        db.session.commit()
-        
-        logger.info("Post utworzony", post_id=post.id, author_id=author_id)
-        return post
-    
-    @staticmethod
-    def update_post(post_id, title, content, is_published, user):
-        """
-        Aktualizuj istniejący post
-        """
-        post = Post.find_by_id(post_id)
-        
-        if not post:
-            raise ValueError('Post nie znaleziony')
-        
-        # Sprawdź uprawnienia
-        if not post.can_edit(user):
-            logger.warning("Nieautoryzowana próba edycji posta", 
-                          user_id=user.id, post_id=post_id, author_id=post.author_id)
-            raise ValueError('Brak uprawnień do edycji tego posta')
-        
-        post.title = title
-        post.content = content
-        post.is_published = is_published
-        
-        db.session.commit()
-        
-        logger.info("Post zaktualizowany", post_id=post_id, user_id=user.id)
-        return post
-    
-    @staticmethod
-    def delete_post(post_id, user):
-        """
-        Usuń post
-        """
-        post = Post.find_by_id(post_id)
-        
-        if not post:
-            raise ValueError('Post nie znaleziony')
-        
-        # Sprawdź uprawnienia
-        if not post.can_delete(user):
-            logger.warning("Nieautoryzowana próba usunięcia posta", 
-                          user_id=user.id, post_id=post_id, author_id=post.author_id)
-            raise ValueError('Brak uprawnień do usunięcia tego posta')
-        
-        db.session.delete(post)
-        db.session.commit()
-        
-        logger.info("Post usunięty", post_id=post_id, user_id=user.id)
-        return True
-    
-    @staticmethod
-    def get_user_posts(user_id, page=1, per_page=20):
-        """
-        Pobierz posty użytkownika
-        """
-        return Post.get_user_posts(user_id, page, per_page)
-    
-    @staticmethod
-    def get_all_posts_admin(page=1, per_page=20, user_id=None):
-        """
-        Pobierz wszystkie posty (dla admina)
-        """
-        query = Post.query
-        
-        if user_id:
-            query = query.filter_by(author_id=user_id)
-        
-        return query.order_by(Post.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
\ No newline at end of file
+"""
+Serwis postów blogowych
+"""
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from database import db, retry_on_lock, read_only
+from models.comment import Comment
+from utils.pagination import paginate_rows
+from utils.write_queue import transactional
+from models.post import Post
+from models.user import User
+from models.read_models import COMMENT_ROW, POST_ROW, POST_WITH_AUTHOR_ROW
+from services.author_stats_service import AuthorStatsService
+from services.deletion_service import DeletionService
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class PostService:
+    """Serwis obsługujący logikę postów"""
+    
+    @staticmethod
+    @read_only
+    def get_public_posts(page=1, per_page=20):
+        """
+        Pobierz publiczne posty z paginacją (słowniki jak Post.to_dict(include_author=True))
+        """
+        statement = POST_WITH_AUTHOR_ROW.select()\
+            .join(User, User.id == Post.author_id)\
+            .where(Post.is_published.is_(True))\
+            .order_by(Post.created_at.desc())
+        return paginate_rows(statement, page, per_page, POST_WITH_AUTHOR_ROW)
+    
+    @staticmethod
+    @read_only
+    def get_post_by_id(post_id):
+        """
+        Pobierz post po ID
+        """
+        return Post.find_by_id(post_id)
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def create_post(title, content, author, is_published=True):
+        """
+        Utwórz nowy post (author - użytkownik już załadowany przez get_current_user)
+        """
+        if author is None:
+            raise ValueError('Użytkownik nie znaleziony')
+        
+        post = Post(
+            title=title,
+            content=content,
+            author_id=author.id,
+            is_published=is_published
+        )
+        
+        db.session.add(post)
+        db.session.flush()
+        AuthorStatsService.apply_delta(author.id, posts=1, published=1 if post.is_published else 0,
+                                       last_post_at=post.created_at)
+        
+        logger.info("Post utworzony", post_id=post.id, author_id=author.id)
+        return post
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def update_post(post_id, title, content, is_published, user):
+        """
+        Aktualizuj istniejący post
+        """
+        post = Post.find_by_id(post_id)
+        
+        if not post:
+            raise ValueError('Post nie znaleziony')
+        
+        # Sprawdź uprawnienia
+        if not post.can_edit(user):
+            logger.warning("Nieautoryzowana próba edycji posta", 
+                          user_id=user.id, post_id=post_id, author_id=post.author_id)
+            raise ValueError('Brak uprawnień do edycji tego posta')
+        
+        post.title = title
+        post.content = content
+        if bool(is_published) != bool(post.is_published):
+            AuthorStatsService.apply_delta(post.author_id, published=1 if is_published else -1)
+        post.is_published = is_published
+        
+        logger.info("Post zaktualizowany", post_id=post_id, user_id=user.id)
+        return post
+    
+    @staticmethod
+    def record_view(post_id, viewer=None):
+        """
+        Zarejestruj wyświetlenie posta (licznik w pamięci, zapis partiami w tle)
+        """
+        return current_app.extensions['view_counter'].record(post_id, viewer)
+    
+    @staticmethod
+    def record_activity(post_id, kind):
+        """
+        Zarejestruj zdarzenie posta w rankingu popularności (np. 'comment')
+        """
+        current_app.extensions['trending'].record(kind, {post_id: 1})
+    
+    @staticmethod
+    @read_only
+    def get_trending_posts(limit=10):
+        """
+        Najpopularniejsze opublikowane posty: [(post, wynik)] w kolejności rankingu
+        """
+        # Zapas na posty nieopublikowane lub usunięte od ostatniego zapisu rankingu
+        ranking = current_app.extensions['trending'].top(limit * 2)
+        if not ranking:
+            return []
+        
+        posts = Post.query.options(joinedload(Post.author))\
+            .filter(Post.id.in_([post_id for post_id, _ in ranking]), Post.is_published.is_(True))\
+            .all()
+        by_id = {post.id: post for post in posts}
+        return [(by_id[post_id], score) for post_id, score in ranking if post_id in by_id][:limit]
+    
+    @staticmethod
+    def delete_post(post_id, user):
+        """
+        Usuń post wraz z komentarzami (zbiorcze DELETE partiami)
+        """
+        post = Post.find_by_id(post_id)
+        
+        if not post:
+            raise ValueError('Post nie znaleziony')
+        
+        # Sprawdź uprawnienia
+        if not post.can_delete(user):
+            logger.warning("Nieautoryzowana próba usunięcia posta", 
+                          user_id=user.id, post_id=post_id, author_id=post.author_id)
+            raise ValueError('Brak uprawnień do usunięcia tego posta')
+        
+        DeletionService.delete_post(post_id)
+        
+        logger.info("Post usunięty", post_id=post_id, user_id=user.id)
+        return True
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def add_comment(post_id, content, author_id):
+        """
+        Dodaj komentarz do posta
+        """
+        post = Post.find_by_id(post_id)
+        if not post:
+            raise LookupError('Post nie znaleziony')
+        
+        comment = Comment(content=content, author_id=author_id, post_id=post_id)
+        db.session.add(comment)
+        db.session.flush()
+        AuthorStatsService.apply_delta(post.author_id, comments=1)
+        
+        logger.info("Komentarz dodany", comment_id=comment.id, post_id=post_id, user_id=author_id)
+        return comment
+    
+    @staticmethod
+    @read_only
+    def get_post_comments(post_id):
+        """
+        Pobierz komentarze posta z nazwami autorów jako słowniki (jedno zapytanie)
+        """
+        statement = COMMENT_ROW.select()\
+            .outerjoin(User, User.id == Comment.author_id)\
+            .where(Comment.post_id == post_id)\
+            .order_by(Comment.created_at.asc())
+        return COMMENT_ROW.dicts(db.session.execute(statement))
+    
+    @staticmethod
+    @read_only
+    def get_user_posts(user_id, page=1, per_page=20):
+        """
+        Pobierz posty użytkownika (słowniki jak Post.to_dict())
+        """
+        statement = POST_ROW.select()\
+            .where(Post.author_id == user_id)\
+            .order_by(Post.created_at.desc())
+        return paginate_rows(statement, page, per_page, POST_ROW)
+    
+    @staticmethod
+    @read_only
+    def get_all_posts_admin(page=1, per_page=20, user_id=None):
+        """
+        Pobierz wszystkie posty (dla admina, słowniki z autorem)
+        """
+        statement = POST_WITH_AUTHOR_ROW.select().join(User, User.id == Post.author_id)
+        
+        if user_id:
+            statement = statement.where(Post.author_id == user_id)
+        
+        return paginate_rows(statement.order_by(Post.created_at.desc()), page, per_page, POST_WITH_AUTHOR_ROW)
+    
+    @staticmethod
+    @read_only
+    def get_posts_chunk(after_id=None, limit=500, user_id=None):
+        """
+        Partia postów (id malejąco, starsze niż after_id) do eksportu strumieniowego;
+        wiersze serializuje POST_WITH_AUTHOR_ROW.to_dict
+        """
+        statement = POST_WITH_AUTHOR_ROW.select().join(User, User.id == Post.author_id)
+        
+        if user_id:
+            statement = statement.where(Post.author_id == user_id)
+        if after_id is not None:
+            statement = statement.where(Post.id < after_id)
+        
+        return db.session.execute(statement.order_by(Post.id.desc()).limit(limit)).all()
\ No newline at end of file
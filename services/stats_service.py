@@ -0,0 +1,83 @@
+"""
+Serwis statystyk panelu administratora
+"""
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import func, select
+from database import db, read_only
+from models.author_stats import AuthorStats
+from models.comment import Comment
+from models.user import User
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class StatsService:
+    """Serwis agregatów dla administratora"""
+    
+    @staticmethod
+    def get_dashboard_stats(days=30, top=10):
+        """
+        Statystyki panelu z cache (TTL, odświeżane w tle po wygaśnięciu)
+        """
+        cache = current_app.extensions['cache']['admin_stats']
+        return cache.get((days, top), lambda: StatsService.compute_dashboard_stats(days, top))
+    
+    @staticmethod
+    @read_only
+    def compute_dashboard_stats(days=30, top=10):
+        """
+        Policz statystyki panelu czterema zapytaniami grupującymi:
+        użytkownicy (indeks role, is_active), posty i komentarze (sumy z author_stats),
+        komentarze dziennie (indeks na date(created_at)), najaktywniejsi autorzy
+        (indeks author_stats.post_count)
+        """
+        users = {}
+        for role, is_active, count in db.session.execute(
+            select(User.role, User.is_active, func.count()).group_by(User.role, User.is_active)
+        ):
+            role_stats = users.setdefault(role, {'active': 0, 'inactive': 0})
+            role_stats['active' if is_active else 'inactive'] += count
+        
+        posts, published, comments = db.session.execute(
+            select(func.sum(AuthorStats.post_count), func.sum(AuthorStats.published_count),
+                   func.sum(AuthorStats.comments_received))
+        ).one()
+        
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+        day = func.date(Comment.created_at)
+        comments_per_day = [
+            {'date': str(date), 'comments': count}
+            for date, count in db.session.execute(
+                select(day, func.count()).where(day >= since).group_by(day).order_by(day)
+            )
+        ]
+        
+        top_authors = [
+            {'id': author_id, 'username': username, **stats.to_dict()}
+            for stats, author_id, username in db.session.execute(
+                select(AuthorStats, User.id, User.username)
+                .join(User, User.id == AuthorStats.author_id)
+                .order_by(AuthorStats.post_count.desc())
+                .limit(top)
+            )
+        ]
+        
+        logger.info("Policzono statystyki panelu", days=days)
+        return {
+            'users': {
+                'total': sum(r['active'] + r['inactive'] for r in users.values()),
+                'by_role': users
+            },
+            'posts': {
+                'total': posts or 0,
+                'published': published or 0,
+                'drafts': (posts or 0) - (published or 0)
+            },
+            'comments': {
+                'total': comments or 0,
+                'per_day': comments_per_day
+            },
+            'top_authors': top_authors,
+            'generated_at': datetime.now(timezone.utc).isoformat()
+        }
@@ -1,73 +1,135 @@
-"""
-Serwis użytkowników
-"""
-from database import db
-from models.user import User
-import structlog
-
-logger = structlog.get_logger(__name__)
-
-class UserService:
-    """Serwis obsługujący logikę użytkowników"""
-    
-    @staticmethod
-    def get_all_users(page=1, per_page=20):
-        """
-        Pobierz wszystkich użytkowników z paginacją
-        """
-        return User.query.order_by(User.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
-    
-    @staticmethod
-    def get_user_by_id(user_id):
-        """
-        Pobierz użytkownika po ID
-        """
-        return User.find_by_id(user_id)
-    
-    @staticmethod
-    def toggle_user_status(user_id):
-        """
-        Przełącz status użytkownika (aktywny/nieaktywny)
-        """
-        user = User.find_by_id(user_id)
-        
-        if not user:
-            raise ValueError('Użytkownik nie znaleziony')
-        
-        user.is_active = not user.is_active
-        db.session.commit()
-        
-        logger.info("Status użytkownika zmieniony", 
-                   user_id=user_id, is_active=user.is_active)
-        return user
-    
-    @staticmethod
-    def update_user_role(user_id, new_role):
-        """
-        Aktualizuj rolę użytkownika
-        """
-        user = User.find_by_id(user_id)
-        
-        if not user:
-            raise ValueError('Użytkownik nie znaleziony')
-        
-        user.role = new_role
-        db.session.commit()
-        
-        logger.info("Rola użytkownika zaktualizowana", 
-                   user_id=user_id, new_role=new_role)
-        return user
-    
-    @staticmethod
-    def search_users(query, page=1, per_page=20):
-        """
-        Wyszukaj użytkowników
-        """
-        search_query = f"%{query}%"
-        
-        return User.query.filter(
-            (User.username.ilike(search_query)) |
-            (User.email.ilike(search_query))
-        ).order_by(User.created_at.desc())\
+"""
+Serwis użytkowników
+"""
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from database import db, retry_on_lock, read_only
+from models.author_stats import AuthorStats
+from models.read_models import USER_WITH_STATS_ROW
+from models.user import User
+from services.deletion_service import DeletionService
+from utils.pagination import paginate_rows
+from utils.write_queue import transactional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class UserService:
+    """Serwis obsługujący logikę użytkowników"""
+    
+    @staticmethod
+    @read_only
+    def get_all_users(page=1, per_page=20):
+        """
+        Pobierz wszystkich użytkowników z paginacją (słowniki ze statystykami autora)
+        """
+        statement = USER_WITH_STATS_ROW.select()\
+            .outerjoin(AuthorStats, AuthorStats.author_id == User.id)\
+            .order_by(User.created_at.desc())
+        return paginate_rows(statement, page, per_page, USER_WITH_STATS_ROW)
+    
+    @staticmethod
+    @read_only
+    def get_users_chunk(after_id=None, limit=500):
+        """
+        Partia użytkowników (id malejąco, starsi niż after_id) do eksportu strumieniowego;
+        wiersze serializuje USER_WITH_STATS_ROW.to_dict
+        """
+        statement = USER_WITH_STATS_ROW.select().outerjoin(AuthorStats, AuthorStats.author_id == User.id)
+        
+        if after_id is not None:
+            statement = statement.where(User.id < after_id)
+        
+        return db.session.execute(statement.order_by(User.id.desc()).limit(limit)).all()
+    
+    @staticmethod
+    def get_user_by_id(user_id):
+        """
+        Pobierz użytkownika po ID
+        """
+        return User.find_by_id(user_id)
+    
+    @staticmethod
+    @read_only
+    def get_author_profile(author_id):
+        """
+        Pobierz aktywnego autora ze statystykami (jedno zapytanie)
+        """
+        return User.query.options(joinedload(User.stats))\
+            .filter_by(id=author_id, is_active=True)\
+            .first()
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def toggle_user_status(user_id):
+        """
+        Przełącz status użytkownika (aktywny/nieaktywny)
+        """
+        user = User.find_by_id(user_id)
+        
+        if not user:
+            raise ValueError('Użytkownik nie znaleziony')
+        
+        user.is_active = not user.is_active
+        
+        logger.info("Status użytkownika zmieniony", 
+                   user_id=user_id, is_active=user.is_active)
+        return user
+    
+    @staticmethod
+    @retry_on_lock()
+    @transactional
+    def update_user_role(user_id, new_role):
+        """
+        Aktualizuj rolę użytkownika
+        """
+        user = User.find_by_id(user_id)
+        
+        if not user:
+            raise ValueError('Użytkownik nie znaleziony')
+        
+        user.role = new_role
+        
+        logger.info("Rola użytkownika zaktualizowana", 
+                   user_id=user_id, new_role=new_role)
+        return user
+    
+    @staticmethod
+    def delete_user(user_id):
+        """
+        Usuń użytkownika z postami i komentarzami. Konta z dużą liczbą wpisów
+        (powyżej DELETE_INLINE_MAX_ROWS) są deaktywowane i usuwane w tle.
+        Zwraca stan zadania w tle albo None, gdy usunięto od razu.
+        """
+        user = User.find_by_id(user_id)
+        
+        if not user:
+            raise ValueError('Użytkownik nie znaleziony')
+        
+        # Deaktywacja od razu - także gdy zadanie w tle czeka w kolejce
+        DeletionService.deactivate_user(user_id)
+        
+        inline_limit = current_app.config.get('DELETE_INLINE_MAX_ROWS', 2000)
+        if DeletionService.count_user_rows(user_id, inline_limit) <= inline_limit:
+            DeletionService.delete_user(user_id)
+            return None
+        
+        job = current_app.extensions['job_queue'].submit('delete_user', DeletionService.delete_user, user_id)
+        
+        logger.info("Usuwanie użytkownika zlecone w tle", user_id=user_id, job_id=job['id'])
+        return job
+    
+    @staticmethod
+    @read_only
+    def search_users(query, page=1, per_page=20):
+        """
+        Wyszukaj użytkowników
+        """
+        search_query = f"%{query}%"
+        
+        return User.query.filter(
+            (User.username.ilike(search_query)) |
+            (User.email.ilike(search_query))
+        ).order_by(User.created_at.desc())\
          .paginate(page=page, per_page=per_page, error_out=False)
\ No newline at end of file
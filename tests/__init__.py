@@ -1,3 +1,3 @@
-"""
-Tests package
+"""
+Tests package
 """
\ No newline at end of file
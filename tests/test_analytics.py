@@ -0,0 +1,113 @@
+"""
+Testy analityki aktywności
+"""
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import create_app
+from database import db
+from models.user import User
+from models.post import Post
+from models.comment import Comment
+from services.analytics_service import AnalyticsService
+from config import TestingConfig
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)  # poniedziałek
+END = datetime(2024, 1, 22, tzinfo=timezone.utc)
+
+def at(row, created_at):
+    row.created_at = created_at
+    return row
+
+class TestAnalytics:
+    """Testy endpointu /api/admin/analytics"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową z aktywnością w styczniu 2024"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            alice = User('alice', 'alice@example.org', 'Test123!')
+            bob = User('bob', 'bob@example.org', 'Test123!')
+            admin = User('analyticsadmin', 'analyticsadmin@example.org', 'Admin123!', role='ADMIN')
+            db.session.add_all([alice, bob, admin])
+            db.session.flush()
+
+            # alice: kohorta 1. tygodnia, aktywna w 2.; bob: kohorta 2. tygodnia
+            first = at(Post('Pierwszy post', 'Treść pierwszego posta', alice.id), START + timedelta(hours=10))
+            second = at(Post('Drugi post', 'Treść drugiego posta', bob.id), START + timedelta(days=8, hours=10))
+            db.session.add_all([first, second])
+            db.session.flush()
+            db.session.add_all([
+                at(Comment('Szybki', bob.id, first.id), first.created_at + timedelta(seconds=30)),
+                at(Comment('Wolny', alice.id, first.id), first.created_at + timedelta(days=8)),
+                # Poza zakresem
+                at(Comment('Późny', alice.id, second.id), END + timedelta(days=1)),
+            ])
+            db.session.commit()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        client = app.test_client()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'analyticsadmin', 'password': 'Admin123!'}),
+                    content_type='application/json')
+        return client
+
+    def test_activity_sql(self, app, client):
+        """Test histogramów, kohort i czasu do komentarza liczonych w bazie"""
+        app.config['ANALYTICS_ENGINE'] = 'sql'
+        response = client.get('/api/admin/analytics?from=2024-01-01&to=2024-01-22')
+        assert response.status_code == 200
+        activity = response.get_json()
+
+        assert activity['engine'] == 'sql'
+        assert activity['posts']['per_hour'][10] == 2
+        assert activity['posts']['per_weekday'][0] == 1 and activity['posts']['per_weekday'][1] == 1
+        assert len(activity['comments']['per_day']) == 21
+        assert sum(day['count'] for day in activity['comments']['per_day']) == 2
+        assert activity['cohorts'] == [
+            {'week': '2024-01-01', 'authors': 1, 'retention': [1.0, 1.0]},
+            {'week': '2024-01-08', 'authors': 1, 'retention': [1.0]},
+        ]
+        buckets = {bucket['le']: bucket['count'] for bucket in activity['comment_latency']['buckets']}
+        assert buckets[60] == 1 and buckets[30 * 86400] == 1
+
+        # Jawne przesunięcie przeliczane na UTC: 12:00+02:00 to 10:00 UTC - pierwszy post w zakresie
+        response = client.get('/api/admin/analytics?from=2024-01-01T12:00%2B02:00&to=2024-01-02')
+        assert response.get_json()['posts']['per_hour'][10] == 1
+
+        assert client.get('/api/admin/analytics?from=2024-02-01&to=2024-01-01').status_code == 400
+        assert client.get('/api/admin/analytics?from=wczoraj').status_code == 400
+
+    def test_numpy_matches_sql(self, app):
+        """Test - wyniki NumPy zgodne z GROUP BY (bez percentyli, w SQL przybliżonych)"""
+        pytest.importorskip('numpy')
+        app.config['ANALYTICS_CHUNK_SIZE'] = 1
+        vectorized = AnalyticsService.compute_numpy(START, END)
+        grouped = AnalyticsService.compute_sql(START, END)
+        for key in ('posts', 'comments', 'cohorts'):
+            assert vectorized[key] == grouped[key]
+        assert vectorized['comment_latency']['buckets'] == grouped['comment_latency']['buckets']
+
+    def test_rows_with_out_of_order_ids(self, app):
+        """Test - wiersz z id spoza kolejności created_at (import, jawna data) nie jest pomijany"""
+        pytest.importorskip('numpy')
+        alice = User.find_by_username('alice')
+        # Najwyższe id, ale najwcześniejsza data w zakresie
+        imported = at(Post('Import', 'Treść zaimportowanego posta', alice.id), START + timedelta(minutes=5))
+        db.session.add(imported)
+        db.session.flush()
+        db.session.add(at(Comment('Import', alice.id, imported.id), START + timedelta(minutes=6)))
+        db.session.commit()
+
+        app.config['ANALYTICS_CHUNK_SIZE'] = 1
+        vectorized = AnalyticsService.compute_numpy(START, END)
+        assert sum(vectorized['posts']['per_hour']) == 3
+        assert sum(day['count'] for day in vectorized['comments']['per_day']) == 3
+        grouped = AnalyticsService.compute_sql(START, END)
+        assert vectorized['posts'] == grouped['posts'] and vectorized['comments'] == grouped['comments']
@@ -0,0 +1,84 @@
+"""
+Testy zmaterializowanych statystyk autorów
+"""
+import json
+import pytest
+from app import create_app
+from database import db
+from models.user import User
+from models.author_stats import AuthorStats
+from services.author_stats_service import AuthorStatsService
+from config import TestingConfig
+
+def stats_snapshot():
+    return {row.author_id: row.to_dict() for row in AuthorStats.query.all()}
+
+class TestAuthorStats:
+    """Testy utrzymywania i przeliczania author_stats"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    def login(self, app, username, password):
+        client = app.test_client()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': username, 'password': password}),
+                    content_type='application/json')
+        return client
+
+    def test_stats_maintained_on_writes(self, app):
+        """Test - statystyki po zapisach zgodne z pełnym przeliczeniem"""
+        db.session.add_all([
+            User('statsauthor', 'statsauthor@example.org', 'Test123!'),
+            User('statsreader', 'statsreader@example.org', 'Test123!'),
+            User('statsadmin', 'statsadmin@example.org', 'Admin123!', role='ADMIN'),
+        ])
+        db.session.commit()
+        author_id = User.find_by_username('statsauthor').id
+        reader_id = User.find_by_username('statsreader').id
+
+        author = self.login(app, 'statsauthor', 'Test123!')
+        reader = self.login(app, 'statsreader', 'Test123!')
+        post_ids = []
+        for i in range(3):
+            response = author.post('/api/posts',
+                                   data=json.dumps({'title': f'Post statystyk {i}',
+                                                    'content': f'Treść posta statystyk {i}',
+                                                    'is_published': i != 2}),
+                                   content_type='application/json')
+            post_ids.append(response.get_json()['post']['id'])
+        reader.post('/api/posts', data=json.dumps({'title': 'Post czytelnika', 'content': 'Treść posta czytelnika'}),
+                    content_type='application/json')
+        for post_id in post_ids[:2]:
+            reader.post(f'/api/posts/{post_id}/comments', data=json.dumps({'content': 'Komentarz'}),
+                        content_type='application/json')
+        author.put(f'/api/posts/{post_ids[2]}',
+                   data=json.dumps({'title': 'Post statystyk 2', 'content': 'Treść posta statystyk 2',
+                                    'is_published': True}),
+                   content_type='application/json')
+        author.delete(f'/api/posts/{post_ids[0]}')
+
+        stats = app.test_client().get(f'/api/posts/authors/{author_id}').get_json()['stats']
+        assert (stats['post_count'], stats['published_count'], stats['comments_received']) == (2, 2, 1)
+
+        maintained = stats_snapshot()
+        AuthorStatsService.reconcile()
+        db.session.expire_all()
+        assert stats_snapshot() == maintained
+
+        # Usunięcie czytelnika zmniejsza licznik komentarzy autora
+        admin = self.login(app, 'statsadmin', 'Admin123!')
+        assert admin.delete(f'/api/admin/users/{reader_id}').status_code == 200
+        db.session.expire_all()
+        assert reader_id not in stats_snapshot()
+        assert stats_snapshot()[author_id]['comments_received'] == 0
+
+        users = admin.get('/api/admin/users').get_json()['users']
+        assert {user['username']: user['stats']['post_count'] for user in users} == {'statsauthor': 2, 'statsadmin': 0}
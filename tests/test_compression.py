@@ -0,0 +1,54 @@
+"""
+Testy kompresji odpowiedzi
+"""
+import gzip
+import json
+import pytest
+from app import create_app
+from database import db
+from models.user import User
+from config import TestingConfig
+
+class TestCompression:
+    """Testy middleware kompresji"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową z długimi postami"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            db.session.add(User('gzipauthor', 'gzipauthor@example.org', 'Test123!'))
+            db.session.commit()
+            client = app.test_client()
+            client.post('/api/auth/login',
+                        data=json.dumps({'username': 'gzipauthor', 'password': 'Test123!'}),
+                        content_type='application/json')
+            for i in range(3):
+                client.post('/api/posts',
+                            data=json.dumps({'title': f'Długi post {i}', 'content': 'Treść długiego posta. ' * 200}),
+                            content_type='application/json')
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    def test_gzip_negotiated_and_cached(self, app):
+        """Test - gzip dla dużych odpowiedzi, skompresowane ciało liczone raz"""
+        client = app.test_client()
+        plain = client.get('/api/posts')
+        assert 'Content-Encoding' not in plain.headers
+
+        compressed = client.get('/api/posts', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert int(compressed.headers['Content-Length']) < len(plain.get_data()) // 5
+        assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+        cache = app.extensions['compression_cache']
+        client.get('/api/posts', headers={'Accept-Encoding': 'gzip'})
+        assert len(cache._entries) == 1
+
+    def test_small_response_not_compressed(self, app):
+        """Test - małe odpowiedzi bez kompresji"""
+        response = app.test_client().get('/hello', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,197 @@
+"""
+Testy konfiguracji SQLite i ponawiania zapisów
+"""
+import json
+import threading
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from database import db, retry_on_lock, READ_PRIMARY_COOKIE
+from models.user import User
+from models.post import Post
+from services.post_service import PostService
+from utils.metrics import registry
+from config import TestingConfig
+
+class TestDatabase:
+    """Testy profilu SQLite"""
+
+    def test_pragmas_applied_to_file_database(self, tmp_path):
+        """Test - WAL i pragmy ustawione na połączeniu do pliku"""
+        class FileDatabaseConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'blog.db')
+
+        app = create_app(FileDatabaseConfig)
+        with app.app_context():
+            assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+            assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+            assert db.session.execute(text('PRAGMA temp_store')).scalar() == 2  # MEMORY
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_retry_on_lock(self):
+        """Test ponawiania po 'database is locked' i przepuszczania innych błędów"""
+        app = create_app(TestingConfig)
+        calls = []
+
+        @retry_on_lock(max_attempts=3, base_delay=0)
+        def flaky_write():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('INSERT', {}, Exception('database is locked'))
+            return 'ok'
+
+        @retry_on_lock(max_attempts=3, base_delay=0)
+        def broken_write():
+            calls.append(1)
+            raise OperationalError('INSERT', {}, Exception('no such table: posts'))
+
+        with app.app_context():
+            assert flaky_write() == 'ok'
+            assert len(calls) == 3
+
+            calls.clear()
+            with pytest.raises(OperationalError):
+                broken_write()
+            assert len(calls) == 1
+
+    def test_reads_routed_to_memory_replica(self, tmp_path):
+        """Test - odczyty z repliki, a klient po zapisie czyta z bazy głównej"""
+        class ReplicaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'blog.db')
+            SQLALCHEMY_REPLICA_URI = 'memory'
+            REPLICA_REFRESH_INTERVAL = 3600
+
+        app = create_app(ReplicaConfig)
+        replica = app.extensions['db_replica']
+        with app.app_context():
+            db.create_all()
+            author = User('replicauser', 'replica@example.org', 'Test123!')
+            db.session.add(author)
+            db.session.commit()
+            db.session.add(Post('Pierwszy post', 'Treść pierwszego posta', author.id))
+            db.session.commit()
+            db.session.remove()
+
+        try:
+            replica.refresh()
+            client = app.test_client()
+            assert client.get('/api/posts').get_json()['total'] == 1
+
+            # Zapis innego klienta - replika jeszcze go nie widzi
+            writer = app.test_client()
+            writer.post('/api/auth/login',
+                        data=json.dumps({'username': 'replicauser', 'password': 'Test123!'}),
+                        content_type='application/json')
+            response = writer.post('/api/posts',
+                                   data=json.dumps({'title': 'Drugi post', 'content': 'Treść drugiego posta'}),
+                                   content_type='application/json')
+            assert response.status_code == 201
+            assert READ_PRIMARY_COOKIE in response.headers.get('Set-Cookie', '')
+
+            assert client.get('/api/posts').get_json()['total'] == 1
+            assert writer.get('/api/posts').get_json()['total'] == 2
+
+            replica.refresh()
+            assert client.get('/api/posts').get_json()['total'] == 2
+
+            gauges = {name for name, _, _ in registry.snapshot()['gauges']}
+            assert 'blog_db_replica_staleness_seconds' in gauges
+        finally:
+            replica.stop()
+            with app.app_context():
+                db.engine.dispose()
+
+    def test_replica_read_then_update_in_one_request(self, tmp_path):
+        """Test - odczyt z repliki i zapis w jednym żądaniu; zapis działa na danych bazy głównej"""
+        class ReplicaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'blog.db')
+            SQLALCHEMY_REPLICA_URI = 'memory'
+            REPLICA_REFRESH_INTERVAL = 3600
+
+        app = create_app(ReplicaConfig)
+        replica = app.extensions['db_replica']
+        with app.app_context():
+            db.create_all()
+            author = User('replicaeditor', 'editor@example.org', 'Test123!')
+            db.session.add(author)
+            db.session.commit()
+            post = Post('Post z repliki', 'Treść posta z repliki', author.id)
+            db.session.add(post)
+            db.session.commit()
+            post_id = post.id
+            db.session.remove()
+
+        try:
+            replica.current_engine()  # start wątku odświeżającego
+            replica.refresh()
+            # Zmiana w bazie głównej, której replika jeszcze nie widzi
+            with app.app_context():
+                db.session.get(Post, post_id).is_published = False
+                db.session.get(User, author.id).username = 'renamededitor'
+                db.session.commit()
+
+            with app.test_request_context():
+                user = User.find_by_id(author.id)
+                replica_post = PostService.get_post_by_id(post_id)
+                assert replica_post.is_published is True
+
+                updated = PostService.update_post(post_id, 'Nowy tytuł', 'Nowa treść posta', True, user)
+                assert updated is not replica_post
+                # Leniwe ładowanie po wyjściu z bloku nadal czyta z repliki
+                assert replica_post.author.username == 'replicaeditor'
+
+            with app.app_context():
+                stored = db.session.get(Post, post_id)
+                assert (stored.title, stored.is_published) == ('Nowy tytuł', True)
+                db.session.remove()
+        finally:
+            replica.stop()
+            with app.app_context():
+                db.engine.dispose()
+
+    def test_write_queue_group_commit(self, tmp_path):
+        """Test kolejki zapisów - wspólne commity, osobne wyniki i błędy"""
+        class WriteQueueConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'blog.db')
+            WRITE_QUEUE_ENABLED = True
+            WRITE_QUEUE_MAX_DELAY_MS = 20
+
+        app = create_app(WriteQueueConfig)
+        with app.app_context():
+            db.create_all()
+            author = User('queueuser', 'queue@example.org', 'Test123!')
+            db.session.add(author)
+            db.session.commit()
+
+        results, errors = [], []
+        commits_before = registry.snapshot()['counters']
+
+        def create(index, author):
+            with app.app_context():
+                try:
+                    post = PostService.create_post(f'Post z kolejki {index}', 'Treść posta z kolejki', author)
+                    results.append((post.id, post.title))
+                except ValueError as e:
+                    errors.append(str(e))
+
+        threads = [threading.Thread(target=create, args=(i, author)) for i in range(10)]
+        threads.append(threading.Thread(target=create, args=(99, None)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        app.extensions['write_queue'].stop()
+
+        assert len(results) == 10
+        assert all(post_id for post_id, _ in results)
+        assert errors == ['Użytkownik nie znaleziony']
+        with app.app_context():
+            assert Post.query.count() == 10
+            db.engine.dispose()
+
+        def commits(counters):
+            return sum(value for name, _, value in counters if name == 'blog_db_write_commits_total')
+        assert commits(registry.snapshot()['counters']) - commits(commits_before) < 10
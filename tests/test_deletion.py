@@ -0,0 +1,112 @@
+"""
+Testy kaskadowego usuwania użytkowników i postów
+"""
+import json
+import pytest
+from sqlalchemy import event
+from app import create_app
+from database import db
+from models.user import User
+from models.post import Post
+from models.comment import Comment
+from config import TestingConfig
+
+class TestDeletion:
+    """Testy usuwania partiami"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację z małymi partiami usuwania"""
+        class DeletionConfig(TestingConfig):
+            DELETE_CHUNK_SIZE = 3
+
+        app = create_app(DeletionConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def data(self, app):
+        """Autor z postami i komentarzami, drugi użytkownik komentujący oraz admin"""
+        author = User('prolific', 'prolific@example.org', 'Test123!')
+        other = User('otheruser', 'other@example.org', 'Test123!')
+        admin = User('deladmin', 'deladmin@example.org', 'Admin123!', role='ADMIN')
+        db.session.add_all([author, other, admin])
+        db.session.commit()
+
+        posts = [Post(f'Post autora {i}', 'Treść posta autora', author.id) for i in range(7)]
+        other_post = Post('Post innego użytkownika', 'Treść innego posta', other.id)
+        db.session.add_all(posts + [other_post])
+        db.session.commit()
+
+        comments = [Comment(f'Komentarz {i}', other.id, posts[i % 7].id) for i in range(10)]
+        comments += [Comment(f'Odpowiedź {i}', author.id, other_post.id) for i in range(4)]
+        comments.append(Comment('Komentarz innego', other.id, other_post.id))
+        db.session.add_all(comments)
+        db.session.commit()
+
+        return {'author_id': author.id, 'other_id': other.id, 'other_post_id': other_post.id,
+                'post_id': posts[0].id}
+
+    @pytest.fixture
+    def client(self, app, data):
+        """Klient zalogowany jako admin"""
+        client = app.test_client()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'deladmin', 'password': 'Admin123!'}),
+                    content_type='application/json')
+        return client
+
+    def test_delete_user_removes_posts_and_comments(self, app, client, data):
+        """Test - usunięcie użytkownika zbiorczymi DELETE, bez ładowania postów"""
+        loaded = []
+
+        def on_load(target, context):
+            loaded.append(target)
+
+        event.listen(Post, 'load', on_load)
+        try:
+            response = client.delete(f'/api/admin/users/{data["author_id"]}')
+        finally:
+            event.remove(Post, 'load', on_load)
+
+        assert response.status_code == 200
+        assert loaded == []
+        assert db.session.get(User, data['author_id']) is None
+        assert Post.query.filter_by(author_id=data['author_id']).count() == 0
+        assert Comment.query.filter_by(author_id=data['author_id']).count() == 0
+        # Zostaje tylko komentarz innego użytkownika pod jego własnym postem
+        assert [comment.post_id for comment in Comment.query.all()] == [data['other_post_id']]
+        assert Post.query.count() == 1
+
+    def test_delete_large_user_in_background(self, app, client, data):
+        """Test - duże konto usuwane przez kolejkę zadań (status pod /api/admin/jobs)"""
+        app.config['DELETE_INLINE_MAX_ROWS'] = 5
+
+        response = client.delete(f'/api/admin/users/{data["author_id"]}')
+        assert response.status_code == 202
+        job = response.get_json()['job']
+
+        response = client.get(f'/api/admin/jobs/{job["id"]}')
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'done'
+        assert response.get_json()['result'] == {'posts': 7, 'comments': 14}
+        assert db.session.get(User, data['author_id']) is None
+
+        assert client.get('/api/admin/jobs/0-0').status_code == 404
+
+    def test_delete_post_removes_comments(self, app, data):
+        """Test - usunięcie posta usuwa jego komentarze"""
+        client = app.test_client()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'prolific', 'password': 'Test123!'}),
+                    content_type='application/json')
+
+        response = client.delete(f'/api/posts/{data["post_id"]}')
+
+        assert response.status_code == 200
+        assert db.session.get(Post, data['post_id']) is None
+        assert Comment.query.filter_by(post_id=data['post_id']).count() == 0
+        assert Comment.query.count() == 13
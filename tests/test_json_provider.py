@@ -0,0 +1,39 @@
+"""
+Testy providera JSON odpowiedzi
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+import pytest
+from app import create_app
+from utils.json_provider import FastJSONProvider, orjson
+from config import TestingConfig
+
+ENGINES = ['stdlib'] + (['orjson'] if orjson is not None else [])
+
+class TestJSONProvider:
+    """Testy FastJSONProvider"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        return create_app(TestingConfig)
+
+    @pytest.mark.parametrize('engine', ENGINES)
+    def test_response_encoding(self, app, engine):
+        """Test - daty jako ISO 8601, zwarty zapis bez sortowania kluczy"""
+        provider = FastJSONProvider(app, engine=engine)
+        payload = {
+            'b': 'Zażółć gęślą jaźń',
+            'a': [datetime(2024, 1, 2, 3, 4, 5, 678000), datetime(2024, 1, 2, tzinfo=timezone.utc)],
+            1: None,
+        }
+        with app.app_context():
+            body = provider.response(payload).get_data()
+
+        assert body.startswith(b'{"b":"') and body.endswith(b'"],"1":null}\n')
+        assert b'"a":["2024-01-02T03:04:05.678000","2024-01-02T00:00:00+00:00"]' in body
+        assert provider.loads(body) == {'b': 'Zażółć gęślą jaźń',
+                                        'a': ['2024-01-02T03:04:05.678000', '2024-01-02T00:00:00+00:00'],
+                                        '1': None}
+        # Decimal jako tekst, bez zaokrąglenia do float
+        assert provider.dumps({'kwota': Decimal('0.10000000000000000001')}) == '{"kwota":"0.10000000000000000001"}'
@@ -0,0 +1,259 @@
+"""
+Testy potoku logowania
+"""
+import io
+import pytest
+import logging
+import structlog
+from utils import async_logging
+from utils.async_logging import AsyncLogWriter, BatchedStreamHandler, DeferredJSONFormatter
+
+class TestAsyncLogging:
+    """Testy asynchronicznego zapisu logów"""
+    
+    def _writer(self, stream, **kwargs):
+        handler = BatchedStreamHandler(stream)
+        handler.setFormatter(DeferredJSONFormatter('%(levelname)s %(message)s'))
+        return AsyncLogWriter([handler], **kwargs)
+    
+    def test_records_written_in_background_and_flushed_on_stop(self):
+        """Test zapisu w tle i opróżnienia kolejki przy zatrzymaniu"""
+        stream = io.StringIO()
+        writer = self._writer(stream)
+        logger = logging.getLogger('test.async')
+        logger.propagate = False
+        logger.addHandler(writer.queue_handler)
+        writer.start()
+        try:
+            for i in range(100):
+                logger.warning('rekord %d', i)
+        finally:
+            writer.stop()
+            logger.removeHandler(writer.queue_handler)
+        
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 100
+        assert lines[-1] == 'WARNING rekord 99'
+        assert writer.stats.snapshot()['written'] == 100
+    
+    def test_full_queue_drops_low_priority_records(self):
+        """Test polityki przepełnienia - INFO odrzucane i liczone"""
+        stream = io.StringIO()
+        writer = self._writer(stream, queue_size=5, block_timeout=0.01)
+        logger = logging.getLogger('test.async.full')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(writer.queue_handler)
+        try:
+            # Wątek zapisujący nie działa - kolejka szybko się zapełnia
+            for i in range(20):
+                logger.info('rekord %d', i)
+        finally:
+            logger.removeHandler(writer.queue_handler)
+        
+        stats = writer.stats.snapshot()
+        assert stats['enqueued'] == 5
+        assert stats['dropped'] == 15
+        
+        writer.start()
+        writer.stop()
+        assert 'odrzucono 15' in stream.getvalue()
+    
+    def test_fork_hook_tracks_running_writers(self):
+        """Test - jeden hook fork() na proces obsługuje tylko uruchomione wątki zapisujące"""
+        first, second = self._writer(io.StringIO()), self._writer(io.StringIO())
+        first.start()
+        second.start()
+        second.stop()
+        try:
+            assert first in async_logging._running_writers
+            assert second not in async_logging._running_writers
+        finally:
+            first.stop()
+        assert first not in async_logging._running_writers
+    
+    def test_structlog_event_rendered_as_json(self):
+        """Test renderowania event_dict structloga w wątku zapisującym"""
+        formatter = DeferredJSONFormatter('%(message)s')
+        record = logging.makeLogRecord({
+            'name': 'app', 'levelno': logging.INFO, 'levelname': 'INFO',
+            'msg': {'event': 'Żądanie HTTP', 'path': '/api/posts'},
+            '_logger': structlog.get_logger(), '_name': 'info'
+        })
+        assert formatter.format(record) == '{"event": "\\u017b\\u0105danie HTTP", "path": "/api/posts"}'
+
+
+class TestLogSampling:
+    """Testy próbkowania i limitowania zdarzeń"""
+    
+    def test_sample_rate_and_suppressed_summary(self):
+        """Test próbkowania per nazwa zdarzenia z podsumowaniem pominiętych"""
+        from utils.log_sampling import LogSampler
+        
+        draws = iter([0.5, 0.5, 0.5, 0.05])
+        sampler = LogSampler(sample_rates={'Health check requested': 0.1},
+                             random_func=lambda: next(draws))
+        
+        for _ in range(3):
+            with pytest.raises(structlog.DropEvent):
+                sampler(None, 'info', {'event': 'Health check requested'})
+        
+        kept = sampler(None, 'info', {'event': 'Health check requested'})
+        assert kept['suppressed'] == 3
+        assert sampler(None, 'info', {'event': 'Inne zdarzenie'}) == {'event': 'Inne zdarzenie'}
+    
+    def test_warnings_are_never_dropped(self):
+        """Test - ostrzeżenia i błędy zawsze przechodzą"""
+        from utils.log_sampling import LogSampler
+        
+        sampler = LogSampler(sample_rates={'Błąd': 0.0}, rate=1, burst=1)
+        for _ in range(10):
+            assert sampler(None, 'error', {'event': 'Błąd'}) == {'event': 'Błąd'}
+    
+    def test_token_bucket_per_event(self):
+        """Test limitu częstotliwości zdarzeń o tej samej nazwie"""
+        from utils.log_sampling import LogSampler
+        
+        now = [0.0]
+        sampler = LogSampler(rate=1, burst=2, clock=lambda: now[0])
+        sampler(None, 'info', {'event': 'Żądanie HTTP'})
+        sampler(None, 'info', {'event': 'Żądanie HTTP'})
+        with pytest.raises(structlog.DropEvent):
+            sampler(None, 'info', {'event': 'Żądanie HTTP'})
+        
+        now[0] = 1.0
+        assert sampler(None, 'info', {'event': 'Żądanie HTTP'})['suppressed'] == 1
+        assert sampler.get_stats()['rate_limited'] == 1
+    
+    def test_per_event_state_is_bounded(self):
+        """Test - stan per nazwa zdarzenia ograniczony (LRU), zdarzenia bezpieczeństwa bez limitu"""
+        from utils.log_sampling import LogSampler
+        
+        sampler = LogSampler(rate=1, burst=1, clock=lambda: 0.0, max_events=3)
+        for i in range(10):
+            sampler(None, 'info', {'event': f'Zdarzenie {i}'})
+            with pytest.raises(structlog.DropEvent):
+                sampler(None, 'info', {'event': f'Zdarzenie {i}'})
+        assert len(sampler._buckets) == 3 and len(sampler._suppressed) == 3
+        assert sampler.get_stats()['evicted'] == 14
+        
+        security = logging.getLogger('security')
+        for _ in range(5):
+            assert sampler(security, 'info', {'event': 'Zdarzenie 9'}) == {'event': 'Zdarzenie 9'}
+
+
+class TestLogRotation:
+    """Testy rotacji, kompresji i retencji plików logów"""
+    
+    def _handler(self, directory, **kwargs):
+        from utils.log_rotation import SafeRotatingFileHandler
+        
+        handler = SafeRotatingFileHandler(str(directory), 'app', **kwargs)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        return handler
+    
+    def _write(self, handler, message):
+        # Jak AsyncLogWriter: sprawdzenie rotacji, zapis, flush raz na partię
+        handler.begin_batch()
+        handler.handle(logging.makeLogRecord({'msg': message, 'levelno': logging.INFO}))
+        handler.flush_batch()
+    
+    def test_size_rotation_and_compression(self, tmp_path):
+        """Test rotacji po przekroczeniu rozmiaru i kompresji w tle"""
+        import gzip
+        import os
+        from utils.log_rotation import LogMaintenance
+        
+        maintenance = LogMaintenance(str(tmp_path), ['app'], compress=True, grace_seconds=0)
+        handler = self._handler(tmp_path, max_bytes=100, maintenance=maintenance)
+        maintenance.handlers = [handler]
+        
+        self._write(handler, 'x' * 150)
+        self._write(handler, 'nowy plik')
+        
+        rotated = [name for name in os.listdir(tmp_path)
+                   if name.endswith('.log') and name.count('.') == 2]
+        assert len(rotated) == 1
+        
+        maintenance.run_once()
+        handler.close()
+        
+        compressed = [name for name in os.listdir(tmp_path) if name.endswith('.log.gz')]
+        assert len(compressed) == 1
+        with gzip.open(tmp_path / compressed[0], 'rt') as f:
+            assert f.read() == 'x' * 150 + '\n'
+        with open(handler.baseFilename) as f:
+            assert f.read() == 'nowy plik\n'
+    
+    def test_second_process_reopens_rotated_file(self, tmp_path):
+        """Test - drugi handler (jak inny proces) przechodzi na nowy plik po rotacji"""
+        import os
+        
+        first = self._handler(tmp_path, max_bytes=100)
+        second = self._handler(tmp_path, max_bytes=100)
+        
+        self._write(first, 'x' * 150)
+        self._write(second, 'y')
+        self._write(first, 'z')
+        
+        first.close()
+        second.close()
+        with open(first.baseFilename) as f:
+            assert f.read() == 'y\nz\n'
+    
+    def test_idle_process_moves_to_new_period_before_writing(self, tmp_path, monkeypatch):
+        """Test - proces bezczynny przez koniec okresu nie pisze do skompresowanego pliku"""
+        import gzip
+        import os
+        from utils.log_rotation import LogMaintenance, SafeRotatingFileHandler
+        
+        period = ['202001']
+        monkeypatch.setattr(SafeRotatingFileHandler, '_current_period', lambda self: period[0])
+        maintenance = LogMaintenance(str(tmp_path), ['app'], compress=True)
+        active = self._handler(tmp_path, maintenance=maintenance)
+        idle = self._handler(tmp_path)
+        maintenance.handlers = [active]
+        self._write(active, 'a1')
+        self._write(idle, 'b1')
+        
+        period[0] = '202002'
+        self._write(active, 'a2')
+        maintenance.run_once()
+        self._write(idle, 'b2')
+        active.close()
+        idle.close()
+        
+        assert not os.path.exists(tmp_path / 'app_202001.log')
+        with gzip.open(tmp_path / 'app_202001.log.gz', 'rt') as f:
+            assert f.read() == 'a1\nb1\n'
+        with open(tmp_path / 'app_202002.log') as f:
+            assert f.read() == 'a2\nb2\n'
+    
+    def test_current_period_file_never_compressed(self, tmp_path):
+        """Test - plik bieżącego okresu zostaje, nawet gdy dawno nie był zmieniany"""
+        import os
+        from datetime import datetime
+        from utils.log_rotation import LogMaintenance
+        
+        path = tmp_path / f'app_{datetime.now().strftime("%Y%m")}.log'
+        path.write_text('otwarty w innym procesie\n')
+        os.utime(path, (1000, 1000))
+        
+        LogMaintenance(str(tmp_path), ['app'], compress=True, backup_count=1).run_once()
+        
+        assert path.read_text() == 'otwarty w innym procesie\n'
+    
+    def test_retention_keeps_newest_backups(self, tmp_path):
+        """Test retencji - limit liczby zrotowanych plików"""
+        import os
+        from utils.log_rotation import LogMaintenance
+        
+        for i in range(5):
+            path = tmp_path / f'app_2026010{i}.log.gz'
+            path.write_bytes(b'')
+            os.utime(path, (1000 + i, 1000 + i))
+        
+        LogMaintenance(str(tmp_path), ['app'], compress=False, backup_count=2).run_once(now=2000)
+        
+        remaining = sorted(name for name in os.listdir(tmp_path) if name.endswith('.gz'))
+        assert remaining == ['app_20260103.log.gz', 'app_20260104.log.gz']
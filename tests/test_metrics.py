@@ -0,0 +1,84 @@
+"""
+Testy metryk aplikacji
+"""
+import json
+import math
+import pytest
+from app import create_app
+from database import db
+from config import TestingConfig
+from models.user import User
+from utils.metrics import (
+    MultiProcessStore, merge_snapshots, render_prometheus, histogram_quantile
+)
+
+class TestMetrics:
+    """Testy rejestru metryk, łączenia migawek i endpointu"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        """Fixture tworzący klienta testowego"""
+        return app.test_client()
+
+    def test_histogram_quantile(self):
+        """Test interpolacji kwantyla z kubełków"""
+        bounds = [0.1, 0.2, 0.4]
+        counts = [50, 40, 10, 0]
+        assert histogram_quantile(0.5, bounds, counts) == pytest.approx(0.1)
+        assert histogram_quantile(0.9, bounds, counts) == pytest.approx(0.2)
+        assert math.isnan(histogram_quantile(0.5, bounds, [0, 0, 0, 0]))
+
+    def test_multiprocess_snapshots_are_merged(self, tmp_path):
+        """Test łączenia migawek kilku procesów"""
+        store = MultiProcessStore(str(tmp_path))
+        snapshot = {
+            'counters': [['blog_http_requests_total', [['endpoint', 'posts.get_posts']], 2]],
+            'histograms': [],
+            'gauges': []
+        }
+        for pid in (101, 102):
+            with open(tmp_path / f'{pid}.json', 'w') as f:
+                json.dump(dict(snapshot, pid=pid), f)
+
+        counters, _, _ = merge_snapshots(store.load_all())
+        output = render_prometheus(counters, {}, {})
+
+        assert 'blog_http_requests_total{endpoint="posts.get_posts"} 4' in output
+
+    def test_server_timing_header(self, client):
+        """Test nagłówka Server-Timing z liczbą zapytań SQL"""
+        response = client.get('/api/posts')
+
+        assert response.status_code == 200
+        server_timing = response.headers['Server-Timing']
+        assert server_timing.startswith('app;dur=')
+        assert 'queries"' in server_timing
+
+    def test_metrics_endpoint_requires_admin(self, app, client):
+        """Test endpointu /api/admin/metrics"""
+        assert client.get('/api/admin/metrics').status_code == 401
+
+        db.session.add(User('metricsadmin', 'admin@example.org', 'Admin123!', role='ADMIN'))
+        db.session.commit()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'metricsadmin', 'password': 'Admin123!'}),
+                    content_type='application/json')
+        client.get('/api/posts')
+
+        response = client.get('/api/admin/metrics')
+
+        assert response.status_code == 200
+        body = response.get_data(as_text=True)
+        assert 'blog_http_requests_total{endpoint="posts.get_posts",method="GET",status="200"}' in body
+        assert 'blog_http_request_duration_seconds_bucket' in body
+        assert 'blog_db_queries_total' in body
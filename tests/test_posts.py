@@ -1,200 +1,359 @@
-"""
-Testy postów blogowych
-"""
-import pytest
-from app import create_app
-from database import db
-from config import TestingConfig
-import json
-
-class TestPosts:
-    """Testy endpointów postów"""
-    
-    @pytest.fixture
-    def app(self):
-        """Fixture tworzący aplikację testową"""
-        app = create_app(TestingConfig)
-        with app.app_context():
-            db.create_all()
-            yield app
-            db.session.remove()
-            db.drop_all()
-    
-    @pytest.fixture
-    def client(self, app):
-        """Fixture tworzący klienta testowego"""
-        return app.test_client()
-    
-    @pytest.fixture
-    def auth_headers(self, client):
-        """Fixture tworzący nagłówki autoryzacji"""
-        # Zarejestruj i zaloguj użytkownika
-        register_data = {
-            'username': 'testuser',
-            'email': 'test@example.org',  # Zmieniono na example.org
-            'password': 'Test123!'
-        }
-        
-        client.post('/api/auth/register',
-                   data=json.dumps(register_data),
-                   content_type='application/json')
-        
-        login_data = {
-            'username': 'testuser',
-            'password': 'Test123!'
-        }
-        
-        login_response = client.post('/api/auth/login',
-                                   data=json.dumps(login_data),
-                                   content_type='application/json')
-        
-        tokens = login_response.get_json()
-        access_token = tokens['access_token']
-        
-        return {
-            'Authorization': f'Bearer {access_token}',
-            'Content-Type': 'application/json'
-        }
-    
-    def test_create_post_success(self, client, auth_headers):
-        """Test tworzenia posta"""
-        data = {
-            'title': 'Testowy post',
-            'content': 'To jest treść testowego posta',
-            'is_published': True
-        }
-        
-        response = client.post('/api/posts',
-                             data=json.dumps(data),
-                             headers=auth_headers)
-        
-        assert response.status_code == 201
-        json_data = response.get_json()
-        assert json_data['message'] == 'Post utworzony pomyślnie'
-        assert 'post' in json_data
-        assert json_data['post']['title'] == 'Testowy post'
-    
-    def test_create_post_missing_title(self, client, auth_headers):
-        """Test tworzenia posta bez tytułu"""
-        data = {
-            'content': 'To jest treść testowego posta',
-            'is_published': True
-        }
-        
-        response = client.post('/api/posts',
-                             data=json.dumps(data),
-                             headers=auth_headers)
-        
-        assert response.status_code == 400
-    
-    def test_get_public_posts(self, client):
-        """Test pobierania publicznych postów"""
-        response = client.get('/api/posts')
-        
-        assert response.status_code == 200
-        json_data = response.get_json()
-        assert 'posts' in json_data
-        assert 'page' in json_data
-        assert 'total' in json_data
-    
-    def test_get_single_post(self, client, auth_headers):
-        """Test pobierania pojedynczego posta"""
-        # Najpierw utwórz post
-        create_data = {
-            'title': 'Testowy post do pobrania',
-            'content': 'Treść posta do pobrania',
-            'is_published': True
-        }
-        
-        create_response = client.post('/api/posts',
-                                    data=json.dumps(create_data),
-                                    headers=auth_headers)
-        
-        post_id = create_response.get_json()['post']['id']
-        
-        # Teraz pobierz post
-        response = client.get(f'/api/posts/{post_id}')
-        
-        assert response.status_code == 200
-        json_data = response.get_json()
-        assert json_data['title'] == 'Testowy post do pobrania'
-        assert json_data['content'] == 'Treść posta do pobrania'
-    
-    def test_update_post(self, client, auth_headers):
-        """Test aktualizacji posta"""
-        # Utwórz post
-        create_data = {
-            'title': 'Stary tytuł',
-            'content': 'Stara treść',
-            'is_published': True
-        }
-        
-        create_response = client.post('/api/posts',
-                                    data=json.dumps(create_data),
-                                    headers=auth_headers)
-        
-        post_id = create_response.get_json()['post']['id']
-        
-        # Zaktualizuj post
-        update_data = {
-            'title': 'Nowy tytuł',
-            'content': 'Nowa treść',
-            'is_published': False
-        }
-        
-        response = client.put(f'/api/posts/{post_id}',
-                            data=json.dumps(update_data),
-                            headers=auth_headers)
-        
-        assert response.status_code == 200
-        json_data = response.get_json()
-        assert json_data['post']['title'] == 'Nowy tytuł'
-        assert json_data['post']['content'] == 'Nowa treść'
-        assert json_data['post']['is_published'] == False
-    
-    def test_delete_post(self, client, auth_headers):
-        """Test usuwania posta"""
-        # Utwórz post
-        create_data = {
-            'title': 'Post do usunięcia',
-            'content': 'Treść posta do usunięcia',
-            'is_published': True
-        }
-        
-        create_response = client.post('/api/posts',
-                                    data=json.dumps(create_data),
-                                    headers=auth_headers)
-        
-        post_id = create_response.get_json()['post']['id']
-        
-        # Usuń post
-        response = client.delete(f'/api/posts/{post_id}',
-                               headers=auth_headers)
-        
-        assert response.status_code == 200
-        
-        # Sprawdź czy post został usunięty
-        get_response = client.get(f'/api/posts/{post_id}')
-        assert get_response.status_code == 404
-    
-    def test_get_my_posts(self, client, auth_headers):
-        """Test pobierania postów zalogowanego użytkownika"""
-        # Utwórz kilka postów
-        for i in range(3):
-            data = {
-                'title': f'Post {i}',
-                'content': f'Treść posta {i}',
-                'is_published': True
-            }
-            
-            client.post('/api/posts',
-                       data=json.dumps(data),
-                       headers=auth_headers)
-        
-        # Pobierz posty użytkownika
-        response = client.get('/api/posts/my',
-                            headers=auth_headers)
-        
-        assert response.status_code == 200
-        json_data = response.get_json()
-        assert len(json_data['posts']) == 3
+"""
+Testy postów blogowych
+"""
+import pytest
+from app import create_app
+from database import db
+from config import TestingConfig
+import json
+
+class TestPosts:
+    """Testy endpointów postów"""
+    
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+    
+    @pytest.fixture
+    def client(self, app):
+        """Fixture tworzący klienta testowego"""
+        return app.test_client()
+    
+    @pytest.fixture
+    def auth_headers(self, client):
+        """Fixture tworzący nagłówki autoryzacji"""
+        # Zarejestruj i zaloguj użytkownika
+        register_data = {
+            'username': 'testuser',
+            'email': 'test@example.org',  # Zmieniono na example.org
+            'password': 'Test123!'
+        }
+        
+        client.post('/api/auth/register',
+                   data=json.dumps(register_data),
+                   content_type='application/json')
+        
+        login_data = {
+            'username': 'testuser',
+            'password': 'Test123!'
+        }
+        
+        login_response = client.post('/api/auth/login',
+                                   data=json.dumps(login_data),
+                                   content_type='application/json')
+        
+        tokens = login_response.get_json()
+        access_token = tokens['access_token']
+        
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+    
+    def test_create_post_success(self, client, auth_headers):
+        """Test tworzenia posta"""
+        data = {
+            'title': 'Testowy post',
+            'content': 'To jest treść testowego posta',
+            'is_published': True
+        }
+        
+        response = client.post('/api/posts',
+                             data=json.dumps(data),
+                             headers=auth_headers)
+        
+        assert response.status_code == 201
+        json_data = response.get_json()
+        assert json_data['message'] == 'Post utworzony pomyślnie'
+        assert 'post' in json_data
+        assert json_data['post']['title'] == 'Testowy post'
+    
+    def test_create_post_missing_title(self, client, auth_headers):
+        """Test tworzenia posta bez tytułu"""
+        data = {
+            'content': 'To jest treść testowego posta',
+            'is_published': True
+        }
+        
+        response = client.post('/api/posts',
+                             data=json.dumps(data),
+                             headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_get_public_posts(self, client):
+        """Test pobierania publicznych postów"""
+        response = client.get('/api/posts')
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert 'posts' in json_data
+        assert 'page' in json_data
+        assert 'total' in json_data
+    
+    def test_get_single_post(self, client, auth_headers):
+        """Test pobierania pojedynczego posta"""
+        # Najpierw utwórz post
+        create_data = {
+            'title': 'Testowy post do pobrania',
+            'content': 'Treść posta do pobrania',
+            'is_published': True
+        }
+        
+        create_response = client.post('/api/posts',
+                                    data=json.dumps(create_data),
+                                    headers=auth_headers)
+        
+        post_id = create_response.get_json()['post']['id']
+        
+        # Teraz pobierz post
+        response = client.get(f'/api/posts/{post_id}')
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['title'] == 'Testowy post do pobrania'
+        assert json_data['content'] == 'Treść posta do pobrania'
+    
+    def test_update_post(self, client, auth_headers):
+        """Test aktualizacji posta"""
+        # Utwórz post
+        create_data = {
+            'title': 'Stary tytuł',
+            'content': 'Stara treść',
+            'is_published': True
+        }
+        
+        create_response = client.post('/api/posts',
+                                    data=json.dumps(create_data),
+                                    headers=auth_headers)
+        
+        post_id = create_response.get_json()['post']['id']
+        
+        # Zaktualizuj post
+        update_data = {
+            'title': 'Nowy tytuł',
+            'content': 'Nowa treść',
+            'is_published': False
+        }
+        
+        response = client.put(f'/api/posts/{post_id}',
+                            data=json.dumps(update_data),
+                            headers=auth_headers)
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['post']['title'] == 'Nowy tytuł'
+        assert json_data['post']['content'] == 'Nowa treść'
+        assert json_data['post']['is_published'] == False
+    
+    def test_delete_post(self, client, auth_headers):
+        """Test usuwania posta"""
+        # Utwórz post
+        create_data = {
+            'title': 'Post do usunięcia',
+            'content': 'Treść posta do usunięcia',
+            'is_published': True
+        }
+        
+        create_response = client.post('/api/posts',
+                                    data=json.dumps(create_data),
+                                    headers=auth_headers)
+        
+        post_id = create_response.get_json()['post']['id']
+        
+        # Usuń post
+        response = client.delete(f'/api/posts/{post_id}',
+                               headers=auth_headers)
+        
+        assert response.status_code == 200
+        
+        # Sprawdź czy post został usunięty
+        get_response = client.get(f'/api/posts/{post_id}')
+        assert get_response.status_code == 404
+    
+    def test_get_my_posts(self, client, auth_headers):
+        """Test pobierania postów zalogowanego użytkownika"""
+        # Utwórz kilka postów
+        for i in range(3):
+            data = {
+                'title': f'Post {i}',
+                'content': f'Treść posta {i}',
+                'is_published': True
+            }
+            
+            client.post('/api/posts',
+                       data=json.dumps(data),
+                       headers=auth_headers)
+        
+        # Pobierz posty użytkownika
+        response = client.get('/api/posts/my',
+                            headers=auth_headers)
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert len(json_data['posts']) == 3
+    
+    def test_post_view_count(self, app, client, auth_headers):
+        """Test liczenia wyświetleń - agregacja w pamięci, zapis przy flush(), bez powtórzeń widza"""
+        data = {
+            'title': 'Post z licznikiem',
+            'content': 'Treść posta z licznikiem wyświetleń'
+        }
+        response = client.post('/api/posts',
+                             data=json.dumps(data),
+                             headers=auth_headers)
+        post_id = response.get_json()['post']['id']
+        
+        anonymous = app.test_client()
+        for user_agent in ('przeglądarka-a', 'przeglądarka-a', 'przeglądarka-b'):
+            response = anonymous.get(f'/api/posts/{post_id}', headers={'User-Agent': user_agent})
+            assert response.get_json()['view_count'] == 0
+        
+        assert app.extensions['view_counter'].flush() == 2
+        assert app.extensions['view_counter'].flush() == 0
+        
+        response = client.get(f'/api/posts/{post_id}')
+        assert response.get_json()['view_count'] == 2
+    
+    def test_trending_posts(self, app, client, auth_headers):
+        """Test rankingu popularnych postów - komentarze i wyświetlenia, odtworzenie z bazy"""
+        from utils.trending import TrendingIndex
+        
+        post_ids = []
+        for i in range(3):
+            data = {
+                'title': f'Popularny post {i}',
+                'content': f'Treść popularnego posta {i}'
+            }
+            response = client.post('/api/posts',
+                                 data=json.dumps(data),
+                                 headers=auth_headers)
+            post_ids.append(response.get_json()['post']['id'])
+        
+        client.post(f'/api/posts/{post_ids[1]}/comments',
+                   data=json.dumps({'content': 'Świetny post'}),
+                   headers=auth_headers)
+        anonymous = app.test_client()
+        for user_agent in ('przeglądarka-a', 'przeglądarka-b'):
+            anonymous.get(f'/api/posts/{post_ids[0]}', headers={'User-Agent': user_agent})
+        app.extensions['view_counter'].flush()
+        
+        response = client.get('/api/posts/trending')
+        assert response.status_code == 200
+        ranking = [post['id'] for post in response.get_json()['posts']]
+        assert ranking == [post_ids[1], post_ids[0]]
+        
+        # Po zapisie nowy proces odtwarza ranking z tabeli post_trending
+        assert app.extensions['trending'].persist()
+        restarted = TrendingIndex(app, half_life=12 * 3600.0, persist_interval=0)
+        assert [post_id for post_id, _ in restarted.top(10)] == ranking
+    
+    def test_trending_persist_skips_deleted_posts(self, app, client, auth_headers):
+        """Test - usunięty post znika z rankingu, a późniejsze przyrosty nie odtwarzają jego wyniku"""
+        from models.trending import PostTrendingScore
+        
+        response = client.post('/api/posts',
+                             data=json.dumps({'title': 'Post do usunięcia', 'content': 'Treść posta do usunięcia'}),
+                             headers=auth_headers)
+        post_id = response.get_json()['post']['id']
+        trending = app.extensions['trending']
+        trending.record('comment', {post_id: 1})
+        assert client.delete(f'/api/posts/{post_id}', headers=auth_headers).status_code == 200
+        # Usunięcie czyści ranking w pamięci od razu, bez czekania na zapis
+        assert trending.top(10) == [] and trending._pending == {}
+        # Zdarzenie zarejestrowane przed usunięciem (np. w innym procesie)
+        trending.record('view', {post_id: 1})
+        
+        assert trending.persist()
+        assert db.session.get(PostTrendingScore, post_id) is None
+        assert trending._pending == {}
+        assert trending.top(10) == []
+    
+    def test_page_size_cap_and_stream(self, app, client, auth_headers):
+        """Test limitu per_page i strumieniowego eksportu postów dla admina"""
+        from models.user import User
+        
+        post_ids = []
+        for i in range(5):
+            data = {
+                'title': f'Post eksportu {i}',
+                'content': f'Treść posta eksportu {i}'
+            }
+            response = client.post('/api/posts',
+                                 data=json.dumps(data),
+                                 headers=auth_headers)
+            post_ids.append(response.get_json()['post']['id'])
+        
+        response = client.get('/api/posts?per_page=100000')
+        assert response.get_json()['per_page'] == app.config['PAGINATION_MAX_PER_PAGE']
+        assert client.get('/api/posts?per_page=0&page=-3').get_json()['per_page'] == 1
+        
+        db.session.add(User('exportadmin', 'exportadmin@example.org', 'Admin123!', role='ADMIN'))
+        db.session.commit()
+        admin = app.test_client()
+        admin.post('/api/auth/login',
+                   data=json.dumps({'username': 'exportadmin', 'password': 'Admin123!'}),
+                   content_type='application/json')
+        
+        app.config['STREAM_CHUNK_SIZE'] = 2
+        response = admin.get('/api/admin/posts?stream=1')
+        assert response.status_code == 200 and response.is_streamed
+        assert [post['id'] for post in json.loads(response.get_data())] == post_ids[::-1]
+        
+        users = json.loads(admin.get('/api/admin/users?stream=1').get_data())
+        assert [user['username'] for user in users] == ['exportadmin', 'testuser']
+    
+    def test_read_models_match_to_dict(self, app, client, auth_headers):
+        """Test - listy z modeli odczytu identyczne z to_dict() obiektów ORM"""
+        from models.post import Post
+        from models.read_models import POST_WITH_AUTHOR_ROW
+        from services.post_service import PostService
+        
+        for i in range(3):
+            client.post('/api/posts',
+                       data=json.dumps({'title': f'Post modelu {i}', 'content': f'Treść posta modelu {i}'}),
+                       headers=auth_headers)
+        
+        expected = [post.to_dict(include_author=True)
+                    for post in Post.query.order_by(Post.created_at.desc()).all()]
+        assert PostService.get_public_posts(1, 10).items == expected
+        
+        record = POST_WITH_AUTHOR_ROW.records(db.session.execute(POST_WITH_AUTHOR_ROW.select()
+                                                                 .join(Post.author).limit(1)))[0]
+        assert not hasattr(record, '__dict__')
+        assert record.to_dict() == next(post for post in expected if post['id'] == record.id)
+    
+    def test_shutdown_app_flushes_buffers(self, tmp_path):
+        """Test zamknięcia - wyświetlenia z pamięci zapisane przed zatrzymaniem procesu"""
+        from app import shutdown_app
+        from models.post import Post
+        from models.user import User
+        
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'shutdown.db')
+        
+        app = create_app(FileConfig)
+        with app.app_context():
+            db.create_all()
+            author = User('shutdownuser', 'shutdown@example.org', 'Test123!')
+            db.session.add(author)
+            db.session.commit()
+            post = Post('Post do zamknięcia', 'Treść posta przed zamknięciem', author.id)
+            db.session.add(post)
+            db.session.commit()
+            post_id = post.id
+            db.session.remove()
+        
+        app.test_client().get(f'/api/posts/{post_id}')
+        shutdown_app(app)
+        
+        with app.app_context():
+            assert db.session.get(Post, post_id).view_count == 1
+            db.session.remove()
+            db.engine.dispose()
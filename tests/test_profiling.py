@@ -0,0 +1,64 @@
+"""
+Testy profilowania żądań na życzenie
+"""
+import json
+import pytest
+from app import create_app
+from database import db
+from config import TestingConfig
+from models.user import User
+
+class TestProfiling:
+    """Testy profilera dostępnego dla administratora"""
+
+    @pytest.fixture
+    def app(self, tmp_path):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(TestingConfig)
+        app.config['PROFILE_DIR'] = str(tmp_path)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        """Fixture tworzący klienta testowego"""
+        return app.test_client()
+
+    def _login(self, client, username, role):
+        db.session.add(User(username, f'{username}@example.org', 'Test123!', role=role))
+        db.session.commit()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': username, 'password': 'Test123!'}),
+                    content_type='application/json')
+
+    def test_profile_ignored_for_regular_user(self, client, tmp_path):
+        """Test - zwykły użytkownik nie może włączyć profilera"""
+        self._login(client, 'regularuser', 'USER')
+
+        response = client.get('/api/posts?__profile=1')
+
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_admin_profile_is_downloadable(self, client):
+        """Test zapisu i pobrania profilu przez admina"""
+        self._login(client, 'profileadmin', 'ADMIN')
+
+        response = client.get('/api/posts', headers={'X-Profile': '1'})
+        profile_id = response.headers['X-Profile-Id']
+
+        listing = client.get('/api/admin/profiles').get_json()
+        assert [profile['name'] for profile in listing['profiles']] == [profile_id]
+
+        download = client.get(f'/api/admin/profiles/{profile_id}')
+        assert download.status_code == 200
+        assert download.headers['Content-Type'] == 'application/octet-stream'
+
+        text = client.get(f'/api/admin/profiles/{profile_id}?format=text')
+        assert 'function calls' in text.get_data(as_text=True)
+
+        assert client.get('/api/admin/profiles/..%2Fblog.db').status_code == 404
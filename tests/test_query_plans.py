@@ -0,0 +1,257 @@
+"""
+Testy regresji planów zapytań (EXPLAIN QUERY PLAN) i liczby zapytań na endpoint
+"""
+import json
+import re
+from datetime import datetime, timezone
+from contextlib import contextmanager
+import pytest
+from flask import current_app
+from sqlalchemy import event
+from app import create_app
+from database import db
+from config import TestingConfig
+from models.user import User
+from models.post import Post
+from models.comment import Comment
+from services.post_service import PostService
+from services.user_service import UserService
+from services.stats_service import StatsService
+from services.analytics_service import AnalyticsService
+
+# Pełny skan tabeli (bez indeksu) lub sortowanie w tymczasowym B-drzewie
+_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+_TEMP_BTREE = 'USE TEMP B-TREE'
+
+# Zakres dat obejmujący cały zbiór testowy (analityka)
+RANGE_START = datetime(2000, 1, 1, tzinfo=timezone.utc)
+RANGE_END = datetime(2100, 1, 1, tzinfo=timezone.utc)
+
+# Zapytanie -> indeks, z którego musi korzystać (stan wyjściowy)
+SERVICE_QUERIES = {
+    'get_public_posts': (
+        lambda data: PostService.get_public_posts(1, 10).items,
+        ['ix_posts_published_created_at']
+    ),
+    'get_user_posts': (
+        lambda data: PostService.get_user_posts(data['author_id'], 1, 10).items,
+        ['ix_posts_author_created_at']
+    ),
+    'get_post_by_id': (
+        lambda data: PostService.get_post_by_id(data['post_id']),
+        ['INTEGER PRIMARY KEY']
+    ),
+    'get_all_posts_admin': (
+        lambda data: PostService.get_all_posts_admin(1, 10).items,
+        ['ix_posts_created_at']
+    ),
+    'get_all_posts_admin_by_author': (
+        lambda data: PostService.get_all_posts_admin(1, 10, data['author_id']).items,
+        ['ix_posts_author_created_at']
+    ),
+    'get_all_users': (
+        lambda data: UserService.get_all_users(1, 10).items,
+        ['ix_users_created_at']
+    ),
+    'search_users': (
+        lambda data: UserService.search_users('author', 1, 10).items,
+        ['ix_users_created_at']
+    ),
+    'find_by_username': (
+        lambda data: User.find_by_username('author1'),
+        ['ix_users_username']
+    ),
+    'find_by_email': (
+        lambda data: User.find_by_email('author1@example.org'),
+        ['ix_users_email']
+    ),
+    'dashboard_stats': (
+        lambda data: StatsService.compute_dashboard_stats(),
+        ['ix_users_role_is_active', 'ix_comments_created_day', 'ix_author_stats_post_count']
+    ),
+    'get_post_comments': (
+        lambda data: PostService.get_post_comments(data['post_id']),
+        ['ix_comments_post_created_at']
+    ),
+    'get_trending_posts': (
+        lambda data: (current_app.extensions['trending'].record('comment', {data['post_id']: 1}),
+                      PostService.get_trending_posts(5)),
+        ['INTEGER PRIMARY KEY']
+    ),
+    'get_posts_chunk': (
+        lambda data: PostService.get_posts_chunk(after_id=data['post_id'] + 20, limit=10),
+        ['INTEGER PRIMARY KEY']
+    ),
+    'get_posts_chunk_by_author': (
+        lambda data: PostService.get_posts_chunk(after_id=data['post_id'] + 20, limit=10,
+                                                 user_id=data['author_id']),
+        ['ix_posts_author_id']
+    ),
+    'get_users_chunk': (
+        lambda data: UserService.get_users_chunk(after_id=data['author_id'] + 3, limit=10),
+        ['INTEGER PRIMARY KEY']
+    ),
+    'get_author_profile': (
+        lambda data: UserService.get_author_profile(data['author_id']),
+        ['INTEGER PRIMARY KEY']
+    ),
+    'analytics_id_span_posts': (
+        lambda data: AnalyticsService._id_span(Post, RANGE_START, RANGE_END),
+        ['ix_posts_created_at']
+    ),
+    'analytics_id_span_comments': (
+        lambda data: AnalyticsService._id_span(Comment, RANGE_START, RANGE_END),
+        ['ix_comments_created_at']
+    ),
+}
+
+# Świadome wyjątki: LIKE '%...%' nie może użyć indeksu; author_stats ma wiersz na autora, nie na post
+ALLOWED_FULL_SCANS = {('search_users', 'users'), ('dashboard_stats', 'author_stats')}
+
+# Endpoint -> maksymalna liczba zapytań SQL (z nagłówka Server-Timing)
+ENDPOINT_QUERY_BUDGETS = {
+    '/api/posts': 2,
+    '/api/posts/{post_id}': 2,
+    '/api/posts/{post_id}/comments': 1,
+    '/api/posts/trending': 1,
+    '/api/posts/my': 3,
+    '/api/admin/posts': 3,
+    '/api/admin/users': 3,
+    '/api/auth/me': 1,
+}
+
+# Endpoint zapisu -> (tabele odczytane przed zapisem, tabele zapisane); po zapisie już bez SELECT
+WRITE_ENDPOINTS = {
+    '/api/auth/register': ([], ['users']),
+    '/api/posts': (['users'], ['posts', 'author_stats']),
+    '/api/posts/{post_id}/comments': (['users', 'posts'], ['comments', 'author_stats']),
+}
+
+@contextmanager
+def capture_statements(kinds=('SELECT',)):
+    """Zapytania danego rodzaju wykonane w bloku (z parametrami)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(kinds):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def explain(statement, parameters):
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+    return [row[-1] for row in rows]
+
+class TestQueryPlans:
+    """Plany zapytań serwisów i budżety zapytań endpointów"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację z reprezentatywnym zbiorem danych"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def data(self, app):
+        """Kilku autorów, posty opublikowane i szkice, komentarze różnych osób"""
+        authors = [User(f'author{i}', f'author{i}@example.org', 'Test123!') for i in range(5)]
+        authors.append(User('planadmin', 'planadmin@example.org', 'Admin123!', role='ADMIN'))
+        db.session.add_all(authors)
+        db.session.commit()
+
+        posts = [Post(f'Post numer {i}', f'Treść posta numer {i} do testów', authors[i % 5].id,
+                      is_published=i % 4 != 0)
+                 for i in range(40)]
+        db.session.add_all(posts)
+        db.session.commit()
+
+        db.session.add_all([Comment(f'Komentarz {i}', authors[i % 5].id, posts[1].id) for i in range(10)])
+        db.session.commit()
+
+        return {'author_id': authors[0].id, 'post_id': posts[1].id}
+
+    @pytest.fixture
+    def client(self, app):
+        """Fixture tworzący klienta testowego"""
+        return app.test_client()
+
+    def test_service_queries_use_indexes(self, data):
+        """Test - zapytania serwisów korzystają z indeksów, bez pełnych skanów i sortowania"""
+        regressions = {}
+        for name, (query, expected_indexes) in SERVICE_QUERIES.items():
+            db.session.expunge_all()
+            with capture_statements() as statements:
+                query(data)
+            assert statements, name
+
+            plans = [line for statement, parameters in statements for line in explain(statement, parameters)]
+            problems = []
+            for line in plans:
+                full_scan = _FULL_SCAN.match(line)
+                if full_scan and (name, full_scan.group(1)) not in ALLOWED_FULL_SCANS:
+                    problems.append(line)
+                if _TEMP_BTREE in line:
+                    problems.append(line)
+            problems.extend(f'brak {index}' for index in expected_indexes
+                            if not any(index in line for line in plans))
+            if problems:
+                regressions[name] = problems
+
+        assert regressions == {}
+
+    def test_endpoint_query_counts(self, data, client):
+        """Test budżetu zapytań SQL per endpoint (regresja N+1)"""
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'planadmin', 'password': 'Admin123!'}),
+                    content_type='application/json')
+
+        over_budget = {}
+        for path, budget in ENDPOINT_QUERY_BUDGETS.items():
+            db.session.expunge_all()
+            response = client.get(path.format(post_id=data['post_id']))
+            assert response.status_code == 200, path
+
+            queries = int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+            if queries > budget:
+                over_budget[path] = queries
+
+        assert over_budget == {}
+
+    def test_write_endpoints_single_insert(self, data, client):
+        """Test - utworzenie użytkownika, posta i komentarza bez ponownego odczytu po zapisie"""
+        payloads = {
+            '/api/auth/register': {'username': 'newwriter', 'email': 'newwriter@example.org',
+                                   'password': 'Writer123!'},
+            '/api/posts': {'title': 'Nowy post', 'content': 'Treść nowego posta'},
+            '/api/posts/{post_id}/comments': {'content': 'Nowy komentarz'},
+        }
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'author1', 'password': 'Test123!'}),
+                    content_type='application/json')
+        # Ranking popularności wczytywany jest z bazy raz na proces, nie na żądanie
+        client.get('/api/posts/trending')
+
+        for path, (expected_reads, expected_writes) in WRITE_ENDPOINTS.items():
+            db.session.expunge_all()
+            with capture_statements(kinds=('SELECT', 'INSERT', 'UPDATE')) as statements:
+                response = client.post(path.format(post_id=data['post_id']),
+                                       data=json.dumps(payloads[path]),
+                                       content_type='application/json')
+            assert response.status_code == 201, path
+
+            reads = [re.search(r'FROM (\w+)', statement).group(1) for statement, _ in statements
+                     if statement.lstrip().upper().startswith('SELECT')]
+            writes = [re.search(r'(?:INTO|UPDATE) (\w+)', statement).group(1) for statement, _ in statements
+                      if not statement.lstrip().upper().startswith('SELECT')]
+            assert (reads, writes) == (expected_reads, expected_writes), path
+            # Wszystkie odczyty przed pierwszym zapisem
+            assert all(statement.lstrip().upper().startswith('SELECT')
+                       for statement, _ in statements[:len(reads)]), path
@@ -0,0 +1,99 @@
+"""
+Testy rate limitera
+"""
+import sqlite3
+import pytest
+from app import create_app
+from database import db
+from config import TestingConfig
+from extensions import limiter
+from utils.metrics import registry
+from middleware.rate_limiter import MemoryStorage, SQLiteStorage, parse_rate_limit, parse_rate_limits
+
+class RateLimitedConfig(TestingConfig):
+    """Konfiguracja z niskim limitem dla testów"""
+    RATE_LIMIT_ROUTES = {'posts.get_posts': '3 per minute'}
+
+class TestRateLimiter:
+    """Testy limitera token-bucket"""
+    
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(RateLimitedConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+    
+    @pytest.fixture
+    def client(self, app):
+        """Fixture tworzący klienta testowego"""
+        return app.test_client()
+    
+    def test_parse_rate_limit(self):
+        """Test parsowania formatu limitu"""
+        assert parse_rate_limit('10 per minute') == (10, 60)
+        assert parse_rate_limit('5/second') == (5, 1)
+        assert parse_rate_limits('200 per day, 50 per hour') == [(200, 86400), (50, 3600)]
+        with pytest.raises(ValueError):
+            parse_rate_limit('dużo')
+    
+    def test_bucket_refills_over_time(self):
+        """Test uzupełniania tokenów - brak podwójnych burstów na granicy okna"""
+        storage = MemoryStorage()
+        for _ in range(2):
+            assert storage.hit('k', [(2, 60)], now=0.0)[0]
+        assert not storage.hit('k', [(2, 60)], now=1.0)[0]
+        assert storage.hit('k', [(2, 60)], now=31.0)[0]
+        assert not storage.hit('k', [(2, 60)], now=31.5)[0]
+    
+    def test_tracked_keys_are_bounded(self):
+        """Test twardego limitu śledzonych kluczy (LRU)"""
+        storage = MemoryStorage(max_keys=32, stripes=4)
+        for i in range(1000):
+            storage.hit(f'10.0.0.1:/random/{i}', [(10, 60)])
+        assert storage.tracked_keys() <= 32
+        assert storage.evictions > 0
+    
+    def test_sqlite_storage_is_shared(self, tmp_path):
+        """Test wspólnych liczników - dwie instancje (jak dwa workery) widzą ten sam kubełek"""
+        path = str(tmp_path / 'ratelimit.db')
+        worker_a = SQLiteStorage(path)
+        worker_b = SQLiteStorage(path)
+        
+        assert worker_a.hit('ip:posts.get_posts', [(3, 60)], now=0.0)[0]
+        assert worker_b.hit('ip:posts.get_posts', [(3, 60)], now=0.1)[0]
+        assert worker_a.hit('ip:posts.get_posts', [(3, 60)], now=0.2)[0]
+        assert not worker_b.hit('ip:posts.get_posts', [(3, 60)], now=0.3)[0]
+    
+    def test_decorated_limit(self, client):
+        """Test limitu z dekoratora limiter.limit (rejestracja: 5 na minutę)"""
+        response = client.post('/api/auth/register', json={})
+        assert response.headers['X-RateLimit-Limit'] == '5'
+    
+    def test_route_limit_and_headers(self, client):
+        """Test limitu per trasa i nagłówków X-RateLimit-*"""
+        for expected_remaining in (2, 1, 0):
+            response = client.get('/api/posts')
+            assert response.status_code == 200
+            assert response.headers['X-RateLimit-Limit'] == '3'
+            assert response.headers['X-RateLimit-Remaining'] == str(expected_remaining)
+        
+        response = client.get('/api/posts')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+    
+    def test_storage_error_fails_open(self, client, monkeypatch):
+        """Test awarii backendu - żądanie przechodzi, błąd trafia do metryki"""
+        def locked(*args, **kwargs):
+            raise sqlite3.OperationalError('database is locked')
+        monkeypatch.setattr(limiter.storage, 'hit', locked)
+        registry.reset()
+        
+        response = client.get('/api/posts')
+        assert response.status_code == 200
+        assert 'X-RateLimit-Limit' not in response.headers
+        counters = {name: value for name, _, value in registry.snapshot()['counters']}
+        assert counters['blog_rate_limit_storage_errors_total'] == 1
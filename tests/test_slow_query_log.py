@@ -0,0 +1,68 @@
+"""
+Testy logu wolnych zapytań SQL
+"""
+import json
+import pytest
+from app import create_app
+from database import db
+from config import TestingConfig
+from models.user import User
+from middleware.slow_query_log import fingerprint_statement, normalize_statement, redact_parameters
+
+class SlowQueryConfig(TestingConfig):
+    """Każde zapytanie traktowane jako wolne (0 wyłącza log)"""
+    SLOW_QUERY_THRESHOLD_MS = 0.001
+
+class TestSlowQueryLog:
+    """Testy odcisków zapytań i endpointu admina"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(SlowQueryConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        """Fixture tworzący klienta testowego"""
+        return app.test_client()
+
+    def test_fingerprint_ignores_literals(self):
+        """Test - zapytania różniące się literałami mają ten sam odcisk"""
+        first = "SELECT * FROM posts WHERE id = 5 AND title = 'abc'"
+        second = "SELECT *  FROM posts WHERE id = 12 AND title = 'x''y'"
+        assert fingerprint_statement(first) == fingerprint_statement(second)
+        assert normalize_statement('SELECT 1 FROM t WHERE id IN (?, ?, ?)') == 'SELECT ? FROM t WHERE id IN (...)'
+        assert redact_parameters(('secret@example.org', 3, None)) == ['<str:18>', 3, None]
+
+    def test_zero_threshold_disables_log(self):
+        """Test - próg 0 wyłącza log wolnych zapytań"""
+        class DisabledConfig(TestingConfig):
+            SLOW_QUERY_THRESHOLD_MS = 0
+
+        app = create_app(DisabledConfig)
+        assert app.extensions['slow_query_log'] is None
+
+    def test_slow_queries_endpoint(self, app, client):
+        """Test agregacji wolnych zapytań z planem EXPLAIN"""
+        db.session.add(User('slowadmin', 'slowadmin@example.org', 'Admin123!', role='ADMIN'))
+        db.session.commit()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'slowadmin', 'password': 'Admin123!'}),
+                    content_type='application/json')
+        client.get('/api/posts')
+        client.get('/api/posts')
+
+        response = client.get('/api/admin/slow-queries?sort=count')
+
+        assert response.status_code == 200
+        queries = response.get_json()['queries']
+        posts_queries = [query for query in queries
+                         if 'FROM posts' in query['statement'] and 'posts.get_posts' in query['endpoints']]
+        assert posts_queries
+        assert posts_queries[0]['count'] >= 2
+        assert posts_queries[0]['plan']
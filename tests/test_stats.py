@@ -0,0 +1,67 @@
+"""
+Testy statystyk panelu administratora
+"""
+import json
+import pytest
+from app import create_app
+from database import db
+from models.user import User
+from config import TestingConfig
+
+class TestStats:
+    """Testy endpointu /api/admin/stats"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture tworzący aplikację testową"""
+        app = create_app(TestingConfig)
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        """Klient zalogowany jako admin, z jednym postem i komentarzem"""
+        db.session.add_all([
+            User('statsadmin', 'statsadmin@example.org', 'Admin123!', role='ADMIN'),
+            User('blocked', 'blocked@example.org', 'Test123!'),
+        ])
+        db.session.commit()
+        User.find_by_username('blocked').is_active = False
+        db.session.commit()
+
+        client = app.test_client()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'statsadmin', 'password': 'Admin123!'}),
+                    content_type='application/json')
+        response = client.post('/api/posts',
+                               data=json.dumps({'title': 'Post admina', 'content': 'Treść posta admina',
+                                                'is_published': False}),
+                               content_type='application/json')
+        client.post(f'/api/posts/{response.get_json()["post"]["id"]}/comments',
+                    data=json.dumps({'content': 'Komentarz admina'}),
+                    content_type='application/json')
+        return client
+
+    def test_dashboard_stats_cached(self, app, client):
+        """Test agregatów panelu i cache z TTL"""
+        response = client.get('/api/admin/stats')
+        assert response.status_code == 200
+        stats = response.get_json()
+
+        assert stats['users'] == {'total': 2, 'by_role': {'ADMIN': {'active': 1, 'inactive': 0},
+                                                          'USER': {'active': 0, 'inactive': 1}}}
+        assert stats['posts'] == {'total': 1, 'published': 0, 'drafts': 1}
+        assert stats['comments']['total'] == 1
+        assert [day['comments'] for day in stats['comments']['per_day']] == [1]
+        assert [author['username'] for author in stats['top_authors']] == ['statsadmin']
+
+        # Kolejne wywołanie w TTL - bez zapytań o agregaty
+        response = client.get('/api/admin/stats')
+        assert response.get_json()['generated_at'] == stats['generated_at']
+        assert 'desc="1 queries"' in response.headers['Server-Timing']
+
+        app.extensions['cache']['admin_stats'].invalidate()
+        assert client.get('/api/admin/stats').get_json()['generated_at'] != stats['generated_at']
@@ -1,34 +1,46 @@
-"""
-Utilities package
-"""
-from .error_handlers import (
-    register_error_handlers, 
-    handle_validation_error,
-    handle_password_validation_error
-)
-from .jwt_utils import (
-    create_access_token,
-    create_refresh_token,
-    revoke_token,
-    rotate_refresh_token,
-    get_current_user,
-    admin_required,
-    owner_or_admin_required
-)
-from .logger import setup_logging, log_security_event, log_http_request
-
-__all__ = [
-    'register_error_handlers',
-    'handle_validation_error',
-    'handle_password_validation_error',
-    'create_access_token',
-    'create_refresh_token',
-    'revoke_token',
-    'rotate_refresh_token',
-    'get_current_user',
-    'admin_required',
-    'owner_or_admin_required',
-    'setup_logging',
-    'log_security_event',
-    'log_http_request'
+"""
+Utilities package
+"""
+from .error_handlers import (
+    register_error_handlers, 
+    handle_validation_error,
+    handle_password_validation_error
+)
+from .jwt_utils import (
+    create_access_token,
+    create_refresh_token,
+    revoke_token,
+    rotate_refresh_token,
+    rotate_token_pair,
+    get_refresh_metrics,
+    get_current_user,
+    admin_required,
+    owner_or_admin_required
+)
+from .logger import (
+    setup_logging,
+    shutdown_logging,
+    get_logging_stats,
+    log_security_event,
+    log_http_request
+)
+
+__all__ = [
+    'register_error_handlers',
+    'handle_validation_error',
+    'handle_password_validation_error',
+    'create_access_token',
+    'create_refresh_token',
+    'revoke_token',
+    'rotate_refresh_token',
+    'rotate_token_pair',
+    'get_refresh_metrics',
+    'get_current_user',
+    'admin_required',
+    'owner_or_admin_required',
+    'setup_logging',
+    'shutdown_logging',
+    'get_logging_stats',
+    'log_security_event',
+    'log_http_request'
 ]
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Asynchroniczny potok logowania: QueueHandler -> wątek zapisujący partiami
+
+Wątek żądania tylko wrzuca rekord do kolejki. Renderowanie JSON, formatowanie
+i zapis na dysk odbywają się w tle, a flush() wykonywany jest raz na partię.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import weakref
+import structlog
+
+_SENTINEL = object()
+
+# Uruchomione wątki zapisujące - jeden hook fork() na proces dla wszystkich
+_running_writers = weakref.WeakSet()
+
+
+def _restart_writers_after_fork():
+    for writer in list(_running_writers):
+        writer._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_writers_after_fork)
+
+
+class DeferredJSONFormatter(structlog.stdlib.ProcessorFormatter):
+    """
+    Formatter renderujący event_dict structloga do JSON dopiero w wątku zapisującym.
+    Rekordy spoza structloga (werkzeug, sqlalchemy) formatowane są jak dotąd.
+    """
+
+    def __init__(self, fmt):
+        super().__init__(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.JSONRenderer()
+            ],
+            fmt=fmt
+        )
+
+    def format(self, record):
+        if getattr(record, '_logger', None) is None:
+            return logging.Formatter.format(self, record)
+        return super().format(record)
+
+
+class _BatchFlushMixin:
+    """Handler bez flush() po każdym rekordzie - wątek zapisujący robi flush raz na partię"""
+
+    def flush(self):
+        pass
+
+    def begin_batch(self):
+        """Wywoływane przed zapisem partii (np. sprawdzenie rotacji)"""
+
+    def flush_batch(self):
+        super().flush()
+
+
+class BatchedFileHandler(_BatchFlushMixin, logging.FileHandler):
+    """FileHandler z flush() wykonywanym raz na partię"""
+
+
+class BatchedStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    """StreamHandler z flush() wykonywanym raz na partię"""
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler z polityką przepełnienia: rekordy poniżej WARNING są odrzucane
+    (i liczone), ostrzeżenia i błędy czekają krótko na miejsce w kolejce.
+    """
+
+    def __init__(self, log_queue, stats, block_timeout=0.05):
+        super().__init__(log_queue)
+        self.stats = stats
+        self.block_timeout = block_timeout
+
+    def prepare(self, record):
+        # Bez formatowania w wątku żądania - robi to wątek zapisujący
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self.stats.increment('dropped')
+                return
+            self.stats.increment('blocked')
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                self.stats.increment('dropped')
+                return
+        self.stats.increment('enqueued')
+
+
+class LogPipelineStats:
+    """Liczniki potoku logowania (bezpieczne wątkowo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {'enqueued': 0, 'dropped': 0, 'blocked': 0, 'written': 0, 'batches': 0}
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+class AsyncLogWriter:
+    """
+    Wątek w tle pobierający rekordy z kolejki i zapisujący je partiami
+    """
+
+    def __init__(self, handlers, queue_size=10000, batch_size=256, flush_interval=0.5,
+                 block_timeout=0.05):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = LogPipelineStats()
+        self.queue_handler = AsyncQueueHandler(self.queue, self.stats, block_timeout)
+        self._reported_drops = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='async-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        _running_writers.add(self)
+
+    def _after_fork(self):
+        # Proces potomny (np. worker po preload) nie ma wątku zapisującego rodzica:
+        # nowa kolejka (rekordy rodzica zapisze rodzic) i własny wątek
+        if self._thread is None:
+            return
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.queue_handler.queue = self.queue
+        self.stats = self.queue_handler.stats = LogPipelineStats()
+        self._reported_drops = 0
+        self._thread = threading.Thread(target=self._run, name='async-log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Zatrzymaj wątek po opróżnieniu kolejki i zamknij handlery"""
+        if self._thread is None:
+            return
+        self.queue.put(_SENTINEL)
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.stop)
+        _running_writers.discard(self)
+        for handler in self.handlers:
+            handler.close()
+
+    def _run(self):
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _SENTINEL in batch
+            self._write_batch([record for record in batch if record is not _SENTINEL])
+            if stop:
+                # Dopisz wszystko, co trafiło do kolejki przed zatrzymaniem
+                remaining = []
+                while True:
+                    try:
+                        remaining.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write_batch([record for record in remaining if record is not _SENTINEL])
+                return
+
+    def _write_batch(self, batch):
+        dropped = self.stats.snapshot()['dropped']
+        if dropped > self._reported_drops:
+            batch.append(logging.makeLogRecord({
+                'name': __name__,
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': 'Kolejka logów przepełniona - odrzucono %d rekordów',
+                'args': (dropped - self._reported_drops,)
+            }))
+            self._reported_drops = dropped
+
+        if not batch:
+            return
+
+        for handler in self.handlers:
+            begin_batch = getattr(handler, 'begin_batch', None)
+            if begin_batch is not None:
+                begin_batch()
+
+        for record in batch:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        handler.handleError(record)
+
+        for handler in self.handlers:
+            flush_batch = getattr(handler, 'flush_batch', handler.flush)
+            flush_batch()
+
+        self.stats.increment('written', len(batch))
+        self.stats.increment('batches')
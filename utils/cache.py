@@ -0,0 +1,124 @@
+"""
+Cache w pamięci procesu z TTL i odświeżaniem w tle (stale-while-revalidate)
+
+Świeża wartość (młodsza niż ttl) zwracana jest od razu. Wartość nieświeża,
+ale młodsza niż ttl + stale_ttl, też jest zwracana od razu, a nowa liczona
+jest w osobnym wątku. Brak wartości - liczy wywołujący; równoległe
+chybienia dla tego samego klucza czekają na jedno wyliczenie.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+import structlog
+
+from utils.metrics import record_cache
+
+logger = structlog.get_logger(__name__)
+
+
+class TTLCache:
+    """
+    Cache klucz -> wartość z limitem wpisów (najdawniej użyte usuwane pierwsze)
+    """
+
+    def __init__(self, name, ttl=60.0, stale_ttl=0.0, max_entries=256):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # klucz -> (wartość, czas wyliczenia)
+        self._lock = threading.Lock()
+        self._computing = {}  # klucz -> Event trwającego wyliczenia
+
+    def get(self, key, compute):
+        """Wartość dla klucza; compute() wywoływane przy braku lub wygaśnięciu"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, computed_at = entry
+                age = now - computed_at
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age >= self.ttl and key not in self._computing:
+                        self._start_refresh(key, compute)
+                    record_cache(self.name, True)
+                    return value
+            record_cache(self.name, False)
+            pending = self._computing.get(key)
+            if pending is None:
+                pending = self._computing[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Ktoś już liczy tę wartość - czekamy na wynik
+            pending.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+        return self._compute(key, compute, pending if owner else None)
+
+    def _compute(self, key, compute, pending=None):
+        try:
+            value = compute()
+            self.set(key, value)
+            return value
+        finally:
+            if pending is not None:
+                with self._lock:
+                    self._computing.pop(key, None)
+                pending.set()
+
+    def _start_refresh(self, key, compute):
+        # Wywoływane pod self._lock
+        pending = self._computing[key] = threading.Event()
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def refresh():
+            try:
+                if app is not None:
+                    with app.app_context():
+                        self._compute(key, compute, pending)
+                else:
+                    self._compute(key, compute, pending)
+            except Exception as e:
+                logger.warning("Odświeżenie cache nie powiodło się", cache=self.name, error=str(e))
+
+        threading.Thread(target=refresh, name=f'cache-refresh-{self.name}', daemon=True).start()
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Usuń wpis (albo wszystkie wpisy, gdy key=None)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def configure_cache(app):
+    """Cache aplikacji w app.extensions['cache'] (nazwa -> TTLCache)"""
+    app.extensions['cache'] = {
+        'admin_stats': TTLCache(
+            'admin_stats',
+            ttl=app.config.get('STATS_CACHE_TTL', 60),
+            stale_ttl=app.config.get('STATS_CACHE_STALE_TTL', 600),
+            max_entries=16
+        ),
+        'analytics': TTLCache(
+            'analytics',
+            ttl=app.config.get('ANALYTICS_CACHE_TTL', 300),
+            stale_ttl=app.config.get('ANALYTICS_CACHE_STALE_TTL', 3600),
+            max_entries=32
+        ),
+    }
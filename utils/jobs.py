@@ -0,0 +1,125 @@
+"""
+Kolejka zadań w tle (długie operacje poza wątkiem żądania)
+
+Zadanie to funkcja wykonywana w kontekście aplikacji przez wątek roboczy.
+Stan zadań (queued/running/done/failed) trzymany jest w pamięci procesu -
+endpoint statusu widzi zadania zlecone w tym samym procesie.
+Bez kolejki (JOB_QUEUE_ENABLED=false) zadanie wykonywane jest od razu.
+"""
+import atexit
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+import structlog
+
+from utils.metrics import registry
+
+logger = structlog.get_logger(__name__)
+
+_STOP = object()
+
+
+class JobQueue:
+    """
+    Jeden wątek roboczy na proces; zadania wykonywane po kolei
+    """
+
+    def __init__(self, app, enabled=True, history=100):
+        self.app = app
+        self.enabled = enabled
+        self.history = history
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Po fork() wątek roboczy rodzica nie istnieje w procesie potomnym
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name='job-worker', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Zatrzymaj wątek po wykonaniu oczekujących zadań"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._pid = None
+        atexit.unregister(self.stop)
+
+    def submit(self, name, func, *args, **kwargs):
+        """Zleć zadanie; zwraca jego stan (słownik z id)"""
+        job = {
+            'id': f'{os.getpid()}-{next(self._ids)}',
+            'name': name,
+            'status': 'queued',
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'finished_at': None,
+        }
+        with self._lock:
+            self._jobs[job['id']] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+
+        if not self.enabled:
+            self._execute(job, func, args, kwargs)
+            return dict(job)
+
+        self._ensure_started()
+        self._queue.put((job, func, args, kwargs))
+        logger.info("Zadanie zlecone", job_id=job['id'], job=name)
+        return dict(job)
+
+    def get(self, job_id):
+        """Stan zadania lub None (nieznane albo usunięte z historii)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _execute(self, job, func, args, kwargs):
+        job['status'] = 'running'
+        started = time.monotonic()
+        try:
+            with self.app.app_context():
+                job['result'] = func(*args, **kwargs)
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            logger.error("Zadanie zakończone błędem", job_id=job['id'], job=job['name'], error=str(e))
+        job['finished_at'] = time.time()
+        registry.inc('blog_jobs_total', {'job': job['name'], 'status': job['status']})
+        logger.info("Zadanie zakończone", job_id=job['id'], job=job['name'], status=job['status'],
+                    duration_ms=round((time.monotonic() - started) * 1000, 1))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            self._execute(*item)
+
+
+def configure_jobs(app):
+    """Kolejka zadań w tle w app.extensions['job_queue']"""
+    app.extensions['job_queue'] = JobQueue(
+        app,
+        enabled=app.config.get('JOB_QUEUE_ENABLED', True),
+        history=app.config.get('JOB_HISTORY_SIZE', 100)
+    )
@@ -0,0 +1,106 @@
+"""
+Provider JSON odpowiedzi API
+
+Z zainstalowanym orjson odpowiedź serializowana jest od razu do bajtów
+(datetime, date, UUID i dataclass natywnie w C). Bez niego - stdlib json
+w trybie zwartym, bez sortowania kluczy (ensure_ascii zostaje włączone -
+w CPython escapowanie jest szybsze niż budowanie napisu spoza ASCII).
+Daty w obu przypadkach trafiają do JSON jako ISO 8601, więc to_dict()
+modeli zwraca obiekty datetime zamiast wołać isoformat() per wiersz.
+
+Silnik wybiera JSON_ENGINE: 'auto' (orjson, jeśli dostępny), 'orjson', 'stdlib'.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from flask.json.provider import JSONProvider
+import structlog
+
+try:
+    import orjson
+except ImportError:  # orjson opcjonalny - zwarty stdlib json
+    orjson = None
+
+logger = structlog.get_logger(__name__)
+
+
+def _default(o):
+    """
+    Typy spoza JSON: daty jako ISO 8601, Decimal i UUID jako tekst (Decimal
+    bez utraty precyzji, jak domyślny provider Flask)
+    """
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Provider JSON aplikacji: orjson, jeśli zainstalowany, inaczej zwarty stdlib json
+    """
+
+    # Używane też przez Flask-JWT-Extended (json_provider_class.default)
+    default = staticmethod(_default)
+    mimetype = 'application/json'
+    compact = None  # None - wcięcia tylko w trybie debug
+
+    def __init__(self, app, engine='auto'):
+        super().__init__(app)
+        if engine == 'orjson' and orjson is None:
+            logger.warning("orjson niedostępny - używam stdlib json")
+        self.engine = 'orjson' if engine in ('auto', 'orjson') and orjson is not None else 'stdlib'
+
+    def _pretty(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps_bytes(self, obj, pretty=False):
+        """Serializacja do bajtów UTF-8 (bez pośredniego str przy orjson)"""
+        if self.engine == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except orjson.JSONEncodeError:
+                # Np. liczby całkowite spoza 64 bitów - stdlib je obsłuży
+                pass
+        return self._dumps_stdlib(obj, pretty).encode('utf-8')
+
+    def _dumps_stdlib(self, obj, pretty=False, **kwargs):
+        kwargs.setdefault('default', self.default)
+        if pretty:
+            kwargs.setdefault('indent', 2)
+        else:
+            kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Jawne argumenty json.dumps (np. sort_keys) - zawsze stdlib
+            return self._dumps_stdlib(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if self.engine == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj, self._pretty()) + b'\n',
+                                        mimetype=self.mimetype)
+
+
+def configure_json(app):
+    """Provider JSON aplikacji (jsonify, request.get_json) wg JSON_ENGINE"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app, engine=app.config.get('JSON_ENGINE', 'auto'))
+    logger.debug("Provider JSON skonfigurowany", engine=app.json.engine)
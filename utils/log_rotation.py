@@ -0,0 +1,283 @@
+"""
+Rotacja plików logów (rozmiar + okres) bezpieczna przy wielu procesach,
+kompresja gzip i retencja w wątku w tle
+"""
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from utils.async_logging import _BatchFlushMixin
+
+_PERIOD_FORMATS = {
+    'month': '%Y%m',
+    'day': '%Y%m%d',
+    'hour': '%Y%m%d%H'
+}
+
+
+class InterProcessLock:
+    """
+    Blokada plikowa między procesami (flock na POSIX, msvcrt.locking na Windows)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking=True):
+        lock_file = open(self.path, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SafeRotatingFileHandler(_BatchFlushMixin, logging.FileHandler):
+    """
+    Handler pliku '<prefix>_<okres>.log' z rotacją:
+    - czasową - po zmianie okresu zapis przechodzi do nowego pliku (bez zmiany nazw)
+    - rozmiarową - po przekroczeniu max_bytes plik jest przemianowywany pod blokadą
+      międzyprocesową; pozostałe procesy wykrywają zmianę i otwierają nowy plik
+
+    Sprawdzenie wykonywane jest raz na partię, przed jej zapisem (begin_batch) -
+    proces, który długo nic nie logował, nie dopisze partii do pliku zrotowanego
+    (i być może już skompresowanego i usuniętego) przez inny proces.
+    """
+
+    def __init__(self, directory, prefix, when='month', max_bytes=0, maintenance=None,
+                 encoding=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.period_format = _PERIOD_FORMATS[when]
+        self.max_bytes = max_bytes
+        self.maintenance = maintenance
+        self._period = self._current_period()
+        super().__init__(self._path_for(self._period), encoding=encoding)
+
+    def _current_period(self):
+        return datetime.now().strftime(self.period_format)
+
+    def _path_for(self, period):
+        return os.path.join(self.directory, f'{self.prefix}_{period}.log')
+
+    def _reopen(self, path):
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.close()
+            self.baseFilename = os.path.abspath(path)
+            self.stream = self._open()
+        finally:
+            self.release()
+
+    def begin_batch(self):
+        try:
+            self._maybe_rollover()
+        except OSError:
+            # Np. Windows nie pozwala przemianować pliku otwartego w innym procesie
+            pass
+
+    def _maybe_rollover(self):
+        period = self._current_period()
+        if period != self._period:
+            self._period = period
+            self._reopen(self._path_for(period))
+            self._notify_maintenance()
+            return
+
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            self._reopen(self.baseFilename)
+            return
+
+        # Inny proces już zrotował plik - otwórz nowy
+        if self.stream is not None and not os.path.samestat(os.fstat(self.stream.fileno()), current):
+            self._reopen(self.baseFilename)
+            return
+
+        if self.max_bytes and current.st_size >= self.max_bytes:
+            self._rotate_by_size()
+
+    def _rotate_by_size(self):
+        with InterProcessLock(self.baseFilename + '.lock'):
+            # Ponowne sprawdzenie pod blokadą - inny proces mógł zrotować w międzyczasie
+            try:
+                current = os.stat(self.baseFilename)
+            except FileNotFoundError:
+                current = None
+            if current is not None and current.st_size >= self.max_bytes:
+                stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+                rotated = os.path.join(
+                    self.directory, f'{self.prefix}_{self._period}.{stamp}-{os.getpid()}.log'
+                )
+                os.rename(self.baseFilename, rotated)
+        self._reopen(self.baseFilename)
+        self._notify_maintenance()
+
+    def _notify_maintenance(self):
+        if self.maintenance is not None:
+            self.maintenance.trigger()
+
+
+class LogMaintenance:
+    """
+    Wątek w tle kompresujący zrotowane pliki logów i usuwający stare (retencja)
+
+    Plik okresu ('<prefix>_<okres>.log') może być otwarty w innych procesach
+    niezależnie od czasu modyfikacji - jest ruszany dopiero grace_seconds po końcu
+    okresu, gdy każdy handler przed kolejną partią przeszedł już na nowy plik.
+    Pliki z rotacji rozmiarowej czekają grace_seconds od ostatniego zapisu.
+    """
+
+    def __init__(self, directory, prefixes, compress=True, retention_days=0, backup_count=0,
+                 interval=300, grace_seconds=30, when='month'):
+        self.directory = directory
+        self.prefixes = prefixes
+        self.period_format = _PERIOD_FORMATS[when]
+        self.compress = compress
+        self.retention_days = retention_days
+        self.backup_count = backup_count
+        self.interval = interval
+        self.grace_seconds = grace_seconds
+        self.handlers = []
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return bool(self.compress or self.retention_days or self.backup_count)
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._thread = threading.Thread(target=self._run, name='log-maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+    def trigger(self):
+        """Wybudź wątek po rotacji (wywoływane z wątku zapisującego)"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopping:
+                return
+            # Zrotowany plik może jeszcze przez chwilę dostawać zapisy z innych procesów
+            time.sleep(min(self.grace_seconds, 1))
+            try:
+                self.run_once()
+            except OSError:
+                pass
+
+    def _rotated_files(self, prefix, active, now):
+        # Okresy zakończone co najmniej grace_seconds temu (format z cyframi stałej
+        # szerokości - porównanie napisów porządkuje chronologicznie)
+        closed_before = datetime.fromtimestamp(now - self.grace_seconds).strftime(self.period_format)
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.startswith(prefix + '_'):
+                continue
+            if not (name.endswith('.log') or name.endswith('.log.gz')):
+                continue
+            period = name[len(prefix) + 1:-len('.log')]
+            if period.isdigit() and period >= closed_before:
+                continue  # plik bieżącego (lub dopiero zamkniętego) okresu
+            path = os.path.abspath(os.path.join(self.directory, name))
+            if path not in active:
+                result.append(path)
+        return result
+
+    def run_once(self, now=None):
+        """Jedno przejście: kompresja, a potem retencja dla każdego prefiksu"""
+        now = time.time() if now is None else now
+        active = {handler.baseFilename for handler in self.handlers}
+
+        for prefix in self.prefixes:
+            lock = InterProcessLock(os.path.join(self.directory, f'.{prefix}.maintenance.lock'))
+            if not lock.acquire(blocking=False):
+                continue  # inny proces właśnie to robi
+            try:
+                if self.compress:
+                    for path in self._rotated_files(prefix, active, now):
+                        if path.endswith('.log') and (self._is_period_file(prefix, path)
+                                                      or now - os.path.getmtime(path) >= self.grace_seconds):
+                            self._compress(path)
+                self._prune(self._rotated_files(prefix, active, now), now)
+            finally:
+                lock.release()
+
+    @staticmethod
+    def _is_period_file(prefix, path):
+        """Plik okresu (bez rotacji rozmiarowej) - jego okres już się zakończył"""
+        return os.path.basename(path)[len(prefix) + 1:-len('.log')].isdigit()
+
+    def _compress(self, path):
+        target = path + '.gz'
+        if not os.path.exists(target):
+            tmp = target + '.tmp'
+            with open(path, 'rb') as source, gzip.open(tmp, 'wb', compresslevel=6) as compressed:
+                shutil.copyfileobj(source, compressed, 1024 * 1024)
+            os.replace(tmp, target)
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # plik nadal otwarty (Windows) - spróbujemy przy następnym przejściu
+
+    def _prune(self, paths, now):
+        files = sorted(((os.path.getmtime(path), path) for path in paths), reverse=True)
+        for index, (mtime, path) in enumerate(files):
+            expired = self.retention_days and now - mtime > self.retention_days * 86400
+            over_count = self.backup_count and index >= self.backup_count
+            if expired or over_count:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,107 @@
+"""
+Próbkowanie logów i limitowanie częstotliwości zdarzeń (procesor structlog)
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+import structlog
+
+# Poziomy, które nigdy nie są próbkowane ani tłumione
+_ALWAYS_KEEP = {'warning', 'warn', 'error', 'exception', 'critical', 'fatal'}
+
+# Loggery, których zdarzenia przechodzą zawsze (jak SecurityFilter - trafiają do logu bezpieczeństwa)
+_EXEMPT_LOGGERS = ('security',)
+
+
+class LogSampler:
+    """
+    Procesor structlog odrzucający część powtarzalnych zdarzeń.
+
+    - sample_rates: nazwa zdarzenia -> ułamek zachowywanych zdarzeń (0.0 - 1.0)
+    - rate / burst: token bucket per nazwa zdarzenia (0 wyłącza limit)
+    - ostrzeżenia, błędy i zdarzenia loggerów bezpieczeństwa przechodzą zawsze
+    - pierwsze zachowane zdarzenie po serii odrzuconych dostaje pole
+      'suppressed' z liczbą pominiętych podobnych zdarzeń
+
+    Stan per nazwa zdarzenia (kubełki, liczniki pominiętych) obejmuje co najwyżej
+    max_events ostatnio widzianych nazw - nazwy składane z danych (f-stringi)
+    nie powiększają go bez końca; najdawniej użyte wypadają (LRU).
+    """
+
+    def __init__(self, sample_rates=None, rate=0, burst=0, random_func=random.random,
+                 clock=time.monotonic, max_events=1024):
+        self.sample_rates = dict(sample_rates or {})
+        self.rate = rate
+        self.burst = burst or rate
+        self.max_events = max_events
+        self._random = random_func
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()      # nazwa zdarzenia -> [tokeny, czas]
+        self._suppressed = OrderedDict()   # nazwa zdarzenia -> liczba pominiętych od ostatniego zachowanego
+        self.stats = {'kept': 0, 'sampled_out': 0, 'rate_limited': 0, 'evicted': 0}
+
+    def _evict(self, mapping):
+        while len(mapping) > self.max_events:
+            mapping.popitem(last=False)
+            self.stats['evicted'] += 1
+
+    def _count_suppressed(self, event):
+        self._suppressed[event] = self._suppressed.pop(event, 0) + 1
+        self._evict(self._suppressed)
+
+    def _take_token(self, event, now):
+        bucket = self._buckets.get(event)
+        if bucket is None:
+            bucket = self._buckets[event] = [float(self.burst), now]
+            self._evict(self._buckets)
+        else:
+            self._buckets.move_to_end(event)
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        return False
+
+    def __call__(self, logger, method_name, event_dict):
+        if method_name in _ALWAYS_KEEP:
+            return event_dict
+
+        name = getattr(logger, 'name', None) or ''
+        if any(part in name for part in _EXEMPT_LOGGERS):
+            return event_dict
+
+        event = event_dict.get('event')
+        if not isinstance(event, str):
+            return event_dict
+
+        sample_rate = self.sample_rates.get(event, 1.0)
+
+        with self._lock:
+            if sample_rate < 1.0 and self._random() >= sample_rate:
+                self.stats['sampled_out'] += 1
+                self._count_suppressed(event)
+                raise structlog.DropEvent
+
+            if self.rate and not self._take_token(event, self._clock()):
+                self.stats['rate_limited'] += 1
+                self._count_suppressed(event)
+                raise structlog.DropEvent
+
+            self.stats['kept'] += 1
+            suppressed = self._suppressed.pop(event, 0)
+
+        if suppressed:
+            event_dict['suppressed'] = suppressed
+            if sample_rate < 1.0:
+                event_dict['sample_rate'] = sample_rate
+        return event_dict
+
+    def get_stats(self):
+        """Liczniki zachowanych i odrzuconych zdarzeń"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending_suppressed'] = sum(self._suppressed.values())
+        return stats
@@ -1,145 +1,220 @@
-"""
-Konfiguracja logowania
-"""
-import os
-import logging
-import structlog
-from datetime import datetime
-
-def setup_logging(app):
-    """
-    Konfiguracja systemu logowania
-    """
-    log_level = getattr(logging, app.config.get('LOG_LEVEL', 'INFO').upper())
-    
-    # Konfiguracja structlog
-    structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()  # JSON dla łatwej integracji
-        ],
-        context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
-    
-    # Konfiguracja standardowego logging
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Ustaw poziom logowania dla bibliotek zewnętrznych
-    logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
-    logging.getLogger('werkzeug').setLevel(logging.WARNING)
-    
-    # Utwórz katalog logów jeśli nie istnieje
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # File handler dla logów aplikacji
-    log_file = os.path.join(log_dir, f'app_{datetime.now().strftime("%Y%m")}.log')
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(log_level)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    ))
-    
-    # Dodaj handler do głównego logera
-    root_logger = logging.getLogger()
-    root_logger.addHandler(file_handler)
-    
-    # Security log file (oddzielny dla zdarzeń bezpieczeństwa)
-    security_log_file = os.path.join(log_dir, f'security_{datetime.now().strftime("%Y%m")}.log')
-    security_handler = logging.FileHandler(security_log_file)
-    security_handler.setLevel(logging.WARNING)
-    security_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - SECURITY - %(levelname)s - %(message)s'
-    ))
-    
-    # Filtrowanie logów bezpieczeństwa
-    class SecurityFilter(logging.Filter):
-        def filter(self, record):
-            return 'SECURITY' in record.getMessage() or \
-                   'auth' in record.name or \
-                   'security' in record.name
-    
-    security_handler.addFilter(SecurityFilter())
-    root_logger.addHandler(security_handler)
-    
-    # Log startup
-    logger = structlog.get_logger(__name__)
-    logger.info("Logowanie skonfigurowane", 
-                log_level=app.config.get('LOG_LEVEL'),
-                log_file=log_file,
-                security_log_file=security_log_file)
-
-def log_security_event(event_type, **kwargs):
-    """
-    Logowanie zdarzeń bezpieczeństwa
-    """
-    logger = structlog.get_logger('security')
-    
-    # Usuń wrażliwe dane z kwargs
-    safe_kwargs = {}
-    for key, value in kwargs.items():
-        if isinstance(value, str):
-            # Maskuj wrażliwe dane
-            if 'password' in key.lower() or 'token' in key.lower():
-                safe_kwargs[key] = '***MASKED***'
-            elif 'email' in key.lower():
-                # Zachowaj domenę emaila, maskuj nazwę użytkownika
-                if '@' in value:
-                    user, domain = value.split('@', 1)
-                    safe_kwargs[key] = f'{user[0]}***@{domain}'
-                else:
-                    safe_kwargs[key] = '***MASKED***'
-            else:
-                safe_kwargs[key] = value
-        else:
-            safe_kwargs[key] = value
-    
-    if event_type == 'login_failed':
-        logger.warning("Nieudana próba logowania", event='login_failed', **safe_kwargs)
-    elif event_type == 'login_success':
-        logger.info("Udane logowanie", event='login_success', **safe_kwargs)
-    elif event_type == 'unauthorized_access':
-        logger.warning("Nieautoryzowany dostęp", event='unauthorized_access', **safe_kwargs)
-    elif event_type == 'rate_limit_exceeded':
-        logger.warning("Przekroczony limit żądań", event='rate_limit_exceeded', **safe_kwargs)
-    elif event_type == 'suspicious_activity':
-        logger.warning("Podejrzana aktywność", event='suspicious_activity', **safe_kwargs)
-    else:
-        logger.info(f"Zdarzenie bezpieczeństwa: {event_type}", event=event_type, **safe_kwargs)
-
-def log_http_request(request, user_id=None):
-    """
-    Logowanie żądań HTTP (bez wrażliwych danych)
-    """
-    logger = structlog.get_logger('http')
-    
-    log_data = {
-        'method': request.method,
-        'path': request.path,
-        'remote_addr': request.remote_addr,
-        'user_agent': request.user_agent.string[:100] if request.user_agent else None,
-    }
-    
-    if user_id:
-        log_data['user_id'] = user_id
-    
-    # Nie loguj ciał żądań POST/PUT (mogą zawierać hasła)
-    if request.method in ['POST', 'PUT']:
-        log_data['content_type'] = request.content_type
-        log_data['content_length'] = request.content_length
-    
+"""
+Konfiguracja logowania
+"""
+import os
+import logging
+import structlog
+
+from utils.async_logging import AsyncLogWriter, BatchedStreamHandler, DeferredJSONFormatter
+from utils.log_rotation import SafeRotatingFileHandler, LogMaintenance
+from utils.log_sampling import LogSampler
+
+# Aktywny potok logowania (zastępowany przy ponownym wywołaniu setup_logging)
+_log_writer = None
+_log_sampler = None
+_log_maintenance = None
+
+def setup_logging(app):
+    """
+    Konfiguracja systemu logowania
+    """
+    global _log_writer, _log_sampler, _log_maintenance
+    log_level = getattr(logging, app.config.get('LOG_LEVEL', 'INFO').upper())
+    
+    # Próbkowanie powtarzalnych zdarzeń (health check, żądania/odpowiedzi HTTP)
+    _log_sampler = LogSampler(
+        sample_rates=app.config.get('LOG_SAMPLE_RATES', {}),
+        rate=app.config.get('LOG_EVENT_RATE', 0),
+        burst=app.config.get('LOG_EVENT_BURST', 0)
+    )
+    
+    # Konfiguracja structlog - renderowanie JSON odbywa się w wątku zapisującym
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            _log_sampler,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter  # JSON w tle
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+    
+    # Ustaw poziom logowania dla bibliotek zewnętrznych
+    logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    
+    # Utwórz katalog logów jeśli nie istnieje
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+    
+    # Konsola (dotychczas przez logging.basicConfig)
+    console_handler = BatchedStreamHandler()
+    console_handler.setLevel(log_level)
+    console_handler.setFormatter(DeferredJSONFormatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    ))
+    
+    # Kompresja zrotowanych plików i retencja (wątek w tle)
+    maintenance = LogMaintenance(
+        log_dir, ['app', 'security'],
+        compress=app.config.get('LOG_COMPRESS', True),
+        retention_days=app.config.get('LOG_RETENTION_DAYS', 90),
+        backup_count=app.config.get('LOG_BACKUP_COUNT', 100),
+        when=app.config.get('LOG_ROTATION_WHEN', 'month')
+    )
+    rotation = {
+        'when': app.config.get('LOG_ROTATION_WHEN', 'month'),
+        'max_bytes': app.config.get('LOG_MAX_BYTES', 50 * 1024 * 1024),
+        'maintenance': maintenance
+    }
+    
+    # File handler dla logów aplikacji (app_YYYYMM.log + rotacja rozmiarowa)
+    file_handler = SafeRotatingFileHandler(log_dir, 'app', **rotation)
+    file_handler.setLevel(log_level)
+    file_handler.setFormatter(DeferredJSONFormatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    ))
+    log_file = file_handler.baseFilename
+    
+    # Security log file (oddzielny dla zdarzeń bezpieczeństwa)
+    security_handler = SafeRotatingFileHandler(log_dir, 'security', **rotation)
+    security_handler.setLevel(logging.WARNING)
+    security_handler.setFormatter(DeferredJSONFormatter(
+        '%(asctime)s - SECURITY - %(levelname)s - %(message)s'
+    ))
+    security_log_file = security_handler.baseFilename
+    maintenance.handlers = [file_handler, security_handler]
+    
+    # Filtrowanie logów bezpieczeństwa
+    class SecurityFilter(logging.Filter):
+        def filter(self, record):
+            return 'SECURITY' in record.getMessage() or \
+                   'auth' in record.name or \
+                   'security' in record.name
+    
+    security_handler.addFilter(SecurityFilter())
+    
+    # Handlery działają w wątku zapisującym - główny logger dostaje tylko QueueHandler
+    root_logger = logging.getLogger()
+    if _log_writer is not None:
+        root_logger.removeHandler(_log_writer.queue_handler)
+        _log_writer.stop()
+    if _log_maintenance is not None:
+        _log_maintenance.stop()
+    
+    _log_writer = AsyncLogWriter(
+        [console_handler, file_handler, security_handler],
+        queue_size=app.config.get('LOG_QUEUE_SIZE', 10000),
+        batch_size=app.config.get('LOG_BATCH_SIZE', 256),
+        flush_interval=app.config.get('LOG_FLUSH_INTERVAL', 0.5),
+        block_timeout=app.config.get('LOG_QUEUE_BLOCK_TIMEOUT', 0.05)
+    )
+    _log_writer.start()
+    _log_maintenance = maintenance
+    _log_maintenance.start()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(_log_writer.queue_handler)
+    
+    # Log startup
+    logger = structlog.get_logger(__name__)
+    logger.info("Logowanie skonfigurowane", 
+                log_level=app.config.get('LOG_LEVEL'),
+                log_file=log_file,
+                security_log_file=security_log_file)
+
+def shutdown_logging():
+    """
+    Opróżnij kolejkę logów i zamknij pliki (wywoływane też przez atexit)
+    """
+    global _log_writer, _log_sampler, _log_maintenance
+    if _log_writer is not None:
+        logging.getLogger().removeHandler(_log_writer.queue_handler)
+        _log_writer.stop()
+        _log_writer = None
+    _log_sampler = None
+    if _log_maintenance is not None:
+        _log_maintenance.stop()
+        _log_maintenance = None
+
+def get_logging_stats():
+    """
+    Liczniki potoku logowania (zapisane, odrzucone, głębokość kolejki, próbkowanie)
+    """
+    stats = {}
+    if _log_writer is not None:
+        stats.update(_log_writer.stats.snapshot())
+        stats['queue_depth'] = _log_writer.queue.qsize()
+    if _log_sampler is not None:
+        stats['sampling'] = _log_sampler.get_stats()
+    return stats
+
+def log_security_event(event_type, **kwargs):
+    """
+    Logowanie zdarzeń bezpieczeństwa
+    """
+    logger = structlog.get_logger('security')
+    
+    # Usuń wrażliwe dane z kwargs
+    safe_kwargs = {}
+    for key, value in kwargs.items():
+        if isinstance(value, str):
+            # Maskuj wrażliwe dane
+            if 'password' in key.lower() or 'token' in key.lower():
+                safe_kwargs[key] = '***MASKED***'
+            elif 'email' in key.lower():
+                # Zachowaj domenę emaila, maskuj nazwę użytkownika
+                if '@' in value:
+                    user, domain = value.split('@', 1)
+                    safe_kwargs[key] = f'{user[0]}***@{domain}'
+                else:
+                    safe_kwargs[key] = '***MASKED***'
+            else:
+                safe_kwargs[key] = value
+        else:
+            safe_kwargs[key] = value
+    
+    if event_type == 'login_failed':
+        logger.warning("Nieudana próba logowania", event='login_failed', **safe_kwargs)
+    elif event_type == 'login_success':
+        logger.info("Udane logowanie", event='login_success', **safe_kwargs)
+    elif event_type == 'unauthorized_access':
+        logger.warning("Nieautoryzowany dostęp", event='unauthorized_access', **safe_kwargs)
+    elif event_type == 'rate_limit_exceeded':
+        logger.warning("Przekroczony limit żądań", event='rate_limit_exceeded', **safe_kwargs)
+    elif event_type == 'suspicious_activity':
+        logger.warning("Podejrzana aktywność", event='suspicious_activity', **safe_kwargs)
+    else:
+        logger.info(f"Zdarzenie bezpieczeństwa: {event_type}", event=event_type, **safe_kwargs)
+
+def log_http_request(request, user_id=None):
+    """
+    Logowanie żądań HTTP (bez wrażliwych danych)
+    """
+    logger = structlog.get_logger('http')
+    
+    log_data = {
+        'method': request.method,
+        'path': request.path,
+        'remote_addr': request.remote_addr,
+        'user_agent': request.user_agent.string[:100] if request.user_agent else None,
+    }
+    
+    if user_id:
+        log_data['user_id'] = user_id
+    
+    # Nie loguj ciał żądań POST/PUT (mogą zawierać hasła)
+    if request.method in ['POST', 'PUT']:
+        log_data['content_type'] = request.content_type
+        log_data['content_length'] = request.content_length
+    
     logger.info("Żądanie HTTP", **log_data)
\ No newline at end of file
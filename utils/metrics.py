@@ -0,0 +1,352 @@
+"""
+Metryki aplikacji (liczniki, histogramy, gauge) w formacie Prometheus
+
+Każdy proces zbiera metryki w pamięci i co METRICS_FLUSH_INTERVAL sekund
+zapisuje swój snapshot do pliku '<pid>.json' we wspólnym katalogu. Endpoint
+metryk scala pliki wszystkich procesów, więc wynik jest poprawny dla wielu workerów.
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# nazwa -> (typ, opis)
+METRIC_HELP = {
+    'blog_http_requests_total': ('counter', 'Liczba żądań HTTP per endpoint, metoda i status'),
+    'blog_http_request_duration_seconds': ('histogram', 'Czas obsługi żądania per endpoint'),
+    'blog_http_request_duration_quantile_seconds': ('gauge', 'Kwantyle czasu obsługi (z histogramu)'),
+    'blog_db_queries_per_request': ('histogram', 'Liczba zapytań SQL na żądanie per endpoint'),
+    'blog_db_time_per_request_seconds': ('histogram', 'Czas zapytań SQL na żądanie per endpoint'),
+    'blog_db_queries_total': ('counter', 'Liczba zapytań SQL'),
+    'blog_db_query_seconds_total': ('counter', 'Łączny czas zapytań SQL'),
+    'blog_db_pool_checked_out': ('gauge', 'Połączenia pobrane z puli'),
+    'blog_db_pool_size': ('gauge', 'Rozmiar puli połączeń'),
+    'blog_db_reads_total': ('counter', 'Bloki odczytu skierowane do repliki lub bazy głównej'),
+    'blog_db_replica_staleness_seconds': ('gauge', 'Wiek kopii repliki w pamięci'),
+    'blog_db_write_batch_size': ('histogram', 'Liczba transakcji w jednym commicie kolejki zapisów'),
+    'blog_db_write_commits_total': ('counter', 'Commity wykonane przez kolejkę zapisów'),
+    'blog_db_deleted_rows_total': ('counter', 'Wiersze usunięte przez kaskadowe usuwanie partiami'),
+    'blog_post_views_flushed_total': ('counter', 'Wyświetlenia postów zapisane do bazy'),
+    'blog_jobs_total': ('counter', 'Zadania w tle per nazwa i status'),
+    'blog_http_compression_bytes_total': ('counter', 'Bajty odpowiedzi przed (raw) i po kompresji per kodowanie'),
+    'blog_http_streamed_rows_total': ('counter', 'Wiersze wysłane strumieniowo per lista'),
+    'blog_cache_requests_total': ('counter', 'Odwołania do cache (hit/miss)'),
+    'blog_cache_hit_ratio': ('gauge', 'Współczynnik trafień cache'),
+    'blog_refresh_token_events_total': ('counter', 'Zdarzenia rotacji refresh tokenów'),
+    'blog_rate_limit_storage_errors_total': ('counter', 'Błędy backendu limitów (żądania przepuszczone)'),
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class MetricsRegistry:
+    """
+    Rejestr metryk procesu (bezpieczny wątkowo)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (nazwa, etykiety) -> wartość
+        self._histograms = {}  # (nazwa, etykiety) -> [granice, liczniki_kubełków, suma, liczba]
+        self._collectors = []  # funkcje zwracające [(nazwa, etykiety, wartość, typ)]
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0, 0]
+            index = len(buckets)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    index = i
+                    break
+            histogram[1][index] += 1
+            histogram[2] += value
+            histogram[3] += 1
+
+    def register_collector(self, collector):
+        """Rejestracja funkcji dostarczającej metryki w momencie snapshotu"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        """Snapshot procesu w postaci możliwej do zapisania jako JSON"""
+        collected = []
+        for collector in self._collectors:
+            try:
+                collected.extend(collector())
+            except Exception:
+                continue
+
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(h[0]), list(h[1]), h[2], h[3]]
+                          for (name, labels), h in self._histograms.items()]
+
+        gauges = []
+        for name, labels, value, kind in collected:
+            entry = [name, list(_labels_key(labels)), value]
+            (counters if kind == 'counter' else gauges).append(entry)
+
+        return {'pid': os.getpid(), 'time': time.time(), 'counters': counters,
+                'histograms': histograms, 'gauges': gauges}
+
+
+registry = MetricsRegistry()
+
+
+def record_cache(cache_name, hit):
+    """Zliczanie trafień / chybień cache (używane przez warstwy cache)"""
+    registry.inc('blog_cache_requests_total', {'cache': cache_name, 'result': 'hit' if hit else 'miss'})
+
+
+class MultiProcessStore:
+    """
+    Katalog ze snapshotami procesów - zapis atomowy (tmp + os.replace)
+    """
+
+    def __init__(self, directory, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def maybe_flush(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now - self._last_flush < self.flush_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = now
+            self.flush()
+        finally:
+            self._lock.release()
+
+    def flush(self):
+        snapshot = registry.snapshot()
+        path = self._path(snapshot['pid'])
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+
+    def compact(self):
+        """
+        Przeniesienie liczników zakończonych procesów do '_archive.json'
+        (np. po recyklingu workerów), żeby katalog nie rósł bez końca
+        """
+        from utils.log_rotation import InterProcessLock
+
+        lock = InterProcessLock(os.path.join(self.directory, '.compact.lock'))
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            archive_path = os.path.join(self.directory, '_archive.json')
+            dead_paths, dead_snapshots = [], []
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json') or name == '_archive.json':
+                    continue
+                try:
+                    pid = int(name[:-len('.json')])
+                except ValueError:
+                    continue
+                if not _pid_alive(pid):
+                    path = os.path.join(self.directory, name)
+                    try:
+                        with open(path) as f:
+                            dead_snapshots.append(json.load(f))
+                    except (OSError, ValueError):
+                        pass
+                    dead_paths.append(path)
+            if not dead_paths:
+                return
+
+            if os.path.exists(archive_path):
+                with open(archive_path) as f:
+                    dead_snapshots.append(json.load(f))
+            counters, histograms, _ = merge_snapshots(dead_snapshots)
+            archive = {
+                'pid': None,
+                'time': time.time(),
+                'counters': [[name, [list(label) for label in labels], value]
+                             for (name, labels), value in counters.items()],
+                'histograms': [[name, [list(label) for label in labels], bounds, counts, total, count]
+                               for (name, labels), (bounds, counts, total, count) in histograms.items()],
+                'gauges': []
+            }
+            tmp = archive_path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(archive, f)
+            os.replace(tmp, archive_path)
+            for path in dead_paths:
+                os.remove(path)
+        finally:
+            lock.release()
+
+    def load_all(self):
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def merge_snapshots(snapshots):
+    """
+    Scalenie snapshotów procesów: liczniki i histogramy sumowane (także z
+    zakończonych procesów), gauge sumowane tylko dla żyjących procesów
+    """
+    counters, histograms, gauges = {}, {}, {}
+    for snapshot in snapshots:
+        alive = _pid_alive(snapshot.get('pid'))
+        for name, labels, value in snapshot.get('counters', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, bounds, counts, total, count in snapshot.get('histograms', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.get(key)
+            if merged is None or merged[0] != bounds:
+                histograms[key] = [bounds, list(counts), total, count]
+            else:
+                merged[1] = [a + b for a, b in zip(merged[1], counts)]
+                merged[2] += total
+                merged[3] += count
+        if alive:
+            for name, labels, value in snapshot.get('gauges', []):
+                key = (name, tuple(tuple(label) for label in labels))
+                gauges[key] = gauges.get(key, 0) + value
+    return counters, histograms, gauges
+
+
+def histogram_quantile(quantile, bounds, counts):
+    """Estymacja kwantyla z kubełków histogramu (interpolacja liniowa jak w Prometheus)"""
+    total = sum(counts)
+    if total == 0:
+        return float('nan')
+    rank = quantile * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        previous = cumulative
+        cumulative += count
+        if cumulative >= rank and count:
+            if i == len(bounds):
+                return bounds[-1]
+            lower = bounds[i - 1] if i > 0 else 0.0
+            return lower + (bounds[i] - lower) * (rank - previous) / count
+    return bounds[-1]
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label_value(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return 'NaN'
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(counters, histograms, gauges):
+    """Renderowanie w formacie tekstowym Prometheus (0.0.4)"""
+    # Pochodne: kwantyle latencji i współczynnik trafień cache
+    gauges = dict(gauges)
+    for (name, labels), (bounds, counts, _, _) in histograms.items():
+        if name == 'blog_http_request_duration_seconds':
+            for quantile in QUANTILES:
+                key = ('blog_http_request_duration_quantile_seconds', labels + (('quantile', str(quantile)),))
+                gauges[key] = histogram_quantile(quantile, bounds, counts)
+
+    cache_totals = {}
+    for (name, labels), value in counters.items():
+        if name == 'blog_cache_requests_total':
+            label_map = dict(labels)
+            hits_total = cache_totals.setdefault(label_map['cache'], [0, 0])
+            hits_total[0 if label_map['result'] == 'hit' else 1] += value
+    for cache_name, (hits, misses) in cache_totals.items():
+        gauges[('blog_cache_hit_ratio', (('cache', cache_name),))] = hits / (hits + misses) if hits + misses else 0.0
+
+    lines = []
+    grouped = {}
+    for (name, labels), value in counters.items():
+        grouped.setdefault(name, []).append((labels, value))
+    for (name, labels), value in gauges.items():
+        grouped.setdefault(name, []).append((labels, value))
+
+    for name in sorted(set(grouped) | {name for name, _ in histograms}):
+        kind, help_text = METRIC_HELP.get(name, ('gauge', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(grouped.get(name, [])):
+            lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        for (hist_name, labels), (bounds, counts, total, count) in sorted(histograms.items()):
+            if hist_name != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(list(bounds) + [math.inf], counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == math.inf else _format_value(float(bound))
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(float(total))}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# Po fork() proces potomny nie powinien dziedziczyć liczników rodzica
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.reset)
+
+
+def register_atexit_flush(store):
+    atexit.register(store.flush)
@@ -0,0 +1,95 @@
+"""
+Paginacja list: limit rozmiaru strony i strumieniowanie całych wyników
+
+per_page z query stringa jest przycinany do PAGINATION_MAX_PER_PAGE - strona
+zawsze mieści się w pamięci. Eksport całej tabeli (panel admina, klienci
+masowi) idzie przez stream_json_array: wiersze pobierane są partiami po
+STREAM_CHUNK_SIZE (keyset po id, każda partia w osobnej krótkiej transakcji),
+a tablica JSON wysyłana element po elemencie - pamięć nie rośnie z liczbą
+wierszy.
+"""
+import math
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import func, select
+import structlog
+
+from database import db
+from utils.metrics import registry
+
+logger = structlog.get_logger(__name__)
+
+
+def get_page_args():
+    """(page, per_page) z query stringa, przycięte do [1, PAGINATION_MAX_PER_PAGE]"""
+    default = current_app.config.get('PAGINATION_DEFAULT_PER_PAGE', 20)
+    maximum = current_app.config.get('PAGINATION_MAX_PER_PAGE', 100)
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(max(1, request.args.get('per_page', default, type=int)), maximum)
+    return page, per_page
+
+
+class RowPage:
+    """Strona wyników modelu odczytu (pola jak Pagination z Flask-SQLAlchemy)"""
+    __slots__ = ('items', 'page', 'per_page', 'total')
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self):
+        return math.ceil(self.total / self.per_page) if self.total else 0
+
+
+def paginate_rows(statement, page, per_page, read_model):
+    """
+    Strona wyników SELECT modelu odczytu: elementy jako słowniki
+    (read_model.to_dict) i liczba wszystkich wierszy
+    """
+    rows = db.session.execute(statement.limit(per_page).offset((page - 1) * per_page)).all()
+    if page == 1 and len(rows) < per_page:
+        total = len(rows)
+    else:
+        total = db.session.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+    return RowPage(read_model.dicts(rows), page, per_page, total)
+
+
+def wants_stream():
+    """Czy klient poprosił o całą listę jako strumień (?stream=1)"""
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_json_array(fetch_chunk, serialize, name):
+    """
+    Odpowiedź z tablicą JSON wszystkich wierszy.
+
+    fetch_chunk(after_id, limit) zwraca kolejną partię (id malejąco, po after_id;
+    None - od początku), serialize(wiersz) - słownik elementu.
+    """
+    chunk_size = current_app.config.get('STREAM_CHUNK_SIZE', 500)
+    provider = current_app.json
+    encode = getattr(provider, 'dumps_bytes', lambda obj: provider.dumps(obj).encode('utf-8'))
+
+    def generate():
+        yield b'['
+        after_id, count = None, 0
+        while True:
+            rows = fetch_chunk(after_id, chunk_size)
+            if not rows:
+                break
+            body = b','.join(encode(serialize(row)) for row in rows)
+            yield body if not count else b',' + body
+            count += len(rows)
+            after_id = rows[-1].id
+            # Koniec transakcji odczytu - strumień nie trzyma snapshotu bazy między
+            # partiami; obiekty partii zwalnia GC (mapa tożsamości sesji jest słaba)
+            db.session.rollback()
+            if len(rows) < chunk_size:
+                break
+        yield b']\n'
+        registry.inc('blog_http_streamed_rows_total', {'list': name}, count)
+        logger.debug("Wysłano listę strumieniowo", list=name, rows=count)
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
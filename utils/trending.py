@@ -0,0 +1,224 @@
+"""
+Ranking popularnych postów (trending) utrzymywany przyrostowo
+
+Każde zdarzenie (wyświetlenie, komentarz) dodaje do wyniku posta wagę
+przeskalowaną względem stałej epoki: w * 2^((t - epoka) / półokres).
+Wynik trzymany jest jako log2, więc nie przepełnia się, a kolejność postów
+nie zmienia się z upływem czasu - ranking to posortowana lista aktualizowana
+przy zdarzeniu, top-k to jej wycinek.
+
+Lokalne zdarzenia co TRENDING_PERSIST_INTERVAL s są dopisywane do tabeli
+post_trending, po czym proces wczytuje z niej TRENDING_CAPACITY najlepszych
+wyników - ranking jest wspólny dla procesów i przetrwa restart.
+"""
+import atexit
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, delete, insert, select, update
+import structlog
+
+from database import db, retry_on_lock
+from models.post import Post
+from models.trending import PostTrendingScore
+from utils.write_queue import transactional
+
+logger = structlog.get_logger(__name__)
+
+# Stała epoka wygaszania - zmiana unieważnia zapisane wyniki
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def log_add(a, b):
+    """log2(2^a + 2^b) bez przepełnienia (None - brak wyniku)"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log2(1.0 + 2.0 ** (low - high))
+
+
+class TrendingIndex:
+    """
+    Ranking postów w pamięci procesu z okresowym zapisem do bazy
+    """
+
+    def __init__(self, app, half_life=43200.0, weights=None, capacity=1000,
+                 persist_interval=30.0, min_score=0.01):
+        self.app = app
+        self.half_life = half_life
+        self.weights = weights or {}
+        self.capacity = capacity
+        self.persist_interval = persist_interval
+        self.min_score = min_score
+        self._scores = {}   # post_id -> log2 wyniku
+        self._ranking = []  # (-log2 wyniku, post_id), rosnąco = od najpopularniejszego
+        self._pending = {}  # post_id -> log2 niezapisanych lokalnych zdarzeń
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Po fork() potomek wczytuje ranking z bazy i uruchamia własny wątek zapisu
+        if self._pid == os.getpid():
+            return
+        with self._persist_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            with self._lock:
+                self._scores, self._ranking, self._pending = {}, [], {}
+            self._persist()
+            if self.persist_interval:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='trending-persist', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _exponent(self, now=None):
+        return ((time.time() if now is None else now) - TRENDING_EPOCH) / self.half_life
+
+    def _set(self, post_id, log_score):
+        # Wywoływane pod self._lock
+        old = self._scores.get(post_id)
+        if old is not None:
+            del self._ranking[bisect_left(self._ranking, (-old, post_id))]
+        self._scores[post_id] = log_score
+        insort(self._ranking, (-log_score, post_id))
+
+    def record(self, kind, counts, now=None):
+        """Dodaj zdarzenia danego rodzaju: counts to {post_id: liczba zdarzeń}"""
+        weight = self.weights.get(kind, 0)
+        if weight <= 0 or not counts:
+            return
+        self._ensure_started()
+        base = math.log2(weight) + self._exponent(now)
+        with self._lock:
+            for post_id, count in counts.items():
+                delta = base + math.log2(count)
+                self._pending[post_id] = log_add(self._pending.get(post_id), delta)
+                self._set(post_id, log_add(self._scores.get(post_id), delta))
+
+    def discard(self, post_ids):
+        """Usuń posty z rankingu i niezapisanych zdarzeń (po usunięciu postów)"""
+        with self._lock:
+            for post_id in post_ids:
+                self._pending.pop(post_id, None)
+                old = self._scores.pop(post_id, None)
+                if old is not None:
+                    del self._ranking[bisect_left(self._ranking, (-old, post_id))]
+
+    def top(self, k):
+        """k najpopularniejszych postów: [(post_id, aktualny wynik)]"""
+        self._ensure_started()
+        exponent = self._exponent()
+        with self._lock:
+            return [(post_id, 2.0 ** (-negative - exponent)) for negative, post_id in self._ranking[:k]]
+
+    def persist(self):
+        """Zapisz lokalne zdarzenia do bazy i wczytaj aktualny ranking"""
+        self._ensure_started()
+        with self._persist_lock:
+            return self._persist()
+
+    def _persist(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        floor = self._exponent() + math.log2(self.min_score)
+        try:
+            with self.app.app_context():
+                rows = _merge_scores(pending, floor, self.capacity)
+        except Exception as e:
+            with self._lock:
+                for post_id, delta in pending.items():
+                    self._pending[post_id] = log_add(self._pending.get(post_id), delta)
+            logger.warning("Zapis rankingu popularności nie powiódł się", error=str(e), posts=len(pending))
+            return False
+
+        with self._lock:
+            scores = dict(rows)
+            # Zdarzenia zarejestrowane w trakcie zapisu
+            for post_id, delta in self._pending.items():
+                scores[post_id] = log_add(scores.get(post_id), delta)
+            self._scores = scores
+            self._ranking = sorted((-log_score, post_id) for post_id, log_score in scores.items())
+        logger.debug("Zapisano ranking popularności", posts=len(pending), loaded=len(rows))
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.persist_interval):
+            self.persist()
+
+    def stop(self):
+        """Zatrzymaj wątek i zapisz pozostałe zdarzenia"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.stop)
+        with self._persist_lock:
+            self._persist()
+
+
+@retry_on_lock()
+@transactional
+def _merge_scores(pending, floor, capacity):
+    """
+    Dodaj przyrosty do zapisanych wyników, usuń wygasłe (poniżej floor)
+    i zwróć capacity najlepszych [(post_id, log_score)].
+    Przyrosty postów usuniętych po zdarzeniu są pomijane - nie odtwarzają
+    wierszy skasowanych przez DeletionService (i nie łamią klucza obcego).
+    """
+    table = PostTrendingScore.__table__
+    if pending:
+        live = set(db.session.scalars(select(Post.id).where(Post.id.in_(list(pending)))))
+        if len(live) < len(pending):
+            logger.debug("Pominięto przyrosty usuniętych postów", posts=len(pending) - len(live))
+            pending = {post_id: delta for post_id, delta in pending.items() if post_id in live}
+    if pending:
+        existing = dict(db.session.execute(
+            select(table.c.post_id, table.c.log_score).where(table.c.post_id.in_(list(pending)))
+        ).all())
+        now = datetime.now(timezone.utc)
+        updates, inserts = [], []
+        for post_id, delta in sorted(pending.items()):
+            if post_id in existing:
+                updates.append({'row_id': post_id, 'log_score': log_add(existing[post_id], delta), 'updated_at': now})
+            else:
+                inserts.append({'post_id': post_id, 'log_score': delta, 'updated_at': now})
+        if updates:
+            db.session.execute(update(table).where(table.c.post_id == bindparam('row_id')), updates)
+        if inserts:
+            db.session.execute(insert(table), inserts)
+
+    db.session.execute(delete(table).where(table.c.log_score < floor))
+    return [tuple(row) for row in db.session.execute(
+        select(table.c.post_id, table.c.log_score).order_by(table.c.log_score.desc()).limit(capacity)
+    )]
+
+
+def configure_trending(app):
+    """
+    Ranking popularności w app.extensions['trending']; wyświetlenia trafiają
+    do niego przy każdym zapisie liczników wyświetleń
+    """
+    trending = TrendingIndex(
+        app,
+        half_life=app.config.get('TRENDING_HALF_LIFE_HOURS', 12) * 3600.0,
+        weights=app.config.get('TRENDING_WEIGHTS', {'view': 1.0, 'comment': 5.0}),
+        capacity=app.config.get('TRENDING_CAPACITY', 1000),
+        persist_interval=app.config.get('TRENDING_PERSIST_INTERVAL', 30.0),
+        min_score=app.config.get('TRENDING_MIN_SCORE', 0.01)
+    )
+    app.extensions['trending'] = trending
+
+    view_counter = app.extensions.get('view_counter')
+    if view_counter is not None:
+        view_counter.listeners.append(lambda increments: trending.record('view', increments))
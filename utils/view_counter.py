@@ -0,0 +1,205 @@
+"""
+Liczniki wyświetleń postów agregowane w pamięci procesu
+
+Wyświetlenie nie jest zapisem do bazy - zwiększa licznik w pamięci.
+Wątek w tle co VIEW_FLUSH_INTERVAL s (oraz przy zamknięciu procesu) zapisuje
+zebrane przyrosty jednym UPDATE ... SET view_count = view_count + ? (executemany).
+Opcjonalnie powtórne wyświetlenia tego samego widza są pomijane (filtr Blooma
+w oknie VIEW_DEDUP_WINDOW s).
+"""
+import atexit
+import hashlib
+import itertools
+import math
+import os
+import threading
+import time
+from sqlalchemy import bindparam, update
+import structlog
+
+from database import db, retry_on_lock
+from models.post import Post
+from utils.metrics import registry
+from utils.write_queue import transactional
+
+logger = structlog.get_logger(__name__)
+
+
+class BloomFilter:
+    """
+    Filtr Blooma na bytearray - przynależność z fałszywymi trafieniami
+    (najwyżej error_rate przy capacity elementach), bez fałszywych pudeł
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key):
+        """Dodaj klucz; zwraca True, jeśli (prawdopodobnie) już był w filtrze"""
+        present = True
+        for p in self._positions(key):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                present = False
+                self.bits[p >> 3] |= mask
+        return present
+
+
+class ViewDeduplicator:
+    """
+    Dwa filtry Blooma rotowane co window s - widz liczony raz na post w oknie
+    (pamięć stała, niezależna od liczby widzów)
+    """
+
+    def __init__(self, capacity, error_rate, window):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window = window
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        self._rotated_at = time.monotonic()
+
+    def seen(self, post_id, viewer):
+        now = time.monotonic()
+        if now - self._rotated_at >= self.window:
+            self._previous, self._current = self._current, BloomFilter(self.capacity, self.error_rate)
+            self._rotated_at = now
+        key = f'{post_id}:{viewer}'
+        return self._current.add(key) or key in self._previous
+
+
+class ViewCounter:
+    """
+    Przyrosty wyświetleń per post w pamięci procesu.
+
+    Licznik posta to itertools.count - next() jest atomowe pod GIL, więc
+    rejestrowanie wyświetleń nie bierze blokady. Zapis podmienia słownik
+    liczników na pusty; wyświetlenie, które w tej chwili trzymało stary
+    licznik, może zostać pominięte.
+    """
+
+    def __init__(self, app, flush_interval=5.0, deduplicator=None):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.deduplicator = deduplicator
+        self._counts = {}
+        self._carry = {}  # przyrosty z nieudanego zapisu
+        self.listeners = []  # wywoływane z zapisanymi przyrostami {post_id: wyświetlenia}
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Po fork() wątek zapisujący i przyrosty rodzica nie należą do potomka
+        if self._pid == os.getpid() or not self.flush_interval:
+            return
+        with self._flush_lock:
+            if self._pid == os.getpid():
+                return
+            self._counts = {}
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def record(self, post_id, viewer=None):
+        """Zarejestruj wyświetlenie; zwraca False dla powtórnego wyświetlenia widza"""
+        self._ensure_started()
+        if viewer is not None and self.deduplicator is not None \
+                and self.deduplicator.seen(post_id, viewer):
+            return False
+        counter = self._counts.get(post_id)
+        if counter is None:
+            counter = self._counts.setdefault(post_id, itertools.count(1))
+        next(counter)
+        return True
+
+    def flush(self):
+        """Zapisz zebrane przyrosty do bazy; zwraca liczbę zapisanych wyświetleń"""
+        with self._flush_lock:
+            counts, self._counts = self._counts, {}
+            increments, self._carry = self._carry, {}
+            for post_id, counter in counts.items():
+                # Licznik utworzony z count(1): next() zwraca liczbę wyświetleń + 1
+                views = next(counter) - 1
+                if views:
+                    increments[post_id] = increments.get(post_id, 0) + views
+            if not increments:
+                return 0
+            try:
+                with self.app.app_context():
+                    _apply_increments(increments)
+            except Exception as e:
+                # Przyrosty trafią do następnego zapisu
+                self._carry = increments
+                logger.warning("Zapis wyświetleń nie powiódł się", error=str(e), posts=len(increments))
+                return 0
+
+        for listener in self.listeners:
+            try:
+                listener(increments)
+            except Exception as e:
+                logger.warning("Błąd odbiorcy wyświetleń", error=str(e))
+
+        total = sum(increments.values())
+        registry.inc('blog_post_views_flushed_total', value=total)
+        logger.debug("Zapisano wyświetlenia", posts=len(increments), views=total)
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """Zatrzymaj wątek i zapisz pozostałe przyrosty"""
+        if self._pid is not None and self._pid != os.getpid():
+            # Wątek i przyrosty odziedziczone po fork() należą do rodzica
+            return
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._pid = None
+            atexit.unregister(self.stop)
+        # Bez wątku (VIEW_FLUSH_INTERVAL = 0) przyrosty czekają właśnie na ten zapis
+        self.flush()
+
+
+@retry_on_lock()
+@transactional
+def _apply_increments(increments):
+    posts = Post.__table__
+    statement = update(posts)\
+        .where(posts.c.id == bindparam('post_id'))\
+        .values(view_count=posts.c.view_count + bindparam('views'))
+    db.session.execute(statement, [{'post_id': post_id, 'views': views}
+                                   for post_id, views in sorted(increments.items())])
+
+
+def configure_view_counter(app):
+    """Liczniki wyświetleń w app.extensions['view_counter']"""
+    deduplicator = None
+    if app.config.get('VIEW_DEDUP_ENABLED', True):
+        deduplicator = ViewDeduplicator(
+            capacity=app.config.get('VIEW_DEDUP_CAPACITY', 100000),
+            error_rate=app.config.get('VIEW_DEDUP_ERROR_RATE', 0.01),
+            window=app.config.get('VIEW_DEDUP_WINDOW', 3600)
+        )
+    app.extensions['view_counter'] = ViewCounter(
+        app,
+        flush_interval=app.config.get('VIEW_FLUSH_INTERVAL', 5.0),
+        deduplicator=deduplicator
+    )
@@ -0,0 +1,223 @@
+"""
+Kolejka zapisów z jednym wątkiem piszącym i grupowym commitem (group commit)
+
+Metody serwisów oznaczone @transactional nie wywołują commit() same. Bez kolejki
+commit wykonywany jest od razu w wątku żądania. Z kolejką (WRITE_QUEUE_ENABLED)
+treść metody wykonuje wątek piszący: kilka oczekujących transakcji trafia do
+jednego commitu, a każdy wywołujący dostaje własny wynik lub wyjątek.
+"""
+import atexit
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+from flask import current_app, g, has_request_context
+from sqlalchemy.exc import OperationalError
+import structlog
+
+from database import db, is_lock_error
+from utils.metrics import registry
+
+logger = structlog.get_logger(__name__)
+
+_STOP = object()
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class _WriteJob:
+    __slots__ = ('func', 'args', 'kwargs', 'future')
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+    def run(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+class WriteQueue:
+    """
+    Jeden wątek piszący na proces; transakcje z wielu żądań łączone w jeden commit
+    """
+
+    def __init__(self, app, batch_size=64, max_delay=0.0, timeout=30.0, max_commit_attempts=5):
+        self.app = app
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.max_commit_attempts = max_commit_attempts
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Po fork() wątek piszący rodzica nie istnieje w procesie potomnym
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Zatrzymaj wątek po wykonaniu oczekujących zapisów"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._pid = None
+        atexit.unregister(self.stop)
+
+    def submit(self, func, args=(), kwargs=None):
+        """Wykonaj func w wątku piszącym i poczekaj na commit jego partii"""
+        if threading.current_thread() is self._thread:
+            # Zagnieżdżone wywołanie - już jesteśmy w transakcji partii
+            return func(*args, **(kwargs or {}))
+
+        self._ensure_started()
+        job = _WriteJob(func, args, kwargs or {})
+        self._queue.put(job)
+        result = job.future.result(self.timeout)
+
+        # Obiekty z sesji wątku piszącego dołączamy do sesji żądania
+        if isinstance(result, db.Model):
+            result = db.session.merge(result, load=False)
+        db.session().info['wrote'] = True
+        if has_request_context():
+            g.db_wrote = True
+        return result
+
+    def _run(self):
+        with self.app.app_context():
+            session = db.session()
+            # Wyniki są odłączane od sesji po commicie - atrybuty muszą zostać załadowane
+            session.expire_on_commit = False
+            while True:
+                job = self._queue.get()
+                if job is _STOP:
+                    return
+                batch = [job]
+                deadline = time.monotonic() + self.max_delay
+                stop = False
+                while len(batch) < self.batch_size:
+                    # Bez opóźnienia partię tworzy to, co nazbierało się podczas poprzedniego commitu
+                    remaining = deadline - time.monotonic()
+                    try:
+                        job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _STOP:
+                        stop = True
+                        break
+                    batch.append(job)
+
+                try:
+                    self._process(session, batch)
+                except Exception as e:
+                    # Zabezpieczenie - wywołujący nie mogą czekać w nieskończoność
+                    for job in batch:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+                    db.session.remove()
+                    session = db.session()
+                    session.expire_on_commit = False
+                if stop:
+                    return
+
+    def _execute(self, session, jobs):
+        """
+        Wykonaj zadania w jednej transakcji. Zadanie zakończone wyjątkiem dostaje
+        go jako wynik, transakcja jest wycofywana i powtarzana bez niego.
+        """
+        while jobs:
+            results = []
+            for job in jobs:
+                try:
+                    results.append(job.run())
+                    session.flush()
+                except Exception as e:
+                    session.rollback()
+                    job.future.set_exception(e)
+                    jobs = [other for other in jobs if other is not job]
+                    break
+            else:
+                return jobs, results
+        return [], []
+
+    def _process(self, session, batch):
+        jobs = batch
+        for attempt in range(1, self.max_commit_attempts + 1):
+            jobs, results = self._execute(session, jobs)
+            if not jobs:
+                return
+            try:
+                session.commit()
+                break
+            except OperationalError as e:
+                session.rollback()
+                if not is_lock_error(e) or attempt == self.max_commit_attempts:
+                    for job in jobs:
+                        job.future.set_exception(e)
+                    return
+                time.sleep(min(1.0, 0.05 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0))
+
+        session.expunge_all()
+        registry.observe('blog_db_write_batch_size', len(jobs), buckets=BATCH_SIZE_BUCKETS)
+        registry.inc('blog_db_write_commits_total')
+        for job, result in zip(jobs, results):
+            job.future.set_result(result)
+
+
+def transactional(f):
+    """
+    Dekorator metod zapisu serwisów: treść metody to jedna transakcja,
+    zatwierdzana od razu albo przez kolejkę zapisów z grupowym commitem
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        write_queue = current_app.extensions.get('write_queue')
+        if write_queue is not None:
+            return write_queue.submit(f, args, kwargs)
+        try:
+            result = f(*args, **kwargs)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return result
+    return wrapper
+
+
+def configure_write_queue(app):
+    """
+    Włączenie kolejki zapisów (WRITE_QUEUE_ENABLED). Baza SQLite w pamięci
+    ma jedno współdzielone połączenie, więc kolejka jest wtedy wyłączona.
+    """
+    app.extensions['write_queue'] = None
+    if not app.config.get('WRITE_QUEUE_ENABLED'):
+        return
+
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        logger.warning("Kolejka zapisów wymaga bazy w pliku - wyłączona")
+        return
+
+    app.extensions['write_queue'] = WriteQueue(
+        app,
+        batch_size=app.config.get('WRITE_QUEUE_BATCH_SIZE', 64),
+        max_delay=app.config.get('WRITE_QUEUE_MAX_DELAY_MS', 0) / 1000.0,
+        timeout=app.config.get('WRITE_QUEUE_TIMEOUT', 30.0)
+    )
@@ -1,28 +1,28 @@
-"""
-Validators package
-"""
-from .input_validator import (
-    validate_email,
-    validate_username,
-    validate_post_title,
-    validate_post_content,
-    sanitize_input,
-    ValidationError
-)
-from .password_validator import (
-    validate_password,
-    validate_password_strength,
-    PasswordValidationError
-)
-
-__all__ = [
-    'validate_email',
-    'validate_username',
-    'validate_post_title',
-    'validate_post_content',
-    'sanitize_input',
-    'ValidationError',
-    'validate_password',
-    'validate_password_strength',
-    'PasswordValidationError'
+"""
+Validators package
+"""
+from .input_validator import (
+    validate_email,
+    validate_username,
+    validate_post_title,
+    validate_post_content,
+    sanitize_input,
+    ValidationError
+)
+from .password_validator import (
+    validate_password,
+    validate_password_strength,
+    PasswordValidationError
+)
+
+__all__ = [
+    'validate_email',
+    'validate_username',
+    'validate_post_title',
+    'validate_post_content',
+    'sanitize_input',
+    'ValidationError',
+    'validate_password',
+    'validate_password_strength',
+    'PasswordValidationError'
 ]
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+Punkt wejścia WSGI dla serwerów produkcyjnych
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Konfiguracja wybierana jest przez FLASK_ENV (domyślnie production).
+"""
+import os
+
+from app import create_app
+from config import config
+
+app = create_app(config.get(os.environ.get('FLASK_ENV', 'production'), config['production']))